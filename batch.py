@@ -0,0 +1,241 @@
+import asyncio
+import json
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from config import AppConfig
+from generator.options import RenderOptions
+from llm_cache import LLMCache
+from llm_router import AsyncLLMPool, RoutedContent, achoose_and_structure, dump_routed_json, load_routed_json
+from text_preprocess import preprocess
+
+
+@dataclass
+class BatchItem:
+    index: int
+    out: Optional[str] = None
+    text: Optional[str] = None
+    news_file: Optional[str] = None
+    layout: Optional[str] = None
+    from_json: Optional[str] = None
+    dump_json: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class ItemResult:
+    index: int
+    out: Optional[str]
+    status: str = "ok"
+    source: Optional[str] = None     # llm / json
+    layout: Optional[str] = None
+    llm_seconds: Optional[float] = None
+    render_seconds: Optional[float] = None
+    tokens_before: Optional[int] = None   # 预处理前后的输入 token 估算
+    tokens_after: Optional[int] = None
+    total_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+def _resolve(base: Path, value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    path = Path(value)
+    return str(path if path.is_absolute() else base / path)
+
+
+def _json_beside(directory: Optional[str], out: Optional[str]) -> Optional[str]:
+    if not directory or not out:
+        return None
+    return str(Path(directory) / f"{Path(out).stem}.json")
+
+
+def load_manifest(
+    path: str,
+    default_layout: Optional[str] = None,
+    dump_json_dir: Optional[str] = None,
+    from_json_dir: Optional[str] = None,
+) -> List[BatchItem]:
+    """Parse a JSONL manifest; relative paths are resolved against the manifest's directory.
+
+    ``dump_json_dir``/``from_json_dir`` give items without their own
+    ``dump_json``/``from_json`` entry a ``<dir>/<out stem>.json`` path.
+    """
+    manifest = Path(path)
+    base = manifest.parent
+    items: List[BatchItem] = []
+    with open(manifest, "r", encoding="utf-8") as stream:
+        for line in stream:
+            if not line.strip():
+                continue
+            index = len(items)
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as exc:
+                items.append(BatchItem(index=index, error=f"invalid manifest line: {exc}"))
+                continue
+            if not isinstance(entry, dict):
+                items.append(BatchItem(index=index, error="manifest line must be a JSON object"))
+                continue
+            item = BatchItem(
+                index=index,
+                out=_resolve(base, entry.get("out")),
+                text=entry.get("text"),
+                news_file=_resolve(base, entry.get("news_file")),
+                layout=entry.get("layout") or default_layout,
+            )
+            item.from_json = _resolve(base, entry.get("from_json")) or _json_beside(from_json_dir, item.out)
+            item.dump_json = _resolve(base, entry.get("dump_json")) or _json_beside(dump_json_dir, item.out)
+            if not item.out:
+                item.error = "manifest entry is missing 'out'"
+            elif not item.text and not item.news_file and not item.from_json:
+                item.error = "manifest entry needs 'text', 'news_file' or 'from_json'"
+            items.append(item)
+    return items
+
+
+@dataclass
+class _StructureSettings:
+    model: str
+    cache: Optional[LLMCache] = None
+    refresh: bool = False
+    chunk_chars: int = 0
+    preprocess: bool = True
+    token_budget: Optional[int] = None
+
+
+async def _structure_item(
+    item: BatchItem,
+    settings: _StructureSettings,
+    pool: AsyncLLMPool,
+    result: ItemResult,
+) -> RoutedContent:
+    if item.from_json:
+        return load_routed_json(item.from_json, forced_layout=item.layout)
+    text = item.text
+    if text is None:
+        text = Path(item.news_file).read_text(encoding="utf-8")
+    if settings.preprocess:
+        text, report = preprocess(text, settings.token_budget)
+        result.tokens_before = report.tokens_before
+        result.tokens_after = report.tokens_after
+    return await achoose_and_structure(
+        text, model=settings.model, forced_layout=item.layout, pool=pool, cache=settings.cache,
+        refresh=settings.refresh, chunk_chars=settings.chunk_chars,
+    )
+
+
+def _render_item(routed: RoutedContent, out_file: str, options: Optional[RenderOptions]) -> float:
+    # 在渲染进程中执行；主进程只负责调度
+    from main import render_deck
+
+    started = time.perf_counter()
+    Path(out_file).parent.mkdir(parents=True, exist_ok=True)
+    render_deck(routed, out_file, options)
+    return time.perf_counter() - started
+
+
+def _format_error(exc: BaseException) -> str:
+    detail = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+    return detail or type(exc).__name__
+
+
+async def _process_item(
+    item: BatchItem,
+    settings: _StructureSettings,
+    pool: AsyncLLMPool,
+    render_pool: ProcessPoolExecutor,
+    options: Optional[RenderOptions],
+) -> ItemResult:
+    result = ItemResult(index=item.index, out=item.out, layout=item.layout)
+    started = time.perf_counter()
+    try:
+        result.source = "json" if item.from_json else "llm"
+        routed = await _structure_item(item, settings, pool, result)
+        result.llm_seconds = time.perf_counter() - started
+        result.layout = routed.layout
+        if item.dump_json:
+            dump_routed_json(routed, item.dump_json)
+        loop = asyncio.get_running_loop()
+        result.render_seconds = await loop.run_in_executor(render_pool, _render_item, routed, item.out, options)
+    except Exception as exc:
+        result.status = "error"
+        result.error = _format_error(exc)
+    result.total_seconds = time.perf_counter() - started
+    return result
+
+
+async def _run_batch(
+    items: List[BatchItem],
+    settings: _StructureSettings,
+    report_path: str,
+    pool: AsyncLLMPool,
+    render_workers: int,
+    options: Optional[RenderOptions],
+) -> List[ItemResult]:
+    results: List[ItemResult] = []
+    with open(report_path, "w", encoding="utf-8") as report, \
+            ProcessPoolExecutor(max_workers=max(1, render_workers)) as render_pool:
+
+        def finish(result: ItemResult) -> None:
+            results.append(result)
+            report.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+            report.flush()
+
+        tasks = []
+        for item in items:
+            if item.error:
+                finish(ItemResult(index=item.index, out=item.out, status="error", error=item.error))
+                continue
+            tasks.append(asyncio.ensure_future(_process_item(item, settings, pool, render_pool, options)))
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                finish(await next_done)
+        finally:
+            await pool.aclose()
+
+    return sorted(results, key=lambda r: r.index)
+
+
+def run_batch(
+    manifest_path: str,
+    model: str = AppConfig.model,
+    report_path: Optional[str] = None,
+    llm_workers: int = AppConfig.llm_workers,
+    render_workers: int = AppConfig.render_workers,
+    default_layout: Optional[str] = None,
+    llm_timeout: float = AppConfig.llm_timeout,
+    cache: Optional[LLMCache] = None,
+    refresh: bool = False,
+    options: Optional[RenderOptions] = None,
+    dump_json_dir: Optional[str] = None,
+    from_json_dir: Optional[str] = None,
+    chunk_chars: int = 0,
+    preprocess_input: bool = True,
+    token_budget: Optional[int] = None,
+) -> List[ItemResult]:
+    items = load_manifest(
+        manifest_path,
+        default_layout=default_layout,
+        dump_json_dir=dump_json_dir,
+        from_json_dir=from_json_dir,
+    )
+    if report_path is None:
+        report_path = str(Path(manifest_path).with_suffix(".results.jsonl"))
+
+    settings = _StructureSettings(
+        model=model,
+        cache=cache,
+        refresh=refresh,
+        chunk_chars=chunk_chars,
+        preprocess=preprocess_input,
+        token_budget=token_budget,
+    )
+    # 并发的 LLM 请求共用一个连接池；渲染在独立进程中进行
+    pool = AsyncLLMPool(max_concurrency=max(1, llm_workers), timeout=llm_timeout)
+    return asyncio.run(_run_batch(items, settings, report_path, pool, render_workers, options))
@@ -0,0 +1,138 @@
+"""Offline render benchmark for every layout.
+
+``main.choose_and_structure`` is replaced by a synthetic payload generator, so
+the numbers only cover rendering and saving. Each case runs in a fresh
+process to keep peak RSS per case meaningful.
+
+    python -m benchmarks.bench_layouts --preset small medium --repeat 5
+    python -m benchmarks.bench_layouts --compare benchmarks/results/layouts-abc1234.json
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.harness import default_output, load_results, peak_rss_mb, summarize, write_results
+from benchmarks.synthetic import GENERATORS, PRESETS, FakeLLM, Scale
+
+
+def _run_case(layout: str, scale: Scale, repeat: int, engine: str, lean_text: bool) -> Dict[str, Any]:
+    # 在子进程中执行
+    from pptx import Presentation
+
+    import main
+    from generator.ppt_builder import RenderOptions
+
+    main.choose_and_structure = FakeLLM(layout, scale)
+    options = RenderOptions(engine=engine, lean_text=lean_text)
+    wall: List[float] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        out_file = str(Path(tmp) / f"{layout}.pptx")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                main.run("", model="fake", out_file=out_file, layout=layout, options=options)
+            wall.append(time.perf_counter() - started)
+        prs = Presentation(out_file)
+        shapes = sum(len(slide.shapes) for slide in prs.slides)
+        slides = len(prs.slides)
+        size = Path(out_file).stat().st_size
+    return {
+        # 第一次包含主题加载、原型编译等冷启动开销，单独列出
+        "cold_s": round(wall[0], 6),
+        "wall_s": summarize(wall[1:] or wall),
+        "peak_rss_mb": peak_rss_mb(),
+        "slides": slides,
+        "shapes": shapes,
+        "pptx_bytes": size,
+    }
+
+
+def _case_key(case: Dict[str, Any]) -> tuple:
+    # 引擎与精简模式不参与匹配，便于直接对比不同渲染选项
+    return case["layout"], case["preset"]
+
+
+def run_cases(layouts: List[str], scales: Dict[str, Scale], repeat: int,
+              engine: str, lean_text: bool) -> List[Dict[str, Any]]:
+    context = multiprocessing.get_context("spawn")
+    cases = []
+    for preset, scale in scales.items():
+        for layout in layouts:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                measured = pool.submit(_run_case, layout, scale, repeat, engine, lean_text).result()
+            case = {
+                "layout": layout,
+                "preset": preset,
+                "engine": engine,
+                "lean_text": lean_text,
+                "scale": asdict(scale),
+                "repeat": repeat,
+                **measured,
+            }
+            cases.append(case)
+            print(f"{layout:<15} {preset:<8} median {case['wall_s']['median'] * 1000:8.1f} ms  "
+                  f"rss {case['peak_rss_mb']} MB  shapes {case['shapes']:>5}  {case['pptx_bytes']:>8} B")
+    return cases
+
+
+def print_comparison(cases: List[Dict[str, Any]], baseline_path: Path) -> None:
+    baseline = {_case_key(c): c for c in load_results(baseline_path)["cases"]}
+    print(f"\n对比基线 {baseline_path}:")
+    for case in cases:
+        old = baseline.get(_case_key(case))
+        if old is None:
+            continue
+        before = old["wall_s"]["median"]
+        after = case["wall_s"]["median"]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{case['layout']:<15} {case['preset']:<8} {before * 1000:8.1f} -> {after * 1000:8.1f} ms "
+              f"({change:+.1f}%)  bytes {old['pptx_bytes']} -> {case['pptx_bytes']}")
+
+
+def _scales(args) -> Dict[str, Scale]:
+    scales = {name: PRESETS[name] for name in args.preset}
+    overrides = {
+        field: getattr(args, field)
+        for field in ("slides", "bullets", "text_len", "events", "table_rows", "table_cols")
+        if getattr(args, field) is not None
+    }
+    if overrides:
+        scales = {f"{name}+custom": replace(scale, **overrides) for name, scale in scales.items()}
+    return scales
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Render benchmark with a fake LLM")
+    ap.add_argument("--layout", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    ap.add_argument("--preset", nargs="+", choices=sorted(PRESETS), default=["small", "medium"])
+    ap.add_argument("--slides", type=int, default=None)
+    ap.add_argument("--bullets", type=int, default=None)
+    ap.add_argument("--text-len", dest="text_len", type=int, default=None)
+    ap.add_argument("--events", type=int, default=None)
+    ap.add_argument("--table-rows", dest="table_rows", type=int, default=None)
+    ap.add_argument("--table-cols", dest="table_cols", type=int, default=None)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--engine", choices=("shapes", "clone"), default="shapes")
+    ap.add_argument("--lean-text", action="store_true")
+    ap.add_argument("--out", type=Path, default=None, help="Results JSON (default: benchmarks/results/layouts-<commit>.json)")
+    ap.add_argument("--compare", type=Path, default=None, help="Earlier results JSON to compare medians against")
+    args = ap.parse_args(argv)
+
+    cases = run_cases(args.layout, _scales(args), max(1, args.repeat), args.engine, args.lean_text)
+    path = write_results(args.out or default_output("layouts"), "layouts", cases)
+    print(f"结果已写入: {path}")
+    if args.compare:
+        print_comparison(cases, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Start-up cost of the CLI, measured in fresh interpreters.
+
+Each scenario runs ``python -X importtime`` several times; the report keeps
+the median wall time, the total import time and the heaviest top-level
+imports, and checks the wall time against a budget.
+
+    python -m benchmarks.bench_startup --repeat 10 --enforce
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.harness import ROOT, default_output, summarize, write_results
+
+# 场景 -> (python 参数, 墙钟预算 ms)。预算按普通开发机设定，CI 上可用 --budget-scale 放宽
+SCENARIOS: Dict[str, Tuple[List[str], float]] = {
+    "import_main": (["-c", "import main"], 150.0),
+    "cli_help": (["main.py", "--help"], 200.0),
+    # 首次取某个版式时才导入 python-pptx 与版式模块
+    "first_layout": (["-c", "import main; main.LAYOUT_IMPL['summary']"], 600.0),
+    # openai 客户端在第一次请求时才导入
+    "import_router": (["-c", "import llm_router"], 150.0),
+}
+
+
+def parse_importtime(stderr: str) -> Tuple[float, List[Dict[str, Any]]]:
+    total_us = 0
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        self_us, cumulative_us, name = int(parts[0]), int(parts[1]), parts[2]
+        total_us += self_us
+        if not name.startswith("  "):
+            top_level.append({"module": name.strip(), "cumulative_ms": round(cumulative_us / 1000, 3)})
+    top_level.sort(key=lambda item: item["cumulative_ms"], reverse=True)
+    return total_us / 1000, top_level
+
+
+def measure(args: List[str], repeat: int) -> Dict[str, Any]:
+    wall: List[float] = []
+    import_ms: List[float] = []
+    heaviest: List[Dict[str, Any]] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        wall.append(time.perf_counter() - started)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(args)} failed: {proc.stderr[-500:]}")
+        total, heaviest = parse_importtime(proc.stderr)
+        import_ms.append(total)
+    return {
+        "wall_s": summarize(wall),
+        "import_ms": round(statistics.median(import_ms), 3),
+        "heaviest": heaviest[:10],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="CLI start-up benchmark (-X importtime)")
+    ap.add_argument("--scenario", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--budget-scale", type=float, default=1.0, help="Multiply every budget, e.g. 2.0 on slow CI machines")
+    ap.add_argument("--enforce", action="store_true", help="Exit with status 1 when a scenario is over budget")
+    ap.add_argument("--out", type=Path, default=None, help="Results JSON (default: benchmarks/results/startup-<commit>.json)")
+    args = ap.parse_args(argv)
+
+    cases = []
+    over_budget = []
+    for name in args.scenario:
+        command, budget = SCENARIOS[name]
+        budget *= args.budget_scale
+        case = {"scenario": name, "command": command, "budget_ms": budget, **measure(command, max(1, args.repeat))}
+        median_ms = case["wall_s"]["median"] * 1000
+        case["over_budget"] = median_ms > budget
+        cases.append(case)
+        if case["over_budget"]:
+            over_budget.append(name)
+        heaviest = ", ".join(f"{m['module']} {m['cumulative_ms']:.0f}ms" for m in case["heaviest"][:3])
+        flag = "超出预算" if case["over_budget"] else "ok"
+        print(f"{name:<13} {median_ms:7.1f} ms (预算 {budget:.0f} ms, {flag})  import {case['import_ms']:.1f} ms  [{heaviest}]")
+
+    path = write_results(args.out or default_output("startup"), "startup", cases)
+    print(f"结果已写入: {path}")
+    return 1 if args.enforce and over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
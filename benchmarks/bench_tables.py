@@ -0,0 +1,86 @@
+"""Table building throughput in cells per second.
+
+``per_cell`` is the python-pptx path the timeline used before: ``add_table``
+then text, font, alignment, fill and four border lines set on every cell.
+``bulk`` clones the per-style cell prototypes from ``generator.tables`` onto
+one slide; ``paged`` runs ``add_table_pages``, which also measures every row
+and splits the table across continuation slides.
+
+    python -m benchmarks.bench_tables --rows 50 200 500 --cols 4 --repeat 5
+"""
+import argparse
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.harness import default_output, summarize, write_results
+
+
+def make_rows(rows: int, cols: int) -> List[List[str]]:
+    return [[f"第{r}行第{c}列：" + "政策细则" * (1 + (r + c) % 4) for c in range(cols)] for r in range(rows)]
+
+
+def measure(rows: int, cols: int, repeat: int) -> List[Dict[str, Any]]:
+    from pptx.util import Inches
+
+    from generator import skeleton, tables
+    from generator.options import RenderOptions
+    from generator.ppt_builder import load_theme, new_presentation
+
+    theme = load_theme()
+    options = RenderOptions(engine="clone")
+    style = tables.TableStyle()
+    headers = [f"列{c + 1}" for c in range(cols)]
+    body = make_rows(rows, cols)
+    cells = (rows + 1) * cols
+    box = (Inches(0.6), Inches(1.8), Inches(12.1), Inches(5.1))
+
+    def per_cell():
+        prs = new_presentation(theme)
+        table = prs.slides.add_slide(prs.slide_layouts[6]).shapes.add_table(rows + 1, cols, *box).table
+        for r, values in enumerate([headers] + body):
+            for c, value in enumerate(values):
+                tables._style_cell(table.cell(r, c), value, theme, options, style, header=r == 0)
+
+    def bulk():
+        prs = new_presentation(theme)
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        tables.table_builder(theme, options, style).add(skeleton.SlideCloner(slide), *box, headers, body)
+
+    def paged():
+        tables.add_table_pages(new_presentation(theme), "数据表", headers, body, theme, options, style)
+
+    results = []
+    for stage, run in (("per_cell", per_cell), ("bulk", bulk), ("paged", paged)):
+        run()   # 预热：原型、字宽表
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            samples.append(cells / (time.perf_counter() - started))
+        results.append({"rows": rows, "cols": cols, "stage": stage, "cells_per_s": summarize(samples)})
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Table building throughput benchmark")
+    ap.add_argument("--rows", nargs="+", type=int, default=[50, 200, 500])
+    ap.add_argument("--cols", type=int, default=4)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", type=str, default=None, help="Results JSON (default: benchmarks/results/tables-<commit>.json)")
+    args = ap.parse_args(argv)
+
+    cases = []
+    for rows in args.rows:
+        results = measure(max(1, rows), max(1, args.cols), max(1, args.repeat))
+        cases.extend(results)
+        print(f"{rows:>5} 行 x {args.cols} 列  " + "  ".join(
+            f"{r['stage']} {r['cells_per_s']['median']:10.0f} 格/秒" for r in results))
+
+    path = write_results(args.out or default_output("tables"), "tables", cases)
+    print(f"结果已写入: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
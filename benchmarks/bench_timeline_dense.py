@@ -0,0 +1,89 @@
+"""Dense timeline: lane solver and full render cost per event.
+
+``solver`` times ``_dense_pages`` alone (axis positions, sweep-line lane
+assignment and the page split); ``render`` times ``timeline.render`` with
+``timeline_mode="dense"`` and the clone engine. Dates are generated with
+clustered gaps so the date-scaled axis actually produces collisions.
+
+    python -m benchmarks.bench_timeline_dense --events 50 100 200 500 --repeat 5
+"""
+import argparse
+import datetime
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.harness import default_output, summarize, write_results
+
+
+def make_timeline(events: int, seed: int = 0):
+    from llm_router import _validate_routed
+
+    rnd = random.Random(seed)
+    day = datetime.date(2020, 1, 1)
+    items = []
+    for i in range(events):
+        # 大多数事件挨得很近，偶尔隔几个月，模拟真实报道的疏密
+        day += datetime.timedelta(days=rnd.choice((1, 1, 2, 3, 7, 30, 90)))
+        items.append({"date": day.isoformat(), "headline": f"事件{i}：监管部门发布新的配套细则", "detail": None})
+    return _validate_routed({"layout": "timeline", "slides": [{"title": "密集时间线", "events": items}]}, "timeline")
+
+
+def measure(events: int, by_date: bool, repeat: int) -> List[Dict[str, Any]]:
+    from pptx.util import Inches
+
+    from generator.layouts import timeline
+    from generator.options import RenderOptions
+    from generator.ppt_builder import load_theme, new_presentation
+
+    theme = load_theme()
+    routed = make_timeline(events)
+    dates = [ev.date for ev in routed.slides[0].events]
+    label_w = Inches(1.45)
+    left, right = Inches(0.6), Inches(12.733 - 0.35)
+
+    solver, render, pages = [], [], 0
+    options = RenderOptions(engine="clone", timeline_mode="dense", timeline_by_date=by_date)
+    timeline.render(new_presentation(theme), routed, theme, options)   # 预热：原型、字宽表
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = timeline._dense_pages(dates, left + label_w // 2, right - label_w // 2, by_date,
+                                       label_w, left, right, 3, Inches(0.08))
+        solver.append((time.perf_counter() - started) / events * 1e6)
+        pages = len(result)
+
+        prs = new_presentation(theme)
+        started = time.perf_counter()
+        timeline.render(prs, routed, theme, options)
+        render.append((time.perf_counter() - started) / events * 1e6)
+
+    axis = "date" if by_date else "even"
+    return [
+        {"events": events, "axis": axis, "stage": "solver", "pages": pages, "per_event_us": summarize(solver)},
+        {"events": events, "axis": axis, "stage": "render", "pages": pages, "per_event_us": summarize(render)},
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Dense timeline lane-solver benchmark")
+    ap.add_argument("--events", nargs="+", type=int, default=[50, 100, 200, 500])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", type=str, default=None, help="Results JSON (default: benchmarks/results/timeline_dense-<commit>.json)")
+    args = ap.parse_args(argv)
+
+    cases = []
+    for events in args.events:
+        for by_date in (False, True):
+            solver, render = measure(max(3, events), by_date, max(1, args.repeat))
+            cases.extend((solver, render))
+            print(f"{events:>5} 事件  {solver['axis']:<4}  {solver['pages']:>3} 页  "
+                  f"排布 {solver['per_event_us']['median']:8.1f} us/事件  渲染 {render['per_event_us']['median']:8.1f} us/事件")
+
+    path = write_results(args.out or default_output("timeline_dense"), "timeline_dense", cases)
+    print(f"结果已写入: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Per-slide cost of turning model JSON into something a layout can render.
+
+``dict`` is the previous hand-off: validate into the pydantic model, dump it
+back to dicts and let the layout read those dicts again the way the layouts
+used to (``.get`` per field, bullets re-cleaned, strings stripped again).
+``typed`` is the current one: a single cached ``TypeAdapter`` pass whose
+result the layout reads by attribute. Both use the same validators, so the
+difference is the dump and the second walk.
+
+    python -m benchmarks.bench_validate --preset small large --repeat 20
+"""
+import argparse
+import copy
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.harness import default_output, summarize, write_results
+from benchmarks.synthetic import GENERATORS, PRESETS, make_raw_payload
+
+
+def _strip_all(items: Any) -> List[str]:
+    return [str(item).strip() for item in (items or []) if str(item).strip()]
+
+
+# 旧版式读 dict 的方式：逐字段 .get、列表重新清洗、字符串再 strip 一遍
+def _read_news_dict(slide: dict) -> int:
+    count = len((slide.get("header_title") or slide.get("title", "")).strip())
+    count += len(str(slide.get("brand_tag", "") or ""))
+    summary = slide.get("summary", {}) or {}
+    count += len(summary.get("label", "")) + len(_strip_all(summary.get("bullets"))[:6])
+    for side in ("left", "right"):
+        column = slide.get(side, {}) or {}
+        count += len(column.get("title", ""))
+        for section in column.get("sections", []) or []:
+            count += len(section.get("subtitle_bold", "")) + len(_strip_all(section.get("bullets"))[:6])
+    return count
+
+
+def _read_timeline_dict(slide: dict) -> int:
+    count = len(slide.get("title") or slide.get("header_title") or slide.get("heading") or "")
+    for event in (slide.get("events") or [])[:8]:
+        count += len((event.get("date") or "").strip()) + len((event.get("headline") or "").strip())
+        count += len((event.get("detail") or "").strip())
+    analysis = slide.get("analysis") or {}
+    count += len(_strip_all(analysis.get("table_headers"))[:4])
+    count += sum(len(_strip_all(row)) for row in (analysis.get("table_rows") or []) if isinstance(row, list))
+    return count + len(_strip_all(analysis.get("key_points"))[:5])
+
+
+def _read_news_typed(slide: Any) -> int:
+    count = len(slide.header_title) + len(slide.brand_tag or "")
+    count += len(slide.summary.label) + len(slide.summary.bullets)
+    for column in (slide.left, slide.right):
+        count += len(column.title)
+        for section in column.sections:
+            count += len(section.subtitle_bold) + len(section.bullets)
+    return count
+
+
+def _read_timeline_typed(slide: Any) -> int:
+    count = len(slide.title or slide.header_title or slide.heading or "")
+    for event in slide.events[:8]:
+        count += len(event.date) + len(event.headline) + len(event.detail or "")
+    analysis = slide.analysis
+    if analysis:
+        count += len(analysis.table_headers or []) + len(analysis.key_points or [])
+        count += sum(len(row) for row in analysis.table_rows or [])
+    return count
+
+
+def _read_summary_dict(slide: dict) -> int:
+    return len(slide["title"]) + len(slide["bullets"])
+
+
+def _read_image_dict(slide: dict) -> int:
+    return len(slide["title"]) + len(slide.get("hero_image") or "") + len(slide.get("caption") or "")
+
+
+def _read_summary_typed(slide: Any) -> int:
+    return len(slide.title) + len(slide.bullets)
+
+
+def _read_image_typed(slide: Any) -> int:
+    return len(slide.title) + len(slide.hero_image or "") + len(slide.caption or "")
+
+
+DICT_READERS = {"news_report": _read_news_dict, "timeline": _read_timeline_dict,
+                "summary": _read_summary_dict, "image_headline": _read_image_dict}
+TYPED_READERS = {"news_report": _read_news_typed, "timeline": _read_timeline_typed,
+                 "summary": _read_summary_typed, "image_headline": _read_image_typed}
+
+
+def _dict_pipeline(layout: str, slides: List[dict]) -> int:
+    from llm_router import slide_validators
+
+    adapter = slide_validators()[layout]
+    read = DICT_READERS[layout]
+    return sum(read(adapter.validate_python(slide).model_dump(mode="python")) for slide in slides)
+
+
+def _typed_pipeline(layout: str, slides: List[dict]) -> int:
+    from llm_router import slide_validators
+
+    adapter = slide_validators()[layout]
+    read = TYPED_READERS[layout]
+    return sum(read(adapter.validate_python(slide)) for slide in slides)
+
+
+PIPELINES = {"dict": _dict_pipeline, "typed": _typed_pipeline}
+
+
+def measure(layout: str, preset: str, repeat: int) -> List[Dict[str, Any]]:
+    slides = make_raw_payload(layout, PRESETS[preset])["slides"]
+    cases = []
+    for name, pipeline in PIPELINES.items():
+        pipeline(layout, copy.deepcopy(slides))   # 预热：导入 pydantic、编译校验器
+        samples = []
+        for _ in range(repeat):
+            payload = copy.deepcopy(slides)
+            started = time.perf_counter()
+            pipeline(layout, payload)
+            samples.append((time.perf_counter() - started) / len(slides) * 1e6)
+        cases.append({"layout": layout, "preset": preset, "pipeline": name, "slides": len(slides),
+                      "repeat": repeat, "per_slide_us": summarize(samples)})
+    return cases
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Validation micro-benchmark: dict round-trip vs typed models")
+    ap.add_argument("--layout", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    ap.add_argument("--preset", nargs="+", choices=sorted(PRESETS), default=["small", "large"])
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--out", type=str, default=None, help="Results JSON (default: benchmarks/results/validate-<commit>.json)")
+    args = ap.parse_args(argv)
+
+    cases = []
+    for preset in args.preset:
+        for layout in args.layout:
+            measured = {c["pipeline"]: c for c in measure(layout, preset, max(1, args.repeat))}
+            cases.extend(measured.values())
+            before = measured["dict"]["per_slide_us"]["median"]
+            after = measured["typed"]["per_slide_us"]["median"]
+            change = (after - before) / before * 100 if before else 0.0
+            print(f"{layout:<15} {preset:<8} dict {before:8.1f} us/页 -> typed {after:8.1f} us/页 ({change:+.1f}%)")
+
+    path = write_results(args.out or default_output("validate"), "validate", cases)
+    print(f"结果已写入: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from llm_router import RoutedContent, _validate_routed
+
+# 离线基准用的合成数据：按固定种子生成，与 LLM 返回的结构完全一致，
+# 同一组参数在任何机器、任何提交上都得到相同的内容。
+
+_CHARS = (
+    "政府宣布新政策市场反应迅速企业调整战略投资者关注风险国际合作加强监管"
+    "经济增长放缓科技行业发展供应链安全能源转型消费者信心数据显示同比上升"
+)
+
+
+@dataclass(frozen=True)
+class Scale:
+    slides: int = 1
+    bullets: int = 3        # news_report 每个小节 / 摘要、summary 的要点数
+    text_len: int = 24      # 每条要点的字数
+    events: int = 6         # timeline 事件数
+    table_rows: int = 4
+    table_cols: int = 3
+
+
+PRESETS: Dict[str, Scale] = {
+    "small": Scale(),
+    "medium": Scale(slides=5, bullets=5, text_len=40, events=8, table_rows=6, table_cols=4),
+    "large": Scale(slides=20, bullets=6, text_len=80, events=8, table_rows=6, table_cols=4),
+}
+
+
+class _Text:
+    def __init__(self, seed: int):
+        self._rng = random.Random(seed)
+
+    def words(self, length: int) -> str:
+        return "".join(self._rng.choice(_CHARS) for _ in range(max(1, length)))
+
+    def bullet(self, length: int) -> str:
+        # 约一半要点带「标签：说明」结构，覆盖 news_report 的加粗前缀分支
+        if length >= 8 and self._rng.random() < 0.5:
+            label = max(2, length // 6)
+            return f"{self.words(label)}：{self.words(length - label - 1)}"
+        return self.words(length)
+
+
+def _news_report(text: _Text, scale: Scale) -> List[Dict[str, Any]]:
+    def section():
+        return {
+            "subtitle_bold": text.words(6),
+            "bullets": [text.bullet(scale.text_len) for _ in range(scale.bullets)],
+        }
+
+    def column():
+        return {"title": text.words(6), "sections": [section(), section()]}
+
+    return [
+        {
+            "header_title": text.words(16),
+            "brand_tag": text.words(4),
+            "summary": {
+                "label": "洞察启示",
+                "bullets": [text.bullet(scale.text_len) for _ in range(scale.bullets)],
+            },
+            "left": column(),
+            "right": column(),
+            "references": None,
+        }
+        for _ in range(scale.slides)
+    ]
+
+
+def _timeline(text: _Text, scale: Scale) -> List[Dict[str, Any]]:
+    slides = []
+    for _ in range(scale.slides):
+        events = [
+            {
+                "date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                "headline": text.words(max(6, scale.text_len // 2)),
+                "detail": text.words(scale.text_len),
+            }
+            for i in range(scale.events)
+        ]
+        headers = [text.words(4) for _ in range(scale.table_cols)]
+        rows = [[text.words(8) for _ in range(scale.table_cols)] for _ in range(scale.table_rows)]
+        slides.append({
+            "title": text.words(10),
+            "header_title": None,
+            "heading": None,
+            "events": events,
+            "analysis": {
+                "table_headers": headers,
+                "table_rows": rows,
+                "key_points": [text.bullet(scale.text_len) for _ in range(scale.bullets)],
+            },
+        })
+    return slides
+
+
+def _summary(text: _Text, scale: Scale) -> List[Dict[str, Any]]:
+    return [
+        {"title": text.words(12), "bullets": [text.bullet(scale.text_len) for _ in range(scale.bullets)]}
+        for _ in range(scale.slides)
+    ]
+
+
+def _image_headline(text: _Text, scale: Scale) -> List[Dict[str, Any]]:
+    # 不引用图片文件，只测文字部分；图片流水线另行测量
+    return [
+        {"title": text.words(12), "hero_image": None, "caption": text.words(scale.text_len)}
+        for _ in range(scale.slides)
+    ]
+
+
+GENERATORS: Dict[str, Callable[[_Text, Scale], List[Dict[str, Any]]]] = {
+    "news_report": _news_report,
+    "timeline": _timeline,
+    "summary": _summary,
+    "image_headline": _image_headline,
+}
+
+
+def make_raw_payload(layout: str, scale: Scale = Scale(), seed: int = 0) -> Dict[str, Any]:
+    # 与模型返回的 JSON 相同：未经校验的 dict
+    if layout not in GENERATORS:
+        raise ValueError(f"no synthetic generator for layout {layout!r}")
+    return {"layout": layout, "slides": GENERATORS[layout](_Text(seed), scale)}
+
+
+def make_payload(layout: str, scale: Scale = Scale(), seed: int = 0) -> RoutedContent:
+    # 与 choose_and_structure 的返回值相同：校验后的模型
+    return _validate_routed(make_raw_payload(layout, scale, seed), layout)
+
+
+class FakeLLM:
+    """Drop-in replacement for ``choose_and_structure`` that returns a
+    synthetic payload instead of calling the API."""
+
+    def __init__(self, layout: str, scale: Scale = Scale(), seed: int = 0):
+        self.layout = layout
+        self.scale = scale
+        self.seed = seed
+        self.calls = 0
+
+    def __call__(self, news_text: str, model: str, forced_layout: Optional[str] = None,
+                 cache=None, refresh: bool = False, **_: Any) -> RoutedContent:
+        self.calls += 1
+        return make_payload(forced_layout or self.layout, self.scale, self.seed)
@@ -4,3 +4,18 @@ from dataclasses import dataclass
 class AppConfig:
     model: str = "o4-mini"         # 或其它可用模型
     out_file: str = "out.pptx"     # 输出文件名
+    llm_workers: int = 8           # 批量模式下并发的 LLM 请求数
+    render_workers: int = 4        # 批量模式下渲染进程数
+    llm_timeout: float = 120.0     # 单次 LLM 请求超时（秒）
+    cache_dir: str = ".cache/llm"  # 结构化结果缓存目录
+    cache_max_mb: int = 256        # 缓存总大小上限，超出后按 LRU 淘汰
+    cache_max_age_hours: float = 168.0
+    chunk_chars: int = 0           # 超过该字数的正文分块并行结构化后合并（默认 0 关闭，--chunk-chars 开启）
+    image_dpi: int = 150           # 头图按显示宽度缩放到的 DPI（0 原样嵌入）
+    image_quality: int = 85        # 头图重新压缩的 JPEG 质量
+    image_cache_dir: str = ".cache/images"  # 头图派生图缓存目录
+    fetch_cache_dir: str = ".cache/fetch"   # 远程头图下载缓存目录
+    fetch_connections: int = 8     # 同时下载的头图数
+    fetch_timeout: float = 15.0    # 单张头图下载超时（秒）
+    fetch_max_mb: int = 20         # 单张头图大小上限
+    zip_level: int = 6             # 输出 .pptx 的压缩级别（0 不压缩，9 最小）
@@ -0,0 +1,65 @@
+import os
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple, TypeVar
+
+import yaml
+
+T = TypeVar("T")
+
+Stamp = Tuple[Tuple[str, Optional[int]], ...]
+
+
+def freeze(value: Any) -> Any:
+    # 解析结果在进程内共享，转换成只读结构以免被调用方意外修改
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def read_yaml(path: Path) -> Any:
+    with open(path, "r", encoding="utf-8") as stream:
+        return yaml.safe_load(stream)
+
+
+def _stamp(paths: Sequence[Path]) -> Stamp:
+    stamps = []
+    for path in paths:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        stamps.append((str(path), mtime))
+    return tuple(stamps)
+
+
+class ConfigRegistry:
+    """Parses config files once and serves the compiled result until one of
+    the source files changes on disk (mtime check on every lookup)."""
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[Stamp, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, paths: Sequence[Path], loader: Callable[[], T]) -> T:
+        stamp = _stamp(paths)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                return entry[1]
+            value = loader()
+            self._entries[key] = (stamp, value)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+REGISTRY = ConfigRegistry()
@@ -1,218 +1,243 @@
 ﻿from __future__ import annotations
 
-from typing import List, Optional
+import re
+from typing import Annotated, Any, List, Optional
 
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    ConfigDict,
+    Field,
+    StringConstraints,
+    ValidationInfo,
+    field_validator,
+    model_validator,
+)
 
+# 补全/规整逻辑都在 validator 里完成，一次校验即得到可直接渲染的模型。
+# 去空白、非空、数量上下限尽量用 pydantic-core 的原生约束，少回调 Python。
+# 调用方可以传 context={"stats": Counter()} 统计被补全或截断的字段数。
 
-class Reference(BaseModel):
-    label: str
-    url: Optional[str] = None
+PLACEHOLDER = "待补充"
 
-    @field_validator("label")
-    @classmethod
-    def _label_not_empty(cls, value: str) -> str:
-        if not value or not value.strip():
-            raise ValueError("reference.label must be a non-empty string")
-        return value.strip()
 
-    @field_validator("url")
-    @classmethod
-    def _trim_url(cls, value: Optional[str]) -> Optional[str]:
-        if value is None:
-            return None
-        trimmed = value.strip()
-        return trimmed or None
+def _note_coerced(info: ValidationInfo, count: int = 1) -> None:
+    stats = (info.context or {}).get("stats") if isinstance(info.context, dict) else None
+    if stats is not None:
+        stats["coerced_fields"] += count
 
 
-class Summary(BaseModel):
-    label: str
-    bullets: List[str]
+# 英文句点只在后跟空白或结尾时算断句（同 text_chunks._SENTENCE_END），
+# "5.2%"、网址、"v1.2" 之类不拆开
+_LIST_SPLIT = re.compile(r"[；;。\n]+|(?<=[^\d\s])\.+(?=\s|$)")
 
-    @field_validator("label")
-    @classmethod
-    def _label_not_empty(cls, value: str) -> str:
-        if not value or not value.strip():
-            raise ValueError("summary.label must be a non-empty string")
-        return value.strip()
 
-    @field_validator("bullets")
-    @classmethod
-    def _validate_bullets(cls, bullets: List[str]) -> List[str]:
-        cleaned = [b.strip() for b in bullets if b and b.strip()]
-        if not (3 <= len(cleaned) <= 6):
-            raise ValueError("summary.bullets must contain between 3 and 6 non-empty entries")
-        return cleaned
+def _as_list(value: Any) -> Any:
+    # 模型偶尔把要点写成一段文字，按分号/句号/换行拆开
+    if value is None:
+        return []
+    if isinstance(value, str):
+        parts = _LIST_SPLIT.split(value)
+        return [p.strip(" 、，, ") for p in parts if p and p.strip()]
+    return value
 
 
-class Section(BaseModel):
-    subtitle_bold: str
-    bullets: List[str]
+def _text_or(value: Any, default: str, info: ValidationInfo) -> Any:
+    if isinstance(value, str) and value.strip():
+        return value
+    text = "" if value is None else str(value).strip()
+    if not text:
+        _note_coerced(info)
+        return default
+    return text
 
-    @field_validator("subtitle_bold")
-    @classmethod
-    def _subtitle_not_empty(cls, value: str) -> str:
-        if not value or not value.strip():
-            raise ValueError("section.subtitle_bold must be a non-empty string")
-        return value.strip()
 
-    @field_validator("bullets")
-    @classmethod
-    def _section_bullets(cls, bullets: List[str]) -> List[str]:
-        cleaned = [b.strip() for b in bullets if b and b.strip()]
-        if len(cleaned) < 3:
-            raise ValueError("section.bullets should contain at least three items")
-        return cleaned[:6]
+def _pad_bullets(bullets: List[str], info: ValidationInfo) -> List[str]:
+    # 不足 3 条时重复最后一条补齐（全空时用占位文字）；条数多时不截断，由布局分页
+    if len(bullets) >= 3:
+        return bullets
+    _note_coerced(info)
+    bullets = bullets or [PLACEHOLDER]
+    while len(bullets) < 3:
+        bullets.append(bullets[-1])
+    return bullets
 
 
-class Column(BaseModel):
-    title: str
-    sections: List[Section]
+def _none_if_empty(value: Optional[str]) -> Optional[str]:
+    return value or None
 
-    @field_validator("title")
-    @classmethod
-    def _title_not_empty(cls, value: str) -> str:
-        if not value or not value.strip():
-            raise ValueError("column.title must be a non-empty string")
-        return value.strip()
 
-    @field_validator("sections")
-    @classmethod
-    def _min_sections(cls, sections: List[Section]) -> List[Section]:
-        if len(sections) < 2:
-            raise ValueError("each column must include at least two sections")
-        return sections
+def _non_empty(items: List[str]) -> List[str]:
+    return [item for item in items if item]
 
 
-class NewsReportSlide(BaseModel):
-    header_title: str
-    brand_tag: Optional[str] = None
-    summary: Summary
-    left: Column
-    right: Column
-    references: Optional[List[Reference]] = None
+Text = Annotated[str, StringConstraints(strip_whitespace=True)]
+RequiredText = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+OptionalText = Optional[Annotated[str, StringConstraints(strip_whitespace=True), AfterValidator(_none_if_empty)]]
+TextList = Annotated[List[Text], AfterValidator(_non_empty)]
 
-    @field_validator("header_title")
-    @classmethod
-    def _header_not_empty(cls, value: str) -> str:
-        if not value or not value.strip():
-            raise ValueError("header_title must be a non-empty string")
-        return value.strip()
 
+class _Schema(BaseModel):
+    # 模型把数字写成数值（年份、表格里的金额）时直接转成字符串
+    model_config = ConfigDict(coerce_numbers_to_str=True)
 
-class TimelineEvent(BaseModel):
-    date: str = Field(..., description="Time label displayed on the fishbone spine")
-    headline: str
-    detail: Optional[str] = None
 
-    @field_validator("date")
-    @classmethod
-    def _date_not_empty(cls, value: str) -> str:
-        if not value or not value.strip():
-            raise ValueError("timeline event date must be provided")
-        return value.strip()
+class Reference(_Schema):
+    label: RequiredText
+    url: OptionalText = None
+
+
+class Summary(_Schema):
+    label: RequiredText
+    bullets: TextList
 
-    @field_validator("headline")
+    @field_validator("bullets", mode="before")
     @classmethod
-    def _headline_not_empty(cls, value: str) -> str:
-        if not value or not value.strip():
-            raise ValueError("timeline event headline must be a non-empty string")
-        return value.strip()
+    def _split_text(cls, value: Any) -> Any:
+        return _as_list(value)
 
-    @field_validator("detail")
+    @field_validator("bullets")
     @classmethod
-    def _detail_trim(cls, value: Optional[str]) -> Optional[str]:
-        if value is None:
-            return None
-        trimmed = value.strip()
-        return trimmed or None
+    def _validate_bullets(cls, bullets: List[str], info: ValidationInfo) -> List[str]:
+        return _pad_bullets(bullets, info)
 
 
-class TimelineAnalysis(BaseModel):
-    table_headers: Optional[List[str]] = None
-    table_rows: Optional[List[List[str]]] = None
-    key_points: Optional[List[str]] = None
+class Section(_Schema):
+    subtitle_bold: RequiredText
+    bullets: TextList
 
-    @field_validator("table_headers")
+    @field_validator("bullets", mode="before")
     @classmethod
-    def _clean_headers(cls, headers: Optional[List[str]]) -> Optional[List[str]]:
-        if not headers:
-            return None
-        cleaned = [h.strip() for h in headers if h and h.strip()]
-        return cleaned[:4] or None
+    def _split_text(cls, value: Any) -> Any:
+        return _as_list(value)
 
-    @field_validator("table_rows")
+    @field_validator("bullets")
     @classmethod
-    def _clean_rows(cls, rows: Optional[List[List[str]]]) -> Optional[List[List[str]]]:
-        if not rows:
-            return None
-        cleaned: list[list[str]] = []
-        for row in rows:
-            if not isinstance(row, list):
-                continue
-            cells = [str(c).strip() for c in row]
-            if any(cells):
-                cleaned.append(cells)
-        return cleaned[:6] or None
+    def _section_bullets(cls, bullets: List[str], info: ValidationInfo) -> List[str]:
+        return _pad_bullets(bullets, info)
 
-    @field_validator("key_points")
-    @classmethod
-    def _clean_points(cls, points: Optional[List[str]]) -> Optional[List[str]]:
-        if not points:
-            return None
-        cleaned = [p.strip() for p in points if p and p.strip()]
-        return cleaned[:6] or None
+
+class Column(_Schema):
+    title: RequiredText
+    sections: List[Section] = Field(..., min_length=2)
+
+
+class NewsReportSlide(_Schema):
+    header_title: RequiredText
+    brand_tag: OptionalText = None
+    summary: Summary
+    left: Column
+    right: Column
+    references: Optional[List[Reference]] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _fill_missing(cls, data: Any, info: ValidationInfo) -> Any:
+        # 每列至少两个小节（不足时用摘要要点补一节），小节标题/列标题缺失时补默认值；
+        # 要点条数的补齐在 Summary/Section 的 validator 里
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        summary = data.get("summary")
+        summary = summary if isinstance(summary, dict) else {}
+        data["summary"] = summary
+        for side, label in (("left", "左列"), ("right", "右列")):
+            column = dict(data[side]) if isinstance(data.get(side), dict) else {}
+            sections = [sec for sec in (column.get("sections") or []) if isinstance(sec, dict)]
+            while len(sections) < 2:
+                _note_coerced(info)
+                filler = [b.strip() for b in _as_list(summary.get("bullets")) if b.strip()]
+                sections.append({"subtitle_bold": f"{label}补充{len(sections) + 1}", "bullets": filler[:3]})
+            for idx, section in enumerate(sections):
+                if not section.get("subtitle_bold"):
+                    _note_coerced(info)
+                    sections[idx] = {**section, "subtitle_bold": f"{label}要点{idx + 1}"}
+            column["sections"] = sections
+            if not column.get("title"):
+                _note_coerced(info)
+                column["title"] = f"{label}要点"
+            data[side] = column
+        return data
+
+
+class TimelineEvent(_Schema):
+    date: RequiredText = Field(..., description="Time label displayed on the fishbone spine")
+    headline: RequiredText
+    detail: OptionalText = None
+
+
+class TimelineAnalysis(_Schema):
+    table_headers: Optional[TextList] = None
+    table_rows: Optional[List[List[Text]]] = None
+    key_points: Optional[TextList] = None
+
+    @field_validator("key_points", mode="before")
+    @classmethod
+    def _split_points(cls, value: Any) -> Any:
+        return _as_list(value)
 
     @model_validator(mode="after")
-    def _align_rows(self) -> "TimelineAnalysis":
-        headers = self.table_headers or []
-        width = len(headers) if headers else 0
-        if self.table_rows:
-            aligned: list[list[str]] = []
-            for row in self.table_rows:
-                if width:
-                    padded = row + [""] * max(0, width - len(row))
-                    aligned.append(padded[:width])
-                else:
-                    aligned.append(row)
-            self.table_rows = aligned
+    def _trim_and_align(self) -> "TimelineAnalysis":
+        # 要点最多 6 条；表格行列不设上限（分析区放不下的行由时间线布局分到续页），
+        # 数据行按表头宽度补齐/截断
+        self.table_headers = self.table_headers or None
+        self.key_points = (self.key_points or [])[:6] or None
+        width = len(self.table_headers or ())
+        rows = [row for row in (self.table_rows or ()) if any(row)]
+        if width:
+            rows = [(row + [""] * (width - len(row)))[:width] for row in rows]
+        self.table_rows = rows or None
         return self
 
 
-class TimelineSlide(BaseModel):
-    title: Optional[str] = None
-    header_title: Optional[str] = None
-    heading: Optional[str] = None
-    events: List[TimelineEvent]
+class TimelineSlide(_Schema):
+    title: OptionalText = None
+    header_title: OptionalText = None
+    heading: OptionalText = None
+    events: List[TimelineEvent] = Field(..., min_length=3)
     analysis: Optional[TimelineAnalysis] = None
 
-    @field_validator("events")
+    @model_validator(mode="before")
     @classmethod
-    def _event_count(cls, events: List[TimelineEvent]) -> List[TimelineEvent]:
-        if not (3 <= len(events) <= 8):
-            raise ValueError("timeline slides require between 3 and 8 events")
-        return events
+    def _fill_events(cls, data: Any, info: ValidationInfo) -> Any:
+        # 缺日期/标题的事件补占位文字；事件多时全部保留，时间线布局会分成续页
+        if not isinstance(data, dict):
+            return data
+        events = []
+        for idx, event in enumerate((data.get("events") or []), start=1):
+            if not isinstance(event, dict):
+                continue
+            date = _text_or(event.get("date"), f"日期缺失-事件{idx}", info)
+            headline = _text_or(event.get("headline"), f"事件{idx}", info)
+            detail = event.get("detail")
+            if date is not event.get("date") or headline is not event.get("headline") or not (
+                    detail is None or isinstance(detail, str)):
+                event = {**event, "date": date, "headline": headline,
+                         "detail": None if detail is None else str(detail)}
+            events.append(event)
+        if not events:
+            return data
+        return {**data, "events": events}
 
 
-class RoutedNewsReport(BaseModel):
-    layout: str
-    slides: List[NewsReportSlide]
+class SummarySlide(_Schema):
+    title: RequiredText
+    bullets: TextList
 
-    @field_validator("layout")
+    @field_validator("bullets", mode="before")
     @classmethod
-    def _layout_match(cls, value: str) -> str:
-        if value != "news_report":
-            raise ValueError("RoutedNewsReport expects layout='news_report'")
-        return value
+    def _split_text(cls, value: Any) -> Any:
+        return _as_list(value)
 
+    @field_validator("bullets")
+    @classmethod
+    def _bullets_not_empty(cls, bullets: List[str]) -> List[str]:
+        if not bullets:
+            raise ValueError("summary slides require at least one non-empty bullet")
+        return bullets
 
-class RoutedTimeline(BaseModel):
-    layout: str
-    slides: List[TimelineSlide]
 
-    @field_validator("layout")
-    @classmethod
-    def _layout_match(cls, value: str) -> str:
-        if value != "timeline":
-            raise ValueError("RoutedTimeline expects layout='timeline'")
-        return value
+class ImageHeadlineSlide(_Schema):
+    title: RequiredText
+    hero_image: OptionalText = Field(None, description="Local path or URL of the hero image")
+    caption: OptionalText = None
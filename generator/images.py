@@ -0,0 +1,196 @@
+import hashlib
+import io
+import math
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .options import RenderOptions
+
+# 头图预处理：按显示宽度和目标 DPI 缩小、重新压缩后再交给 add_picture，
+# 避免把 5–20 MB 的原图整张嵌进演示文稿。派生图以（原图内容哈希 + 参数）为键
+# 缓存在磁盘上，跨幻灯片、跨演示文稿复用；同一份演示文稿里相同的图只嵌入一次
+# （python-pptx 按 SHA1 去重图片部件，而派生结果对同一输入是确定的）。
+
+DERIVATIVE_VERSION = 1
+EMU_PER_INCH = 914400
+
+
+def derivative_key(digest: str, max_width: int, quality: int) -> str:
+    return hashlib.sha256(f"v{DERIVATIVE_VERSION}\0{digest}\0{max_width}\0{quality}".encode()).hexdigest()
+
+
+def display_pixels(width_emu: int, dpi: int) -> int:
+    return max(1, int(round(width_emu / EMU_PER_INCH * dpi)))
+
+
+class DerivativeCache:
+    """Content-addressed on-disk cache of processed images, written
+    atomically like :class:`llm_cache.LLMCache`. Keys already include the
+    source hash, so entries never go stale; hits bump the mtime and the
+    least recently used files are evicted above ``max_bytes``. Like
+    ``LLMCache``, the first write scans the directory and later writes evict
+    as soon as the tracked size exceeds the limit."""
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024, evict_every: int = 64):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.evict_every = max(1, evict_every)
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.img"
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if self._size is None:
+            self.evict()
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".img")
+        try:
+            with os.fdopen(fd, "wb") as stream:
+                stream.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.stores += 1
+        self._size += len(data) - replaced
+        if self._size > self.max_bytes or self.stores % self.evict_every == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        entries: List[Tuple[Path, os.stat_result]] = []
+        for path in self.directory.glob("*/*.img"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        total = sum(stat.st_size for _, stat in entries)
+        removed = 0
+        entries.sort(key=lambda item: item[1].st_mtime)
+        for path, stat in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= stat.st_size
+        self._size = total
+        self.evictions += removed
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores, "evictions": self.evictions}
+
+
+def _keeps_alpha(im) -> bool:
+    return im.mode in ("RGBA", "LA", "PA", "P", "1") or "transparency" in im.info
+
+
+def downscale(data: bytes, max_width: int, quality: int) -> bytes:
+    """Decode, apply EXIF orientation, shrink to at most ``max_width``
+    pixels wide and re-encode (JPEG, or PNG for images with transparency or
+    a palette). Returns ``data`` unchanged when that would not make it
+    smaller or the image cannot be decoded."""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as im:
+            if getattr(im, "is_animated", False):
+                return data
+            # 方向 5–8 表示存储时转了 90°，显示宽度是存储高度
+            rotated = im.getexif().get(0x0112, 1) in (5, 6, 7, 8)
+            shown_width = im.height if rotated else im.width
+            scale = min(1.0, max_width / shown_width)
+            if scale < 1.0 and im.format == "JPEG":
+                # JPEG 可在 DCT 阶段按 1/2、1/4、1/8 解码，大图省掉大部分解码时间
+                im.draft("RGB", (math.ceil(im.width * scale), math.ceil(im.height * scale)))
+            image = ImageOps.exif_transpose(im)
+            if image.width > max_width:
+                height = max(1, round(image.height * max_width / image.width))
+                image = image.resize((max_width, height), Image.LANCZOS)
+
+            out = io.BytesIO()
+            if _keeps_alpha(image):
+                image.save(out, "PNG", optimize=True)
+            else:
+                image.convert("RGB").save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+    except (UnidentifiedImageError, OSError, ValueError):
+        return data
+    result = out.getvalue()
+    return result if len(result) < len(data) else data
+
+
+class ImagePipeline:
+    def __init__(self, dpi: int = 150, quality: int = 85, cache: Optional[DerivativeCache] = None, workers: int = 4):
+        self.dpi = dpi
+        self.quality = quality
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def prepare(self, path: str, width_emu: int) -> bytes:
+        data = Path(path).read_bytes()
+        max_width = display_pixels(width_emu, self.dpi)
+        key = derivative_key(hashlib.sha256(data).hexdigest(), max_width, self.quality)
+        derived = self.cache.get(key) if self.cache is not None else None
+        if derived is None:
+            derived = downscale(data, max_width, self.quality)
+            if self.cache is not None:
+                self.cache.put(key, derived)
+        self.bytes_in += len(data)
+        self.bytes_out += len(derived)
+        return derived
+
+    def prepare_many(self, paths: Iterable[str], width_emu: int) -> Dict[str, bytes]:
+        """Process each distinct path once; decoding and resizing release the
+        GIL, so several images are handled in a thread pool."""
+        unique = list(dict.fromkeys(paths))
+        if len(unique) <= 1 or self.workers == 1:
+            return {path: self.prepare(path, width_emu) for path in unique}
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(unique))) as pool:
+            return dict(zip(unique, pool.map(lambda path: self.prepare(path, width_emu), unique)))
+
+    def stats(self) -> Dict[str, int]:
+        stats = {"bytes_in": self.bytes_in, "bytes_out": self.bytes_out}
+        if self.cache is not None:
+            stats.update(self.cache.stats())
+        return stats
+
+
+@lru_cache(maxsize=8)
+def pipeline_for(options: RenderOptions) -> Optional[ImagePipeline]:
+    # 同一组选项在进程内共用一个实例（缓存命中统计也随之累计）；image_dpi=0 表示原样嵌入
+    if not options.image_dpi:
+        return None
+    cache = DerivativeCache(options.image_cache_dir) if options.image_cache_dir else None
+    return ImagePipeline(options.image_dpi, options.image_quality, cache, options.image_workers)
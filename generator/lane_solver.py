@@ -0,0 +1,96 @@
+import re
+from datetime import date
+from typing import List, NamedTuple, Optional, Sequence
+
+# 密集时间线的标签排布：事件锚点在时间轴上，标签框放在轴上下的若干“车道”里。
+# 按锚点从左到右扫一遍，每条车道只记最右端已占到哪里（sweep line），
+# 标签放进离轴最近、在锚点处已空出的车道；都占着时放进最早空出的车道并向右错开，
+# 用引线连回锚点。每个标签 O(车道数)，整体线性。
+
+_DATE_PARTS = re.compile(r"\d+")
+
+
+class Placement(NamedTuple):
+    side: int    # -1 轴上方，1 轴下方
+    lane: int    # 0 为离轴最近的车道
+    left: int    # 标签框左边 x（EMU）
+
+
+def date_ordinal(text: str) -> Optional[int]:
+    # "2024-09-12"、"2024年9月"、"2024/9/12"、"2024" 等；解析不了返回 None
+    parts = _DATE_PARTS.findall(text or "")
+    if not parts or len(parts[0]) != 4:
+        return None
+    year = int(parts[0])
+    month = int(parts[1]) if len(parts) > 1 else 1
+    day = int(parts[2]) if len(parts) > 2 else 1
+    try:
+        return date(year, month, day).toordinal()
+    except ValueError:
+        try:
+            return date(year, min(max(month, 1), 12), 1).toordinal()
+        except ValueError:
+            return None
+
+
+def axis_positions(dates: Sequence[str], left: int, right: int, by_date: bool = False) -> List[int]:
+    """Anchor x for each event between ``left`` and ``right``. With
+    ``by_date`` the spacing follows the real distance between dates, as long
+    as every date parses and they are in order; otherwise (and by default)
+    events are evenly spaced."""
+    count = len(dates)
+    if count == 0:
+        return []
+    if count == 1:
+        return [(left + right) // 2]
+    span = right - left
+    if by_date:
+        ordinals = [date_ordinal(d) for d in dates]
+        if all(o is not None for o in ordinals) and all(a <= b for a, b in zip(ordinals, ordinals[1:])):
+            first, last = ordinals[0], ordinals[-1]
+            if last > first:
+                return [left + int(span * (o - first) / (last - first)) for o in ordinals]
+    return [left + int(span * i / (count - 1)) for i in range(count)]
+
+
+def lane_order(lanes_per_side: int) -> List[tuple]:
+    # 优先离轴近的车道，上下交替
+    return [(side, lane) for lane in range(lanes_per_side) for side in (-1, 1)]
+
+
+def solve_lanes(
+    anchors: Sequence[int],
+    width: int,
+    left: int,
+    right: int,
+    lanes_per_side: int,
+    gap: int = 0,
+    max_shift: Optional[int] = None,
+) -> List[Placement]:
+    """Place one ``width``-wide label per anchor (anchors ascending) so that
+    labels in the same lane never overlap. Returns the placements of the
+    longest prefix of anchors that could be placed; callers put the rest on
+    a continuation slide. ``max_shift`` bounds how far right of its anchor a
+    label may be pushed (default: one label width)."""
+    order = lane_order(max(1, lanes_per_side))
+    ends = {key: left - gap for key in order}
+    limit = right - width
+    shift = width if max_shift is None else max_shift
+    placements: List[Placement] = []
+    for anchor in anchors:
+        wanted = min(max(anchor - width // 2, left), limit)
+        chosen = None
+        for key in order:
+            if ends[key] + gap <= wanted:
+                chosen = key
+                break
+        x = wanted
+        if chosen is None:
+            # 没有车道在锚点处空着：挑最早空出的车道，标签向右错开
+            chosen = min(order, key=lambda k: ends[k])
+            x = ends[chosen] + gap
+            if x > limit or x - wanted > shift:
+                break
+        ends[chosen] = x + width
+        placements.append(Placement(chosen[0], chosen[1], x))
+    return placements
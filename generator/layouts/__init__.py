@@ -0,0 +1,42 @@
+from collections.abc import Mapping
+from importlib import import_module
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+from config_registry import REGISTRY, read_yaml
+
+LAYOUTS_PATH = Path(__file__).parent.parent.parent / "templates" / "layouts.yaml"
+
+
+def _load_modules() -> Dict[str, str]:
+    layouts = (read_yaml(LAYOUTS_PATH) or {}).get("layouts") or {}
+    return {name: cfg["module"] for name, cfg in layouts.items() if cfg and cfg.get("module")}
+
+
+class LayoutRegistry(Mapping):
+    """layout name -> ``render`` function, as declared by ``module:`` entries
+    in templates/layouts.yaml. A layout module is imported the first time its
+    renderer is looked up."""
+
+    def __init__(self):
+        self._renderers: Dict[str, Callable] = {}
+
+    def _modules(self) -> Dict[str, str]:
+        return REGISTRY.get("layout_modules", (LAYOUTS_PATH,), _load_modules)
+
+    def __getitem__(self, name: str) -> Callable:
+        module_name = self._modules()[name]
+        renderer = self._renderers.get(module_name)
+        if renderer is None:
+            renderer = import_module(module_name).render
+            self._renderers[module_name] = renderer
+        return renderer
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._modules())
+
+    def __len__(self) -> int:
+        return len(self._modules())
+
+
+LAYOUTS = LayoutRegistry()
@@ -1,23 +1,34 @@
-from pptx.util import Inches, Pt
-from pptx.enum.text import PP_ALIGN
-from ..ppt_builder import load_theme, add_title
+import io
+from typing import Optional
+from pptx.util import Inches
+from ..ppt_builder import RenderOptions, Theme, load_theme, add_title
 from .utils import ensure_bg
+from ..text_styles import style_font
+from ..images import pipeline_for
 from pathlib import Path
 
-def render(prs, routed_content):
-    theme = load_theme()
+def render(prs, routed_content, theme: Optional[Theme] = None, options: Optional[RenderOptions] = None):
+    theme = theme or load_theme()
+    options = options or RenderOptions()
+    image_width = Inches(8.8)
+    # 所有页的头图先在线程池里缩放/压缩（同一张图只处理一次），再逐页嵌入
+    pipeline = pipeline_for(options)
+    paths = [s.hero_image for s in routed_content.slides if s.hero_image and Path(s.hero_image).exists()]
+    prepared = pipeline.prepare_many(paths, image_width) if pipeline else {}
+
     for s in routed_content.slides:
-        add_title(prs, theme, s["title"])
+        add_title(prs, theme, s.title, options)
         slide = prs.slides[-1]
         ensure_bg(slide, theme)
 
         # 图片
-        img = s.get("hero_image")
+        img = s.hero_image
         if img and Path(img).exists():
-            slide.shapes.add_picture(img, Inches(0.8), Inches(1.8), width=Inches(8.8))  # add_picture API :contentReference[oaicite:10]{index=10}
+            source = io.BytesIO(prepared[img]) if img in prepared else img
+            slide.shapes.add_picture(source, Inches(0.8), Inches(1.8), width=image_width)  # add_picture API :contentReference[oaicite:10]{index=10}
 
         # 说明
-        if s.get("caption"):
+        if s.caption:
             tb = slide.shapes.add_textbox(Inches(0.8), Inches(5.2), Inches(8.8), Inches(1.0))
-            p = tb.text_frame.paragraphs[0]; p.text = s["caption"]
-            p.font.size = Pt(theme.sizes["body_pt"]); p.font.name = theme.fonts["body"]
+            p = tb.text_frame.paragraphs[0]; p.text = s.caption
+            style_font(p.font, theme, options, name=theme.fonts["body"], size=theme.pt["body_pt"])
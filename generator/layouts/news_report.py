@@ -1,21 +1,20 @@
-﻿import re
+﻿from functools import lru_cache
+from typing import Optional
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_AUTO_SHAPE_TYPE as MsoShape
-from ..ppt_builder import load_theme
+from pptx.oxml.ns import qn
+from .. import skeleton
+from ..ppt_builder import RenderOptions, Theme, load_theme
+from ..pagination import fill_pages, page_title
+from ..text_metrics import DEFAULT_INSETS, frame_height, measurer
+from ..text_styles import style_alignment, style_font
 from .utils import ensure_bg
 
 FONT_NAME = "Microsoft YaHei"
 
 # ---------- helper ----------
-def val(obj, key, default=None):
-    if obj is None:
-        return default
-    if isinstance(obj, dict):
-        return obj.get(key, default)
-    return getattr(obj, key, default)
-
 def split_two_lines(text: str):
     t = (text or "").strip()
     if len(t) == 4:
@@ -38,86 +37,56 @@ def split_summary_explanation(text: str):
         return t[:6].strip(), t[6:].strip()
     return t, ""
 
-def norm_bullets(x, mi=0, ma=12):
-    if not x:
-        return []
-    if isinstance(x, list):
-        arr = [str(s).strip() for s in x if str(s).strip()]
-    else:
-        parts = re.split(r"[；;。\.\n]+", str(x))
-        arr = [p.strip(" 、，, ") for p in parts if p and p.strip()]
-    return arr[:ma]
-
 def no_shadow(shape):
     try:
         shape.shadow.inherit = False
     except Exception:
         pass
 
-# ---------- renderer ----------
-def render(prs, routed_content):
-    theme = load_theme()
+# ---------- painters ----------
+# 两种引擎共用同一套几何计算：_ShapePainter 逐属性构建形状；_ClonePainter 克隆由
+# _ShapePainter 预先画出的原型 XML，只填文本与几何。
 
-    for slide_obj in routed_content.slides:
-        slide = prs.slides.add_slide(prs.slide_layouts[6])
-        ensure_bg(slide, theme)
+class _ShapePainter:
+    def __init__(self, slide, theme, options):
+        self.slide = slide
+        self.theme = theme
+        self.options = options
 
-        page_width = prs.slide_width
-        margin_left = Inches(0.6)
-        margin_right = Inches(0.6)
+    def _font(self, font, **kwargs):
+        style_font(font, self.theme, self.options, **kwargs)
 
-        # ===== 顶部：大标题 =====
-        header_title = val(slide_obj, "header_title") or val(slide_obj, "title", "")
-        title_box = slide.shapes.add_textbox(margin_left, Inches(0.22), page_width - margin_left - margin_right, Inches(1.0))
+    def header(self, left, top, width, height, text):
+        title_box = self.slide.shapes.add_textbox(left, top, width, height)
         tf_title = title_box.text_frame
         p = tf_title.paragraphs[0]
-        p.text = header_title.strip()
-        p.font.name = FONT_NAME
-        p.font.size = Pt(theme.sizes["title_pt"])
-        p.font.bold = True
-        p.font.color.rgb = theme.colors["primary"]
-        p.alignment = PP_ALIGN.LEFT
-
-        # ===== 右上角品牌标签 =====
-        brand_tag = str(val(slide_obj, "brand_tag", "CARI AI4News") or "CARI AI4News")
-        tag_width = Inches(2.4)
-        tag = slide.shapes.add_shape(
-            MsoShape.RECTANGLE,
-            page_width - margin_right - tag_width,
-            Inches(0.22),
-            tag_width,
-            Inches(0.42),
-        )
+        p.text = text
+        self._font(p.font, name=FONT_NAME, size=self.theme.pt["title_pt"], bold=True, color=self.theme.colors["primary"])
+        style_alignment(p, PP_ALIGN.LEFT, self.options)
+        return title_box
+
+    def brand_tag(self, left, top, width, height, text):
+        tag = self.slide.shapes.add_shape(MsoShape.RECTANGLE, left, top, width, height)
         tag.fill.solid()
         tag.fill.fore_color.rgb = RGBColor(255, 255, 255)
         tag.line.fill.background()
         no_shadow(tag)
         tf = tag.text_frame
         brand_p = tf.paragraphs[0]
-        brand_p.text = brand_tag
-        brand_p.font.size = Pt(12)
-        brand_p.font.name = FONT_NAME
-        brand_p.font.color.rgb = RGBColor(0, 0, 0)
+        brand_p.text = text
+        self._font(brand_p.font, name=FONT_NAME, size=Pt(12), color=RGBColor(0, 0, 0), inherit=False)
         brand_p.alignment = PP_ALIGN.CENTER
+        return tag
 
-        # ===== 中部：Summary 灰框 =====
-        summary = val(slide_obj, "summary", {}) or {}
-        sum_label = val(summary, "label", "启示洞察")
-        sum_bullets = norm_bullets(val(summary, "bullets"), mi=3, ma=6)
-
-        block_h = Inches(0.9 + max(0, len(sum_bullets)-1) * 0.25)
-        block_top = Inches(1.05)
-        full_left = margin_left
-        full_w = page_width - margin_left - margin_right
-
-        bg = slide.shapes.add_shape(MsoShape.RECTANGLE, full_left, block_top, full_w, block_h)
+    def summary_band(self, left, top, width, height, red_w, l1, l2):
+        slide = self.slide
+        bg = slide.shapes.add_shape(MsoShape.RECTANGLE, left, top, width, height)
         bg.fill.solid()
         bg.fill.fore_color.rgb = RGBColor(230, 230, 230)
         bg.line.fill.background()
         no_shadow(bg)
 
-        red_w = Inches(1.2)
-        red = slide.shapes.add_shape(MsoShape.RECTANGLE, full_left, block_top, red_w, block_h)
+        red = slide.shapes.add_shape(MsoShape.RECTANGLE, left, top, red_w, height)
         red.fill.gradient()
         stops = red.fill.gradient_stops
         stops[0].color.rgb = RGBColor(180, 40, 40)
@@ -125,66 +94,252 @@ def render(prs, routed_content):
         red.line.fill.background()
         no_shadow(red)
 
-        l1, l2 = split_two_lines(sum_label)
         tf_red = red.text_frame
         tf_red.clear()
         tf_red.vertical_anchor = MSO_ANCHOR.MIDDLE
         fs = 16
         p1 = tf_red.paragraphs[0]
         p1.text = l1
-        p1.font.bold = True
-        p1.font.size = Pt(fs)
-        p1.font.name = FONT_NAME
-        p1.font.color.rgb = RGBColor(255, 255, 255)
+        self._font(p1.font, name=FONT_NAME, size=Pt(fs), bold=True, color=RGBColor(255, 255, 255), inherit=False)
         p1.alignment = PP_ALIGN.CENTER
         p2 = tf_red.add_paragraph()
         p2.text = l2
-        p2.font.bold = True
-        p2.font.size = Pt(fs)
-        p2.font.name = FONT_NAME
-        p2.font.color.rgb = RGBColor(255, 255, 255)
+        self._font(p2.font, name=FONT_NAME, size=Pt(fs), bold=True, color=RGBColor(255, 255, 255), inherit=False)
         p2.alignment = PP_ALIGN.CENTER
 
-        sum_box = slide.shapes.add_textbox(full_left + red_w + Inches(0.12), block_top, full_w - red_w - Inches(0.12), block_h)
+        sum_box = slide.shapes.add_textbox(left + red_w + Inches(0.12), top, width - red_w - Inches(0.12), height)
         tf = sum_box.text_frame
         tf.word_wrap = True
         tf.vertical_anchor = MSO_ANCHOR.MIDDLE
+        return tf
+
+    def summary_bullet(self, tf, index, summary_text, explanation):
+        text_color = self.theme.colors["text"]
+        paragraph = tf.add_paragraph() if index > 0 else tf.paragraphs[0]
+        paragraph.text = ""
+        self._font(paragraph.font, name=FONT_NAME, size=Pt(12), color=text_color)
+
+        run_bold = paragraph.add_run()
+        run_bold.text = f"- {summary_text}："
+        self._font(run_bold.font, name=FONT_NAME, size=Pt(12), bold=True, color=text_color)
+
+        if explanation:
+            run_rest = paragraph.add_run()
+            run_rest.text = explanation.strip()
+            self._font(run_rest.font, name=FONT_NAME, size=Pt(12), color=text_color)
+
+        style_alignment(paragraph, PP_ALIGN.LEFT, self.options)
+        paragraph.space_after = Pt(6)
+
+    def column_frame(self, col_left, top, col_w, col_h, tag_x, tag_y, tag_w, tag_h, title_text):
+        slide = self.slide
+        box = slide.shapes.add_shape(MsoShape.RECTANGLE, col_left, top, col_w, col_h)
+        box.fill.solid()
+        box.fill.fore_color.rgb = RGBColor(255, 255, 255)
+        box.line.color.rgb = RGBColor(0, 102, 204)
+        no_shadow(box)
+
+        tag = slide.shapes.add_shape(MsoShape.RECTANGLE, tag_x, tag_y, tag_w, tag_h)
+        tag.fill.solid()
+        tag.fill.fore_color.rgb = RGBColor(255, 255, 255)
+        tag.line.fill.background()
+        no_shadow(tag)
+        tf_tag = tag.text_frame
+        pt = tf_tag.paragraphs[0]
+        pt.text = title_text
+        self._font(pt.font, name=FONT_NAME, size=Pt(12), bold=True, color=RGBColor(0, 0, 0), inherit=False)
+        pt.alignment = PP_ALIGN.CENTER
+
+        tfb = box.text_frame
+        tfb.clear()
+        tfb.word_wrap = True
+        tfb.vertical_anchor = MSO_ANCHOR.TOP
+        return tfb
+
+    def section_heading(self, tfb, subtitle):
+        psec = tfb.add_paragraph()
+        psec.text = f"□ 【{subtitle}】"
+        self._font(psec.font, name=FONT_NAME, size=Pt(12), bold=True, color=RGBColor(0, 0, 0), inherit=False)
+        psec.alignment = PP_ALIGN.LEFT
+        psec.space_after = Pt(8)
+
+    def section_bullet(self, tfb, text):
+        pb = tfb.add_paragraph()
+        pb.text = f"• {text}"
+        self._font(pb.font, name=FONT_NAME, size=Pt(12), color=self.theme.colors["text"], inherit=False)
+        pb.alignment = PP_ALIGN.LEFT
+        pb.space_after = Pt(6)
+
+
+@lru_cache(maxsize=8)
+def _prototypes(theme, width, height, options):
+    slide = skeleton.scratch_slide(theme, width, height)
+    painter = _ShapePainter(slide, theme, options)
+    one = Inches(1)
+    protos = {
+        "header": skeleton.snapshot(painter.header(0, 0, one, one, "标题")._element),
+        "brand": skeleton.snapshot(painter.brand_tag(0, 0, one, one, "品牌")._element),
+    }
+
+    tf = painter.summary_band(0, 0, one * 4, one, one, "启示", "洞察")
+    bg, red, sum_box = list(slide.shapes)[-3:]
+    protos["summary_bg"] = skeleton.snapshot(bg._element)
+    protos["summary_red"] = skeleton.snapshot(red._element)
+    protos["summary_box"] = skeleton.snapshot(sum_box._element)
+    painter.summary_bullet(tf, 0, "要点", "说明")
+    protos["summary_bullet"] = skeleton.snapshot(tf.paragraphs[0]._p)
+
+    tfb = painter.column_frame(0, 0, one, one, 0, 0, one, one, "列")
+    box, tag = list(slide.shapes)[-2:]
+    protos["column_box"] = skeleton.snapshot(box._element)
+    protos["column_tag"] = skeleton.snapshot(tag._element)
+    painter.section_heading(tfb, "小节")
+    painter.section_bullet(tfb, "要点")
+    protos["section_heading"] = skeleton.snapshot(tfb.paragraphs[-2]._p)
+    protos["section_bullet"] = skeleton.snapshot(tfb.paragraphs[-1]._p)
+    return protos
+
+
+class _ClonePainter:
+    def __init__(self, slide, theme, prs, options):
+        self.cloner = skeleton.SlideCloner(slide)
+        self.protos = _prototypes(theme, prs.slide_width, prs.slide_height, options)
+
+    def _text_shape(self, name, x, y, cx, cy, text):
+        element = self.cloner.add(self.protos[name], x, y, cx, cy)
+        skeleton.set_paragraph_text(skeleton.paragraphs(element)[0], text)
+        return element
 
-        for i, raw in enumerate(sum_bullets):
-            summary_text, explanation = split_summary_explanation(raw)
-            paragraph = tf.add_paragraph() if i > 0 else tf.paragraphs[0]
-            paragraph.text = ""
-            paragraph.font.size = Pt(12)
-            paragraph.font.name = FONT_NAME
-            paragraph.font.color.rgb = theme.colors["text"]
-
-            run_bold = paragraph.add_run()
-            run_bold.text = f"- {summary_text}："
-            run_bold.font.bold = True
-            run_bold.font.size = Pt(12)
-            run_bold.font.name = FONT_NAME
-            run_bold.font.color.rgb = theme.colors["text"]
-
-            if explanation:
-                run_rest = paragraph.add_run()
-                run_rest.text = explanation.strip()
-                run_rest.font.size = Pt(12)
-                run_rest.font.name = FONT_NAME
-                run_rest.font.color.rgb = theme.colors["text"]
-
-            paragraph.alignment = PP_ALIGN.LEFT
-            paragraph.space_after = Pt(6)
-
-        # ===== 下部：左右两列 =====
+    def header(self, left, top, width, height, text):
+        return self._text_shape("header", left, top, width, height, text)
+
+    def brand_tag(self, left, top, width, height, text):
+        return self._text_shape("brand", left, top, width, height, text)
+
+    def summary_band(self, left, top, width, height, red_w, l1, l2):
+        self.cloner.add(self.protos["summary_bg"], left, top, width, height)
+        red = self.cloner.add(self.protos["summary_red"], left, top, red_w, height)
+        p1, p2 = skeleton.paragraphs(red)
+        skeleton.set_paragraph_text(p1, l1)
+        skeleton.set_paragraph_text(p2, l2)
+        return self.cloner.add(
+            self.protos["summary_box"],
+            left + red_w + Inches(0.12),
+            top,
+            width - red_w - Inches(0.12),
+            height,
+        )
+
+    def summary_bullet(self, sum_box, index, summary_text, explanation):
+        if index == 0:
+            body = skeleton.text_body(sum_box)
+            for p in body.findall(qn("a:p")):
+                body.remove(p)
+        p = skeleton.add_paragraph(sum_box, self.protos["summary_bullet"])
+        run_bold, run_rest = p.findall(qn("a:r"))
+        skeleton.set_run_text(run_bold, f"- {summary_text}：")
+        if explanation:
+            skeleton.set_run_text(run_rest, explanation.strip())
+        else:
+            p.remove(run_rest)
+
+    def column_frame(self, col_left, top, col_w, col_h, tag_x, tag_y, tag_w, tag_h, title_text):
+        box = self.cloner.add(self.protos["column_box"], col_left, top, col_w, col_h)
+        self._text_shape("column_tag", tag_x, tag_y, tag_w, tag_h, title_text)
+        return box
+
+    def section_heading(self, box, subtitle):
+        skeleton.add_paragraph(box, self.protos["section_heading"], f"□ 【{subtitle}】")
+
+    def section_bullet(self, box, text):
+        skeleton.add_paragraph(box, self.protos["section_bullet"], f"• {text}")
+
+
+def _painter(slide, theme, prs, options):
+    if options.engine == "clone":
+        return _ClonePainter(slide, theme, prs, options)
+    return _ShapePainter(slide, theme, options)
+
+
+# ---------- pagination ----------
+def _column_pages(sections, width, capacity):
+    # 按测量高度把小节顺序装进列框；一节跨页时在下一页重复小节标题（加“续”），
+    # 标题不单独留在页底。返回每页的 [(小节标题, [要点...]), ...]
+    inner = width - DEFAULT_INSETS[0] - DEFAULT_INSETS[2]
+    heading_m = measurer(FONT_NAME, 12, bold=True)
+    bullet_m = measurer(FONT_NAME, 12)
+    pages = [[]]
+    used = 0
+    for sec in sections:
+        current = None
+        for index, bullet in enumerate(sec.bullets):
+            bullet_h = bullet_m.height(f"• {bullet}", inner) + Pt(6)
+            subtitle = sec.subtitle_bold if index == 0 else f"{sec.subtitle_bold}（续）"
+            need = bullet_h if current is not None else heading_m.height(f"□ 【{subtitle}】", inner) + Pt(8) + bullet_h
+            if used + need > capacity and pages[-1]:
+                pages.append([])
+                used = 0
+                if current is not None:
+                    current = None
+                    subtitle = f"{sec.subtitle_bold}（续）"
+                    need = heading_m.height(f"□ 【{subtitle}】", inner) + Pt(8) + bullet_h
+            if current is None:
+                current = (subtitle, [])
+                pages[-1].append(current)
+            current[1].append(bullet)
+            used += need
+    return pages
+
+
+# ---------- renderer ----------
+def render(prs, routed_content, theme: Optional[Theme] = None, options: Optional[RenderOptions] = None):
+    theme = theme or load_theme()
+    options = options or RenderOptions()
+
+    page_width = prs.slide_width
+    margin_left = Inches(0.6)
+    margin_right = Inches(0.6)
+    full_left = margin_left
+    full_w = page_width - margin_left - margin_right
+    tag_width = Inches(2.4)
+    block_top = Inches(1.05)
+    red_w = Inches(1.2)
+    sum_w = full_w - red_w - Inches(0.12)
+    # 摘要灰框最高 2.15"（原先 6 条要点时的高度），更多要点分到续页
+    max_block_h = Inches(2.15)
+    grid_gap = Inches(0.35)
+    col_w = (full_w - grid_gap) / 2
+    bottom_margin = theme.margins.get("bottom", Inches(0.6))
+    extra_bottom_padding = Inches(0.3)
+    preferred_height = Inches(4.1)
+    minimum_height = Inches(3.4)
+    bold_12 = measurer(FONT_NAME, 12, bold=True)
+    # 列框 clear() 后留下的空首段按默认 18pt 计
+    lead_h = measurer(FONT_NAME, 18).line_height
+
+    for slide_obj in routed_content.slides:
+        # slide_obj 是校验后的 NewsReportSlide：文字已去空白，要点数量已补齐
+        brand_tag = slide_obj.brand_tag or "CARI AI4News"
+        l1, l2 = split_two_lines(slide_obj.summary.label)
+
+        # ===== 摘要：按实际折行高度分页，灰框取各页最高者 =====
+        summary_parts = [split_summary_explanation(raw) for raw in slide_obj.summary.bullets]
+        summary_paragraphs = [(f"- {head}：{tail}", bold_12, Pt(6)) for head, tail in summary_parts]
+        summary_inner = max_block_h - DEFAULT_INSETS[1] - DEFAULT_INSETS[3]
+        summary_pages = fill_pages(
+            [frame_height([paragraph], sum_w, (DEFAULT_INSETS[0], 0, DEFAULT_INSETS[2], 0))
+             for paragraph in summary_paragraphs],
+            summary_inner,
+        ) or [(0, 0)]
+        block_h = max(
+            max(Inches(0.9 + max(0, end - start - 1) * 0.25), frame_height(summary_paragraphs[start:end], sum_w))
+            for start, end in summary_pages
+        )
+
+        # ===== 左右两列的几何，在所有续页上保持一致 =====
         grid_top = block_top + block_h + Inches(0.25)
-        grid_gap = Inches(0.35)
-        col_w = (full_w - grid_gap) / 2
-        bottom_margin = theme.margins.get("bottom", Inches(0.6))
-        extra_bottom_padding = Inches(0.3)
         grid_bottom = prs.slide_height - bottom_margin - extra_bottom_padding
         available_height = max(0, grid_bottom - grid_top)
-        preferred_height = Inches(4.1)
-        minimum_height = Inches(3.4)
 
         if available_height >= preferred_height:
             col_h = preferred_height
@@ -194,62 +349,41 @@ def render(prs, routed_content):
             col_h = minimum_height
             grid_bottom = grid_top + col_h
 
-        left_col = val(slide_obj, "left", {}) or {}
-        right_col = val(slide_obj, "right", {}) or {}
-
-        def draw_column(col_left, col_data, fallback="列"):
-            title_text = val(col_data, "title", fallback)
-            sections = val(col_data, "sections", []) or []
-
-            box = slide.shapes.add_shape(MsoShape.RECTANGLE, col_left, grid_top, col_w, col_h)
-            box.fill.solid()
-            box.fill.fore_color.rgb = RGBColor(255, 255, 255)
-            box.line.color.rgb = RGBColor(0, 102, 204)
-            no_shadow(box)
-
-            tag_w = Inches(3.5)
-            tag_h = Inches(0.36)
-            tag_x = col_left + (col_w - tag_w) / 2
-            tag_y = grid_top - tag_h / 2
-            tag = slide.shapes.add_shape(MsoShape.RECTANGLE, tag_x, tag_y, tag_w, tag_h)
-            tag.fill.solid()
-            tag.fill.fore_color.rgb = RGBColor(255, 255, 255)
-            tag.line.fill.background()
-            no_shadow(tag)
-            tf_tag = tag.text_frame
-            pt = tf_tag.paragraphs[0]
-            pt.text = title_text
-            pt.font.size = Pt(12)
-            pt.font.bold = True
-            pt.font.name = FONT_NAME
-            pt.font.color.rgb = RGBColor(0, 0, 0)
-            pt.alignment = PP_ALIGN.CENTER
-
-            tfb = box.text_frame
-            tfb.clear()
-            tfb.word_wrap = True
-            for idx, sec in enumerate(sections):
-                subtitle = val(sec, "subtitle_bold", "") or f"小节{idx + 1}"
-                bullets = norm_bullets(val(sec, "bullets"), mi=3, ma=6)
-
-                psec = tfb.add_paragraph()
-                psec.text = f"□ 【{subtitle}】"
-                psec.font.size = Pt(12)
-                psec.font.bold = True
-                psec.font.name = FONT_NAME
-                psec.font.color.rgb = RGBColor(0, 0, 0)
-                psec.alignment = PP_ALIGN.LEFT
-                psec.space_after = Pt(8)
-
-                for b in bullets:
-                    pb = tfb.add_paragraph()
-                    pb.text = f"• {b}"
-                    pb.font.size = Pt(12)
-                    pb.font.name = FONT_NAME
-                    pb.font.color.rgb = theme.colors["text"]
-                    pb.alignment = PP_ALIGN.LEFT
-                    pb.space_after = Pt(6)
-            tfb.vertical_anchor = MSO_ANCHOR.TOP
-
-        draw_column(full_left, left_col, "左列")
-        draw_column(full_left + col_w + grid_gap, right_col, "右列")
+        col_capacity = col_h - DEFAULT_INSETS[1] - DEFAULT_INSETS[3] - lead_h
+        columns = [
+            (full_left, slide_obj.left, _column_pages(slide_obj.left.sections, col_w, col_capacity)),
+            (full_left + col_w + grid_gap, slide_obj.right, _column_pages(slide_obj.right.sections, col_w, col_capacity)),
+        ]
+        total = max(len(summary_pages), *(len(pages) for _, _, pages in columns))
+
+        for page in range(total):
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+            ensure_bg(slide, theme)
+            painter = _painter(slide, theme, prs, options)
+
+            # ===== 顶部：大标题 =====
+            painter.header(margin_left, Inches(0.22), full_w, Inches(1.0),
+                           page_title(slide_obj.header_title, page + 1, total))
+
+            # ===== 右上角品牌标签 =====
+            painter.brand_tag(page_width - margin_right - tag_width, Inches(0.22), tag_width, Inches(0.42), brand_tag)
+
+            # ===== 中部：Summary 灰框（只有一页摘要时每页都显示）=====
+            tf = painter.summary_band(full_left, block_top, full_w, block_h, red_w, l1, l2)
+            if len(summary_pages) == 1 or page < len(summary_pages):
+                start, end = summary_pages[0 if len(summary_pages) == 1 else page]
+                for i, (summary_text, explanation) in enumerate(summary_parts[start:end]):
+                    painter.summary_bullet(tf, i, summary_text, explanation)
+
+            # ===== 下部：左右两列 =====
+            for col_left, col_data, pages in columns:
+                tag_w = Inches(3.5)
+                tag_h = Inches(0.36)
+                tag_x = col_left + (col_w - tag_w) / 2
+                tag_y = grid_top - tag_h / 2
+                tfb = painter.column_frame(col_left, grid_top, col_w, col_h, tag_x, tag_y, tag_w, tag_h, col_data.title)
+
+                for subtitle, bullets in (pages[page] if page < len(pages) else ()):
+                    painter.section_heading(tfb, subtitle)
+                    for b in bullets:
+                        painter.section_bullet(tfb, b)
@@ -1,28 +1,37 @@
+from typing import Optional
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from .utils import ensure_bg
-from ..ppt_builder import load_theme, add_title
+from ..pagination import fill_pages, page_title
+from ..text_metrics import DEFAULT_INSETS, measurer
+from ..text_styles import style_alignment, style_font
+from ..ppt_builder import RenderOptions, Theme, load_theme, add_title
+
+def render(prs, routed_content, theme: Optional[Theme] = None, options: Optional[RenderOptions] = None):
+    theme = theme or load_theme()
+    left = theme.margins["left"]
+    top = theme.margins["top"] + Inches(1.2)
+    width = Inches(10) - theme.margins["left"] - theme.margins["right"]
+    height = Inches(5.5)
+    body_m = measurer(theme.fonts["body"], theme.sizes["body_pt"])
+    inner_w = width - DEFAULT_INSETS[0] - DEFAULT_INSETS[2]
+    inner_h = height - DEFAULT_INSETS[1] - DEFAULT_INSETS[3]
 
-def render(prs, routed_content):
-    theme = load_theme()
     for s in routed_content.slides:
-        add_title(prs, theme, s["title"])
-        slide = prs.slides[-1]
-        ensure_bg(slide, theme)
+        # 要点按测量高度分页，放不下的进续页
+        pages = fill_pages([body_m.height(f"• {b}", inner_w) + Pt(8) for b in s.bullets], inner_h)
+        for page, (start, end) in enumerate(pages, start=1):
+            add_title(prs, theme, page_title(s.title, page, len(pages)), options)
+            slide = prs.slides[-1]
+            ensure_bg(slide, theme)
 
-        left = theme.margins["left"]
-        top = theme.margins["top"] + Inches(1.2)
-        width = Inches(10) - theme.margins["left"] - theme.margins["right"]
-        height = Inches(5.5)
-        tb = slide.shapes.add_textbox(left, top, width, height)
-        tf = tb.text_frame
-        tf.word_wrap = True
+            tb = slide.shapes.add_textbox(left, top, width, height)
+            tf = tb.text_frame
+            tf.word_wrap = True
 
-        for i, b in enumerate(s["bullets"]):
-            p = tf.add_paragraph() if i > 0 else tf.paragraphs[0]
-            p.text = f"• {b}"
-            p.font.size = Pt(theme.sizes["body_pt"])
-            p.font.name = theme.fonts["body"]
-            p.font.color.rgb = theme.colors["text"]
-            p.space_after = Pt(8)   # 段落间距
-            p.alignment = PP_ALIGN.LEFT
+            for i, b in enumerate(s.bullets[start:end]):
+                p = tf.add_paragraph() if i > 0 else tf.paragraphs[0]
+                p.text = f"• {b}"
+                style_font(p.font, theme, options, name=theme.fonts["body"], size=theme.pt["body_pt"], color=theme.colors["text"])
+                p.space_after = Pt(8)   # 段落间距
+                style_alignment(p, PP_ALIGN.LEFT, options)
@@ -1,11 +1,17 @@
-﻿from pptx.util import Inches, Pt
+﻿from functools import lru_cache
+from typing import Optional
+from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.enum.shapes import MSO_AUTO_SHAPE_TYPE as MsoShape, MSO_CONNECTOR_TYPE
-from pptx.oxml.xmlchemy import OxmlElement
 from pptx.oxml.ns import qn
 
+from .. import skeleton, tables
+from ..lane_solver import axis_positions, solve_lanes
+from ..pagination import even_ranges, fill_pages, pack_by_limit, page_title
+from ..text_metrics import DEFAULT_INSETS, frame_height, measurer
+from ..text_styles import style_alignment, style_font
 from .utils import ensure_bg
-from ..ppt_builder import load_theme, add_title
+from ..ppt_builder import RenderOptions, Theme, load_theme, add_title
 
 
 def _to_emu(value):
@@ -14,296 +20,134 @@ def _to_emu(value):
     return int(round(float(value)))
 
 
-def _apply_cell_border(cell, color_hex="000000"):
-    tc = cell._tc
-    tcPr = tc.get_or_add_tcPr()
-    for tag in ("a:lnL", "a:lnR", "a:lnT", "a:lnB"):
-        existing = tcPr.find(qn(tag))
-        if existing is not None:
-            tcPr.remove(existing)
-        ln = OxmlElement(tag)
-        ln.set("w", str(int(Pt(1).emu)))
+# ---------- painters ----------
+# 与 news_report 相同的两种引擎：_ShapePainter 逐属性构建；_ClonePainter 克隆原型 XML。
 
-        solid_fill = OxmlElement("a:solidFill")
-        srgb = OxmlElement("a:srgbClr")
-        srgb.set("val", color_hex)
-        solid_fill.append(srgb)
-        ln.append(solid_fill)
+class _ShapePainter:
+    def __init__(self, prs, theme, options, title_text):
+        self.theme = theme
+        self.options = options
+        self.slide = add_title(prs, theme, title_text, options)
 
-        dash = OxmlElement("a:prstDash")
-        dash.set("val", "solid")
-        ln.append(dash)
+    def _font(self, font, **kwargs):
+        style_font(font, self.theme, self.options, **kwargs)
 
-        tcPr.append(ln)
-
-
-def render(prs, routed_content):
-    theme = load_theme()
-    margins = theme.margins
-    left_margin = margins.get("left", Inches(0.6))
-    right_margin = margins.get("right", Inches(0.6))
-    top_margin = margins.get("top", Inches(0.6))
-    bottom_margin = margins.get("bottom", Inches(0.6))
-
-    drawing_width = prs.slide_width - left_margin - right_margin
-    spine_thickness = Inches(0.05)
-    max_events = 8
-    box_max_width = Inches(3.0)
-    box_height = Inches(1.8)
-    connector_length = Inches(0.3)
-    node_size = Inches(0.22)
-    panel_gap = Inches(0.3)
-    min_left_panel = Inches(2.5)
-    min_right_panel = Inches(2.0)
-
-    for slide_spec in routed_content.slides:
-        seen_dates: set[str] = set()
-        title_text = (
-            slide_spec.get("title")
-            or slide_spec.get("header_title")
-            or slide_spec.get("heading")
-            or "时间线"
-        )
-        slide = add_title(prs, theme, title_text)
-        ensure_bg(slide, theme)
-
-        events = (slide_spec.get("events") or [])[:max_events]
-        if not events:
-            continue
-
-        left = left_margin
-        right = left + drawing_width
-        spine_y = top_margin + int(prs.slide_height * 0.28)
-
-        spine = slide.shapes.add_shape(
-            MsoShape.RECTANGLE,
-            left,
-            spine_y - spine_thickness / 2,
-            drawing_width,
-            spine_thickness,
-        )
+    def spine(self, left, top, width, height):
+        spine = self.slide.shapes.add_shape(MsoShape.RECTANGLE, left, top, width, height)
         spine.fill.solid()
-        spine.fill.fore_color.rgb = theme.colors["sub"]
+        spine.fill.fore_color.rgb = self.theme.colors["sub"]
         spine.line.fill.background()
+        return spine
 
-        tip = slide.shapes.add_shape(
-            MsoShape.ISOSCELES_TRIANGLE,
-            right - Inches(0.35),
-            spine_y - Inches(0.18),
-            Inches(0.35),
-            Inches(0.36),
-        )
+    def tip(self, left, top, width, height):
+        tip = self.slide.shapes.add_shape(MsoShape.ISOSCELES_TRIANGLE, left, top, width, height)
         tip.fill.solid()
-        tip.fill.fore_color.rgb = theme.colors["sub"]
+        tip.fill.fore_color.rgb = self.theme.colors["sub"]
         tip.line.fill.background()
         tip.rotation = 90
+        return tip
 
-        event_count = len(events)
-        span = drawing_width / (event_count - 1) if event_count > 1 else 0
-
-        for idx, ev in enumerate(events):
-            cx = left + (span * idx if event_count > 1 else drawing_width / 2)
-            cx = int(cx)
-
-            node = slide.shapes.add_shape(
-                MsoShape.DIAMOND,
-                cx - node_size / 2,
-                spine_y - node_size / 2,
-                node_size,
-                node_size,
-            )
-            node.fill.solid()
-            node.fill.fore_color.rgb = theme.colors["accent"]
-            node.line.fill.background()
-
-            usable_span = float(span) if event_count > 1 else float(drawing_width)
-            box_width = int(min(box_max_width, usable_span * 0.85))
-            box_width = max(box_width, int(Inches(1.8)))
-            direction = -1 if idx % 2 == 0 else 1
-
-            preferred_center = cx + int(direction * (box_width / 2))
-            min_center = left + box_width // 2
-            max_center = right - box_width // 2
-            box_center = max(min_center, min(max_center, preferred_center))
-            box_left = box_center - box_width // 2
-
-            end_x = box_center
-            end_y = spine_y + direction * connector_length
-            connector = slide.shapes.add_connector(
-                MSO_CONNECTOR_TYPE.STRAIGHT,
-                _to_emu(cx),
-                _to_emu(spine_y),
-                _to_emu(end_x),
-                _to_emu(end_y),
-            )
-            connector.line.color.rgb = theme.colors["sub"]
-            connector.line.width = Pt(1.5)
-
-            date_text = (ev.get("date") or "").strip()
-            if date_text:
-                display_date = date_text
-                suffix = 2
-                while display_date in seen_dates:
-                    display_date = f"{date_text}-事件{suffix}"
-                    suffix += 1
-                seen_dates.add(display_date)
-
-                date_width = Inches(1.5)
-                date_box = slide.shapes.add_textbox(
-                    cx - date_width / 2,
-                    spine_y + Inches(0.08),
-                    date_width,
-                    Inches(0.35),
-                )
-                dtf = date_box.text_frame
-                dtf.text = display_date
-                dp = dtf.paragraphs[0]
-                dp.font.size = Pt(12)
-                dp.font.name = theme.fonts["body"]
-                dp.font.color.rgb = theme.colors["sub"]
-                dp.alignment = PP_ALIGN.CENTER
-
-            box_top = end_y - box_height + Inches(0.05) if direction < 0 else end_y + Inches(0.05)
-            text_box = slide.shapes.add_textbox(box_left, box_top, box_width, box_height)
-            tf = text_box.text_frame
-            tf.clear()
-            tf.word_wrap = True
-            tf.vertical_anchor = MSO_ANCHOR.BOTTOM if direction < 0 else MSO_ANCHOR.TOP
-
-            headline = (ev.get("headline") or "").strip()
-            detail = (ev.get("detail") or "").strip()
-
-            p_headline = tf.paragraphs[0]
-            p_headline.text = headline
-            p_headline.font.size = Pt(12)
-            p_headline.font.bold = True
-            p_headline.font.name = theme.fonts["body"]
-            p_headline.font.color.rgb = theme.colors["text"]
-            p_headline.alignment = PP_ALIGN.CENTER
-
-            if detail:
-                p_detail = tf.add_paragraph()
-                p_detail.text = detail
-                p_detail.font.size = Pt(12)
-                p_detail.font.name = theme.fonts["body"]
-                p_detail.font.color.rgb = theme.colors["sub"]
-                p_detail.alignment = PP_ALIGN.CENTER
-
-        analysis = slide_spec.get("analysis") or {}
-        table_headers = [h.strip() for h in (analysis.get("table_headers") or []) if h and h.strip()][:4]
-        raw_rows = analysis.get("table_rows") or []
-        table_rows = []
-        for row in raw_rows:
-            if not isinstance(row, list):
-                continue
-            cells = [str(c).strip() for c in row]
-            if any(cells):
-                table_rows.append(cells)
-
-        if table_headers:
-            col_count = len(table_headers)
-        elif table_rows:
-            col_count = len(table_rows[0])
-            table_headers = [f"列{i + 1}" for i in range(col_count)]
-        else:
-            col_count = 2
-            table_headers = ["时间", "要点"]
-
-        normalized_rows = []
-        for row in table_rows:
-            padded = row + [""] * max(0, col_count - len(row))
-            normalized_rows.append(padded[:col_count])
-
-        if not normalized_rows:
-            for ev in events[:3]:
-                base = [ev.get("date", ""), ev.get("headline", "")]
-                base.extend([""] * max(0, col_count - len(base)))
-                normalized_rows.append(base[:col_count])
-        while len(normalized_rows) < 2:
-            normalized_rows.append(list(normalized_rows[-1]))
-
-        key_points = [p.strip() for p in (analysis.get("key_points") or []) if p and p.strip()][:5]
-        if not key_points:
-            key_points = [f"{ev.get('date', '')}: {ev.get('headline', '')}".strip(": ") for ev in events[:3]]
-        key_points = [kp for kp in key_points if kp]
-        if not key_points:
-            key_points = ["待补充"]
-        while len(key_points) < 3:
-            key_points.append(key_points[-1])
-
-        analysis_top = spine_y + connector_length + box_height + Inches(0.18)
-        max_top = prs.slide_height - bottom_margin - Inches(1.6)
-        guard_top = top_margin + Inches(0.3)
-        if max_top < guard_top:
-            max_top = guard_top
-        if analysis_top > max_top:
-            analysis_top = max(guard_top, max_top)
-        analysis_height = max(Inches(1.6), prs.slide_height - bottom_margin - analysis_top)
-
-        analysis_width = drawing_width
-        left_panel_width = max(int(analysis_width * 0.58), int(min_left_panel))
-        right_panel_width = analysis_width - left_panel_width - panel_gap
-        if right_panel_width < min_right_panel:
-            right_panel_width = min_right_panel
-            left_panel_width = analysis_width - right_panel_width - panel_gap
-        left_panel_left = left
-        right_panel_left = left_panel_left + left_panel_width + panel_gap
-
-        row_count = 1 + len(normalized_rows)
-        table_shape = slide.shapes.add_table(
-            row_count,
-            col_count,
-            left_panel_left,
-            analysis_top,
-            left_panel_width,
-            analysis_height,
+    def node(self, left, top, size):
+        node = self.slide.shapes.add_shape(MsoShape.DIAMOND, left, top, size, size)
+        node.fill.solid()
+        node.fill.fore_color.rgb = self.theme.colors["accent"]
+        node.line.fill.background()
+        return node
+
+    def connector(self, begin_x, begin_y, end_x, end_y):
+        connector = self.slide.shapes.add_connector(
+            MSO_CONNECTOR_TYPE.STRAIGHT,
+            _to_emu(begin_x),
+            _to_emu(begin_y),
+            _to_emu(end_x),
+            _to_emu(end_y),
         )
-        table = table_shape.table
-        table.table_style = None
-
-        for col_idx, header in enumerate(table_headers):
-            cell = table.cell(0, col_idx)
-            cell.text = header
-            cell.text_frame.word_wrap = True
-            header_paragraph = cell.text_frame.paragraphs[0]
-            header_paragraph.font.size = Pt(14)
-            header_paragraph.font.bold = True
-            header_paragraph.font.name = theme.fonts["body"]
-            header_paragraph.font.color.rgb = theme.colors["text"]
-            header_paragraph.alignment = PP_ALIGN.CENTER
-            cell.fill.background()
-            _apply_cell_border(cell)
-
-        for row_idx, row in enumerate(normalized_rows, start=1):
-            for col_idx, value in enumerate(row):
-                cell = table.cell(row_idx, col_idx)
-                cell.text = value
-                cell.text_frame.word_wrap = True
-                body_paragraph = cell.text_frame.paragraphs[0]
-                body_paragraph.font.size = Pt(14)
-                body_paragraph.font.name = theme.fonts["body"]
-                body_paragraph.font.color.rgb = theme.colors["text"]
-                body_paragraph.alignment = PP_ALIGN.LEFT
-                cell.fill.background()
-                _apply_cell_border(cell)
-
-        separator_x = right_panel_left - panel_gap / 2
-        separator = slide.shapes.add_connector(
+        connector.line.color.rgb = self.theme.colors["sub"]
+        connector.line.width = Pt(1.5)
+        return connector
+
+    def date_label(self, left, top, width, height, text):
+        date_box = self.slide.shapes.add_textbox(left, top, width, height)
+        dtf = date_box.text_frame
+        dtf.text = text
+        dp = dtf.paragraphs[0]
+        self._font(dp.font, name=self.theme.fonts["body"], size=Pt(12), color=self.theme.colors["sub"])
+        dp.alignment = PP_ALIGN.CENTER
+        return date_box
+
+    def event_box(self, left, top, width, height, direction, headline, detail):
+        theme = self.theme
+        text_box = self.slide.shapes.add_textbox(left, top, width, height)
+        tf = text_box.text_frame
+        tf.clear()
+        tf.word_wrap = True
+        tf.vertical_anchor = MSO_ANCHOR.BOTTOM if direction < 0 else MSO_ANCHOR.TOP
+
+        p_headline = tf.paragraphs[0]
+        p_headline.text = headline
+        self._font(p_headline.font, name=theme.fonts["body"], size=Pt(12), bold=True, color=theme.colors["text"])
+        p_headline.alignment = PP_ALIGN.CENTER
+
+        if detail:
+            p_detail = tf.add_paragraph()
+            p_detail.text = detail
+            self._font(p_detail.font, name=theme.fonts["body"], size=Pt(12), color=theme.colors["sub"])
+            p_detail.alignment = PP_ALIGN.CENTER
+        return text_box
+
+    def label(self, left, top, width, height, side, date_text, headline):
+        # 密集模式的事件标签：日期 + 单行标题，细边框
+        theme = self.theme
+        box = self.slide.shapes.add_textbox(left, top, width, height)
+        # 底色挡住穿过内侧车道的引线
+        box.fill.solid()
+        box.fill.fore_color.rgb = theme.colors["bg"]
+        box.line.color.rgb = theme.colors["sub"]
+        box.line.width = Pt(0.75)
+        tf = box.text_frame
+        tf.word_wrap = True
+        tf.vertical_anchor = MSO_ANCHOR.BOTTOM if side < 0 else MSO_ANCHOR.TOP
+
+        p_date = tf.paragraphs[0]
+        p_date.text = date_text
+        self._font(p_date.font, name=theme.fonts["body"], size=Pt(9), color=theme.colors["sub"])
+        p_headline = tf.add_paragraph()
+        p_headline.text = headline
+        self._font(p_headline.font, name=theme.fonts["body"], size=Pt(10), bold=True, color=theme.colors["text"])
+        return box
+
+    def leader(self, begin_x, begin_y, end_x, end_y):
+        leader = self.slide.shapes.add_connector(
             MSO_CONNECTOR_TYPE.STRAIGHT,
-            _to_emu(separator_x),
-            _to_emu(analysis_top),
-            _to_emu(separator_x),
-            _to_emu(analysis_top + analysis_height),
+            _to_emu(begin_x),
+            _to_emu(begin_y),
+            _to_emu(end_x),
+            _to_emu(end_y),
         )
-        separator.line.color.rgb = theme.colors["text"]
-        separator.line.width = Pt(1)
+        leader.line.color.rgb = self.theme.colors["sub"]
+        leader.line.width = Pt(0.75)
+        return leader
 
-        insights_box = slide.shapes.add_textbox(
-            right_panel_left,
-            analysis_top,
-            right_panel_width,
-            analysis_height,
+    def table(self, left, top, width, height, table_headers, rows):
+        # 表格在两种引擎下都由 tables 克隆单元格原型，逐格设置属性太慢
+        builder = tables.table_builder(self.theme, self.options)
+        return builder.add(skeleton.SlideCloner(self.slide), left, top, width, height, table_headers, rows)
+
+    def separator(self, begin_x, begin_y, end_x, end_y):
+        separator = self.slide.shapes.add_connector(
+            MSO_CONNECTOR_TYPE.STRAIGHT,
+            _to_emu(begin_x),
+            _to_emu(begin_y),
+            _to_emu(end_x),
+            _to_emu(end_y),
         )
+        separator.line.color.rgb = self.theme.colors["text"]
+        separator.line.width = Pt(1)
+        return separator
+
+    def insights(self, left, top, width, height, key_points):
+        theme = self.theme
+        insights_box = self.slide.shapes.add_textbox(left, top, width, height)
         tf_insights = insights_box.text_frame
         tf_insights.clear()
         tf_insights.word_wrap = True
@@ -312,8 +156,417 @@ def render(prs, routed_content):
         for idx, point in enumerate(key_points):
             paragraph = tf_insights.paragraphs[0] if idx == 0 else tf_insights.add_paragraph()
             paragraph.text = f"■ {point}"
-            paragraph.font.size = Pt(14)
-            paragraph.font.name = theme.fonts["body"]
-            paragraph.font.color.rgb = theme.colors["text"]
-            paragraph.alignment = PP_ALIGN.LEFT
+            self._font(paragraph.font, name=theme.fonts["body"], size=Pt(14), color=theme.colors["text"])
+            style_alignment(paragraph, PP_ALIGN.LEFT, self.options)
             paragraph.space_after = Pt(6)
+        return insights_box
+
+
+def _last_shape(painter):
+    return painter.slide.shapes[-1]._element
+
+
+@lru_cache(maxsize=8)
+def _prototypes(theme, width, height, options):
+    prs = skeleton.scratch_presentation(theme, width, height)
+    painter = _ShapePainter(prs, theme, options, "时间线")
+    one = Inches(1)
+    protos = {"title": skeleton.snapshot(_last_shape(painter))}
+
+    for name, draw in (
+        ("spine", lambda: painter.spine(0, 0, one, one)),
+        ("tip", lambda: painter.tip(0, 0, one, one)),
+        ("node", lambda: painter.node(0, 0, one)),
+        ("connector", lambda: painter.connector(0, 0, one, one)),
+        ("date", lambda: painter.date_label(0, 0, one, one, "日期")),
+        ("separator", lambda: painter.separator(0, 0, one, one)),
+        ("leader", lambda: painter.leader(0, 0, one, one)),
+    ):
+        protos[name] = skeleton.snapshot(draw()._element)
+
+    for direction in (-1, 1):
+        box = painter.event_box(0, 0, one, one, direction, "事件", "细节")
+        headline, detail = box.text_frame.paragraphs
+        protos[("event_box", direction)] = skeleton.snapshot(box._element)
+        protos["headline"] = skeleton.snapshot(headline._p)
+        protos["detail"] = skeleton.snapshot(detail._p)
+
+    for side in (-1, 1):
+        protos[("label", side)] = skeleton.snapshot(painter.label(0, 0, one, one, side, "日期", "事件")._element)
+
+    insights = painter.insights(0, 0, one, one, ["要点"])
+    protos["insights_box"] = skeleton.snapshot(insights._element)
+    protos["insight"] = skeleton.snapshot(insights.text_frame.paragraphs[0]._p)
+
+    return protos
+
+
+class _ClonePainter:
+    def __init__(self, prs, theme, options, title_text):
+        self.theme = theme
+        self.options = options
+        self.protos = _prototypes(theme, prs.slide_width, prs.slide_height, options)
+        self.slide = prs.slides.add_slide(prs.slide_layouts[6])
+        self.cloner = skeleton.SlideCloner(self.slide)
+        title = self.cloner.add(self.protos["title"])
+        skeleton.set_paragraph_text(skeleton.paragraphs(title)[0], title_text)
+
+    def spine(self, left, top, width, height):
+        return self.cloner.add(self.protos["spine"], left, top, width, height)
+
+    def tip(self, left, top, width, height):
+        return self.cloner.add(self.protos["tip"], left, top, width, height)
+
+    def node(self, left, top, size):
+        return self.cloner.add(self.protos["node"], left, top, size, size)
+
+    def _line(self, name, begin_x, begin_y, end_x, end_y):
+        element = self.cloner.add(self.protos[name])
+        skeleton.set_line(element, _to_emu(begin_x), _to_emu(begin_y), _to_emu(end_x), _to_emu(end_y))
+        return element
+
+    def connector(self, begin_x, begin_y, end_x, end_y):
+        return self._line("connector", begin_x, begin_y, end_x, end_y)
+
+    def separator(self, begin_x, begin_y, end_x, end_y):
+        return self._line("separator", begin_x, begin_y, end_x, end_y)
+
+    def date_label(self, left, top, width, height, text):
+        element = self.cloner.add(self.protos["date"], left, top, width, height)
+        skeleton.set_frame_text(element, skeleton.paragraphs(self.protos["date"])[0], text)
+        return element
+
+    def event_box(self, left, top, width, height, direction, headline, detail):
+        element = self.cloner.add(self.protos[("event_box", direction)], left, top, width, height)
+        body = skeleton.text_body(element)
+        for p in body.findall(qn("a:p")):
+            body.remove(p)
+        skeleton.add_paragraph(element, self.protos["headline"], headline)
+        if detail:
+            skeleton.add_paragraph(element, self.protos["detail"], detail)
+        return element
+
+    def label(self, left, top, width, height, side, date_text, headline):
+        element = self.cloner.add(self.protos[("label", side)], left, top, width, height)
+        p_date, p_headline = skeleton.paragraphs(element)
+        skeleton.set_paragraph_text(p_date, date_text)
+        skeleton.set_paragraph_text(p_headline, headline)
+        return element
+
+    def leader(self, begin_x, begin_y, end_x, end_y):
+        return self._line("leader", begin_x, begin_y, end_x, end_y)
+
+    def table(self, left, top, width, height, table_headers, rows):
+        builder = tables.table_builder(self.theme, self.options)
+        return builder.add(self.cloner, left, top, width, height, table_headers, rows)
+
+    def insights(self, left, top, width, height, key_points):
+        element = self.cloner.add(self.protos["insights_box"], left, top, width, height)
+        body = skeleton.text_body(element)
+        for p in body.findall(qn("a:p")):
+            body.remove(p)
+        for point in key_points:
+            skeleton.add_paragraph(element, self.protos["insight"], f"■ {point}")
+        if not key_points:
+            body.add_p()
+        return element
+
+
+def _painter(prs, theme, options, title_text):
+    if options.engine == "clone":
+        return _ClonePainter(prs, theme, options, title_text)
+    return _ShapePainter(prs, theme, options, title_text)
+
+
+def _box_width(count, drawing_width, box_max_width):
+    usable_span = float(drawing_width / (count - 1)) if count > 1 else float(drawing_width)
+    return max(int(min(box_max_width, usable_span * 0.85)), int(Inches(1.8)))
+
+
+def _event_limits(events, widths, box_height, theme):
+    # 每个事件最多能和几个事件同页：一页 n 个事件时框宽为 widths[n-1]（随 n 单调变窄），
+    # 二分找文字仍能放进事件框的最大 n。最宽的框都放不下时分页也无济于事，按最宽框的档位算
+    headline_m = measurer(theme.fonts["body"], 12, bold=True)
+    detail_m = measurer(theme.fonts["body"], 12)
+    widest = sum(1 for width in widths if width == widths[0])
+    limits = []
+    for ev in events:
+        paragraphs = [(ev.headline, headline_m, 0)]
+        if ev.detail:
+            paragraphs.append((ev.detail, detail_m, 0))
+        low, high = 0, len(widths)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if frame_height(paragraphs, widths[mid - 1]) <= box_height:
+                low = mid
+            else:
+                high = mid - 1
+        limits.append(low or widest)
+    return limits
+
+
+def _panel_rows(theme, options, headers, rows, width, height):
+    # 分析区放得下的前若干行；按实际列宽测行高，放不下的行交给续页表格
+    builder = tables.table_builder(theme, options)
+    col_widths = tables._even(width, len(headers))
+    header_h = builder.row_heights([headers], col_widths, header=True)[0]
+    body_h = builder.row_heights(rows, col_widths)
+    if header_h + sum(body_h) <= height:
+        return len(rows)
+    return max(1, fill_pages(body_h, max(1, height - header_h))[0][1])
+
+
+def _analysis_panel(prs, painter, theme, options, analysis, events, left, analysis_width, analysis_top):
+    """Draw the analysis band under the timeline (table left, key points
+    right, separator between) with ``analysis_top`` as the preferred top.
+    Returns the headers and the table rows that did not fit in the band."""
+    top_margin = theme.margins.get("top", Inches(0.6))
+    bottom_margin = theme.margins.get("bottom", Inches(0.6))
+    panel_gap = Inches(0.3)
+    min_left_panel = Inches(2.5)
+    min_right_panel = Inches(2.0)
+
+    table_headers = list(analysis.table_headers or []) if analysis else []
+    table_rows = list(analysis.table_rows or []) if analysis else []
+
+    if table_headers:
+        col_count = len(table_headers)
+    elif table_rows:
+        col_count = len(table_rows[0])
+        table_headers = [f"列{i + 1}" for i in range(col_count)]
+    else:
+        col_count = 2
+        table_headers = ["时间", "要点"]
+
+    normalized_rows = []
+    for row in table_rows:
+        padded = row + [""] * max(0, col_count - len(row))
+        normalized_rows.append(padded[:col_count])
+
+    if not normalized_rows:
+        for ev in events[:3]:
+            base = [ev.date, ev.headline]
+            base.extend([""] * max(0, col_count - len(base)))
+            normalized_rows.append(base[:col_count])
+    while len(normalized_rows) < 2:
+        normalized_rows.append(list(normalized_rows[-1]))
+
+    key_points = list(analysis.key_points or [])[:5] if analysis else []
+    if not key_points:
+        key_points = [f"{ev.date}: {ev.headline}".strip(": ") for ev in events[:3]]
+    key_points = [kp for kp in key_points if kp]
+    if not key_points:
+        key_points = ["待补充"]
+    while len(key_points) < 3:
+        key_points.append(key_points[-1])
+
+    max_top = prs.slide_height - bottom_margin - Inches(1.6)
+    guard_top = top_margin + Inches(0.3)
+    if max_top < guard_top:
+        max_top = guard_top
+    if analysis_top > max_top:
+        analysis_top = max(guard_top, max_top)
+    analysis_height = max(Inches(1.6), prs.slide_height - bottom_margin - analysis_top)
+
+    left_panel_width = max(int(analysis_width * 0.58), int(min_left_panel))
+    right_panel_width = analysis_width - left_panel_width - panel_gap
+    if right_panel_width < min_right_panel:
+        right_panel_width = min_right_panel
+        left_panel_width = analysis_width - right_panel_width - panel_gap
+    left_panel_left = left
+    right_panel_left = left_panel_left + left_panel_width + panel_gap
+
+    shown = _panel_rows(theme, options, table_headers, normalized_rows, left_panel_width, analysis_height)
+    overflow = normalized_rows[shown:]
+    painter.table(left_panel_left, analysis_top, left_panel_width, analysis_height, table_headers,
+                  normalized_rows[:shown])
+
+    separator_x = right_panel_left - panel_gap / 2
+    painter.separator(separator_x, analysis_top, separator_x, analysis_top + analysis_height)
+
+    painter.insights(right_panel_left, analysis_top, right_panel_width, analysis_height, key_points)
+    return table_headers, overflow
+
+
+def _table_continuation(prs, title_text, theme, options, panel):
+    # 分析区放不下的表格行接在该时间线之后，按测量行高分页并重复表头
+    headers, overflow = panel
+    if overflow:
+        tables.add_table_pages(prs, f"{title_text}：数据表（续）", headers, overflow, theme, options)
+
+
+def _dense_pages(dates, axis_left, axis_right, by_date, label_w, left, right, lanes_per_side, gap):
+    # 每页取能无重叠排完的最长前缀（日期轴按本页事件铺满），二分查找；
+    # 上界是所有车道都排满、不错开时的标签数，所以每次求解的规模不超过一页
+    def solve(start, end):
+        anchors = axis_positions(dates[start:end], axis_left, axis_right, by_date)
+        placements = solve_lanes(anchors, label_w, left, right, lanes_per_side, gap)
+        return (start, end, anchors, placements) if len(placements) == end - start else None
+
+    per_lane = max(1, int((right - left + gap) // (label_w + gap)))
+    upper = 2 * lanes_per_side * per_lane
+    pages = []
+    start = 0
+    while start < len(dates):
+        high = min(len(dates) - start, upper)
+        best = solve(start, start + high)
+        if best is None:
+            low, best = 1, solve(start, start + 1)   # 单个事件总能放下
+            while low < high - 1:
+                mid = (low + high) // 2
+                found = solve(start, start + mid)
+                if found is None:
+                    high = mid
+                else:
+                    low, best = mid, found
+        pages.append(best)
+        start = best[1]
+
+    # 与 pack_by_limit 相同：页数不变时尽量均分，续页疏密一致
+    if len(pages) > 1:
+        even = [solve(start, end) for start, end in even_ranges(len(dates), len(pages))]
+        if all(even):
+            return even
+    return pages
+
+
+def _render_dense(prs, slide_spec, title_text, theme, options):
+    margins = theme.margins
+    left = margins.get("left", Inches(0.6))
+    right = prs.slide_width - margins.get("right", Inches(0.6))
+    top_margin = margins.get("top", Inches(0.6))
+    bottom_margin = margins.get("bottom", Inches(0.6))
+
+    spine_thickness = Inches(0.05)
+    node_size = Inches(0.14)
+    label_w = Inches(1.45)
+    label_h = Inches(0.46)
+    label_gap = Inches(0.08)
+    lane_gap = Inches(0.06)
+    spine_gap = Inches(0.2)
+    panel_height = Inches(1.6)
+
+    # 标题下到分析区之间是时间轴区域，轴在正中，上下各若干条车道
+    band_top = top_margin + Inches(1.1)
+    panel_top = prs.slide_height - bottom_margin - panel_height
+    band_bottom = panel_top - Inches(0.18)
+    spine_y = (band_top + band_bottom) // 2
+    lane_pitch = label_h + lane_gap
+    lanes_per_side = max(1, int((spine_y - band_top - spine_gap + lane_gap) // lane_pitch))
+
+    headline_m = measurer(theme.fonts["body"], 10, bold=True)
+    inner_w = label_w - DEFAULT_INSETS[0] - DEFAULT_INSETS[2]
+    events = slide_spec.events
+    dates = [ev.date for ev in events]
+    # 锚点范围两端各让出半个标签宽，首末事件的标签也能居中，不会挤在页边
+    label_right = right - Inches(0.35)
+    pages = _dense_pages(dates, left + label_w // 2, label_right - label_w // 2, options.timeline_by_date,
+                         label_w, left, label_right, lanes_per_side, label_gap)
+
+    for page, (start, end, anchors, placements) in enumerate(pages, start=1):
+        painter = _painter(prs, theme, options, page_title(title_text, page, len(pages)))
+        ensure_bg(painter.slide, theme)
+        painter.spine(left, spine_y - spine_thickness / 2, right - left, spine_thickness)
+        painter.tip(right - Inches(0.35), spine_y - Inches(0.18), Inches(0.35), Inches(0.36))
+
+        for ev, anchor, placement in zip(events[start:end], anchors, placements):
+            offset = spine_gap + placement.lane * lane_pitch
+            label_top = spine_y - offset - label_h if placement.side < 0 else spine_y + offset
+            # 引线从轴上的锚点连到标签靠轴一侧的边；锚点在标签横向范围外时连到最近的角
+            end_x = min(max(anchor, placement.left), placement.left + label_w)
+            end_y = label_top + label_h if placement.side < 0 else label_top
+            painter.leader(anchor, spine_y, end_x, end_y)
+            painter.node(anchor - node_size // 2, spine_y - node_size // 2, node_size)
+            painter.label(placement.left, label_top, label_w, label_h, placement.side, ev.date,
+                          headline_m.clip(ev.headline, inner_w))
+
+        panel = _analysis_panel(prs, painter, theme, options, slide_spec.analysis, events[start:end], left,
+                                right - left, panel_top)
+    _table_continuation(prs, title_text, theme, options, panel)
+
+
+def render(prs, routed_content, theme: Optional[Theme] = None, options: Optional[RenderOptions] = None):
+    theme = theme or load_theme()
+    options = options or RenderOptions()
+    margins = theme.margins
+    left_margin = margins.get("left", Inches(0.6))
+    right_margin = margins.get("right", Inches(0.6))
+    top_margin = margins.get("top", Inches(0.6))
+    bottom_margin = margins.get("bottom", Inches(0.6))
+
+    drawing_width = prs.slide_width - left_margin - right_margin
+    spine_thickness = Inches(0.05)
+    box_max_width = Inches(3.0)
+    box_height = Inches(1.8)
+    connector_length = Inches(0.3)
+    node_size = Inches(0.22)
+    date_width = Inches(1.5)
+
+    # 一页最多几个事件由日期标签宽度决定（相邻标签不重叠）；实际每页几个，
+    # 再按事件文字在对应框宽下是否放得下来定，放不下的事件推到续页
+    max_slots = max(1, int(drawing_width // date_width) + 1)
+    widths = [_box_width(count, drawing_width, box_max_width) for count in range(1, max_slots + 1)]
+
+    for slide_spec in routed_content.slides:
+        seen_dates: set[str] = set()
+        # slide_spec 是校验后的 TimelineSlide：文字已去空白，表格已按表头对齐
+        title_text = slide_spec.title or slide_spec.header_title or slide_spec.heading or "时间线"
+        if options.timeline_mode == "dense":
+            _render_dense(prs, slide_spec, title_text, theme, options)
+            continue
+        limits = _event_limits(slide_spec.events, widths, box_height, theme)
+        pages = pack_by_limit(limits)
+        # 续页沿用同一事件间距（最满一页的事件数）；本页有事件在该间距下放不下时按本页事件数排
+        page_slots = max(end - start for start, end in pages)
+
+        for page, (start, end) in enumerate(pages, start=1):
+            painter = _painter(prs, theme, options, page_title(title_text, page, len(pages)))
+            ensure_bg(painter.slide, theme)
+            events = slide_spec.events[start:end]
+            slots = page_slots if min(limits[start:end]) >= page_slots else len(events)
+
+            left = left_margin
+            right = left + drawing_width
+            spine_y = top_margin + int(prs.slide_height * 0.28)
+
+            painter.spine(left, spine_y - spine_thickness / 2, drawing_width, spine_thickness)
+            painter.tip(right - Inches(0.35), spine_y - Inches(0.18), Inches(0.35), Inches(0.36))
+
+            span = drawing_width / (slots - 1) if slots > 1 else 0
+            box_width = widths[slots - 1]
+
+            for idx, ev in enumerate(events):
+                cx = left + (span * idx if slots > 1 else drawing_width / 2)
+                cx = int(cx)
+
+                painter.node(cx - node_size / 2, spine_y - node_size / 2, node_size)
+
+                direction = -1 if idx % 2 == 0 else 1
+
+                preferred_center = cx + int(direction * (box_width / 2))
+                min_center = left + box_width // 2
+                max_center = right - box_width // 2
+                box_center = max(min_center, min(max_center, preferred_center))
+                box_left = box_center - box_width // 2
+
+                end_x = box_center
+                end_y = spine_y + direction * connector_length
+                painter.connector(cx, spine_y, end_x, end_y)
+
+                date_text = ev.date
+                if date_text:
+                    display_date = date_text
+                    suffix = 2
+                    while display_date in seen_dates:
+                        display_date = f"{date_text}-事件{suffix}"
+                        suffix += 1
+                    seen_dates.add(display_date)
+
+                    painter.date_label(cx - date_width / 2, spine_y + Inches(0.08), date_width, Inches(0.35), display_date)
+
+                box_top = end_y - box_height + Inches(0.05) if direction < 0 else end_y + Inches(0.05)
+                painter.event_box(box_left, box_top, box_width, box_height, direction, ev.headline, ev.detail or "")
+
+            panel = _analysis_panel(prs, painter, theme, options, slide_spec.analysis, events, left, drawing_width,
+                                    spine_y + connector_length + box_height + Inches(0.18))
+        _table_continuation(prs, title_text, theme, options, panel)
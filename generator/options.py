@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+from typing import Optional
+
+# 不依赖 python-pptx，命令行解析等轻量路径可以直接导入
+
+ENGINES = ("shapes", "clone")
+TIMELINE_MODES = ("fishbone", "dense")
+
+@dataclass(frozen=True)
+class RenderOptions:
+    # shapes: 逐个 add_shape/add_textbox 构建；clone: 克隆预编译的版式骨架（news_report/timeline）
+    engine: str = "shapes"
+    # 正文默认字体/字号/颜色写入母版与演示文稿默认样式，段落只保留差异属性
+    lean_text: bool = False
+    # fishbone: 事件框在轴上下交替；dense: 多车道排布标签并用引线连回轴，一条轴可放几十个事件
+    timeline_mode: str = "fishbone"
+    # dense 模式下按真实日期间隔排布事件（有日期解析不了或乱序时退回等距）
+    timeline_by_date: bool = False
+    # 头图按显示宽度缩到该 DPI 并重新压缩（0 表示原样嵌入）；派生图缓存目录为空时只在内存处理
+    image_dpi: int = 150
+    image_quality: int = 85
+    image_cache_dir: Optional[str] = None
+    image_workers: int = 4
+    # 输出 .pptx 的 deflate 级别（0 不压缩）；zip_store_media 时 JPEG/PNG 等已压缩媒体原样存储
+    zip_level: int = 6
+    zip_store_media: bool = False
+
+    def __post_init__(self):
+        if self.engine not in ENGINES:
+            raise ValueError(f"Unknown render engine '{self.engine}'")
+        if self.timeline_mode not in TIMELINE_MODES:
+            raise ValueError(f"Unknown timeline mode '{self.timeline_mode}'")
+        if self.image_dpi < 0:
+            raise ValueError("image_dpi must be >= 0")
+        if not 1 <= self.image_quality <= 95:
+            raise ValueError("image_quality must be between 1 and 95")
+        if not 0 <= self.zip_level <= 9:
+            raise ValueError("zip_level must be between 0 and 9")
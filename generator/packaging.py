@@ -0,0 +1,94 @@
+import io
+import time
+import zipfile
+from typing import IO, Iterable, List, Tuple, Union
+
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI, PackURI
+
+try:
+    from pptx.opc.oxml import serialize_part_xml
+    from pptx.opc.serialized import _ContentTypesItem
+except ImportError:  # python-pptx 的私有接口，改版后可能不存在，见 _members
+    _ContentTypesItem = None
+
+from .options import RenderOptions
+
+# 打包成 .pptx：与 python-pptx 的 PackageWriter 写出相同的成员（顺序也相同），
+# 但压缩级别可选，已压缩过的媒体（JPEG/PNG/音视频）可以原样存储，不再白白 deflate 一遍。
+# 目标可以是路径，也可以是任意可写的二进制流（服务/批量模式直接拿字节，不落临时文件）。
+
+# 再压缩几乎没有收益的格式
+PRECOMPRESSED = frozenset(("jpg", "jpeg", "png", "gif", "wdp", "mp4", "m4v", "mov", "mp3", "m4a"))
+
+
+def _package_members(prs) -> List[Tuple[PackURI, bytes]]:
+    package = prs.part.package
+    parts = tuple(package.iter_parts())
+    members = [
+        (CONTENT_TYPES_URI, serialize_part_xml(_ContentTypesItem.xml_for(parts))),
+        (PACKAGE_URI.rels_uri, package._rels.xml),
+    ]
+    for part in parts:
+        members.append((part.partname, part.blob))
+        if part._rels:
+            members.append((part.partname.rels_uri, part.rels.xml))
+    return members
+
+
+def _saved_members(prs) -> List[Tuple[PackURI, bytes]]:
+    # 回退：先用公开的 prs.save() 在内存里写一遍，再按选定的压缩方式重新打包
+    stream = io.BytesIO()
+    prs.save(stream)
+    with zipfile.ZipFile(stream) as zipf:
+        return [(PackURI("/" + info.filename), zipf.read(info)) for info in zipf.infolist()]
+
+
+def _members(prs) -> List[Tuple[PackURI, bytes]]:
+    # 直接序列化各个 part 省掉一次写入/解压；依赖的私有接口不可用时退回 prs.save()
+    if _ContentTypesItem is not None:
+        try:
+            return _package_members(prs)
+        except AttributeError:
+            pass
+    return _saved_members(prs)
+
+
+def save_deck(prs, target: Union[str, IO[bytes]], level: int = 6, store_media: bool = False) -> None:
+    """Write ``prs`` to a path or binary stream. ``level`` 0 stores every
+    member, 1–9 is the deflate level; ``store_media`` keeps already
+    compressed media uncompressed."""
+    method = zipfile.ZIP_STORED if level == 0 else zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(target, "w", compression=method, compresslevel=level or None,
+                         strict_timestamps=False) as zipf:
+        for uri, blob in _members(prs):
+            if store_media and uri.ext.lower() in PRECOMPRESSED:
+                zipf.writestr(uri.membername, blob, compress_type=zipfile.ZIP_STORED)
+            else:
+                zipf.writestr(uri.membername, blob)
+
+
+def deck_bytes(prs, level: int = 6, store_media: bool = False) -> bytes:
+    stream = io.BytesIO()
+    save_deck(prs, stream, level, store_media)
+    return stream.getvalue()
+
+
+def save_with_options(prs, target: Union[str, IO[bytes]], options: RenderOptions) -> None:
+    save_deck(prs, target, options.zip_level, options.zip_store_media)
+
+
+def packaging_report(prs, levels: Iterable[int] = (0, 1, 6, 9), repeat: int = 3) -> List[dict]:
+    # 每个级别在内存里打包几次取最快一次；媒体压缩/原样存储各测一遍
+    rows = []
+    for level in levels:
+        for store_media in (False, True):
+            if level == 0 and store_media:
+                continue
+            best = None
+            for _ in range(max(1, repeat)):
+                started = time.perf_counter()
+                size = len(deck_bytes(prs, level, store_media))
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            rows.append({"level": level, "store_media": store_media, "seconds": best, "bytes": size})
+    return rows
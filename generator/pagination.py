@@ -0,0 +1,67 @@
+from typing import List, Sequence, Tuple
+
+# 内容超出一页时切成续页（标题加 "(2/5)"），而不是截断。
+# 切分依据是 text_metrics 测出的高度；都是单遍贪心，对内容长度线性。
+
+Range = Tuple[int, int]
+
+
+def page_title(title: str, page: int, total: int) -> str:
+    return title if total <= 1 else f"{title} ({page}/{total})"
+
+
+def fill_pages(sizes: Sequence[int], capacity: int) -> List[Range]:
+    """Split consecutive items into ``[start, end)`` ranges whose sizes sum
+    to at most ``capacity``. An item larger than ``capacity`` gets a page of
+    its own rather than being dropped."""
+    ranges: List[Range] = []
+    start = 0
+    used = 0
+    for index, size in enumerate(sizes):
+        if index > start and used + size > capacity:
+            ranges.append((start, index))
+            start, used = index, 0
+        used += size
+    if start < len(sizes):
+        ranges.append((start, len(sizes)))
+    return ranges
+
+
+def pack_by_limit(limits: Sequence[int]) -> List[Range]:
+    """Split items where ``limits[i]`` is the most items a page may hold if
+    item ``i`` is on it (e.g. the narrowest box its text still fits in).
+    Greedy pages are then evened out when the same page count allows it,
+    so continuation pages share one geometry."""
+    ranges: List[Range] = []
+    start = 0
+    cap = 0
+    for index, limit in enumerate(limits):
+        limit = max(1, limit)
+        if index > start and min(cap, limit) < index - start + 1:
+            ranges.append((start, index))
+            start = index
+            cap = limit
+        else:
+            cap = limit if index == start else min(cap, limit)
+    if start < len(limits):
+        ranges.append((start, len(limits)))
+
+    even = even_ranges(len(limits), len(ranges))
+    if len(even) == len(ranges) and all(end - start <= min(limits[start:end]) for start, end in even):
+        return even
+    return ranges
+
+
+def even_ranges(count: int, pages: int) -> List[Range]:
+    # 尽量均分：前 count % pages 页各多一项
+    if count <= 0 or pages <= 0:
+        return []
+    base, extra = divmod(count, pages)
+    ranges: List[Range] = []
+    start = 0
+    for page in range(pages):
+        end = start + base + (1 if page < extra else 0)
+        if end > start:
+            ranges.append((start, end))
+        start = end
+    return ranges
@@ -3,38 +3,52 @@ from pptx.util import Inches, Pt
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN
 from pptx.enum.shapes import MSO_AUTO_SHAPE_TYPE
-import yaml
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, Any
 
+from config_registry import REGISTRY, read_yaml
+from .options import RenderOptions
+from .text_styles import apply_text_defaults, style_alignment, style_font
+
 HERE = Path(__file__).parent.parent
+THEME_PATH = HERE / "templates" / "base_theme.yaml"
 
 def _rgb(hex_str: str):
     hex_str = hex_str.lstrip("#")
     return RGBColor(int(hex_str[0:2],16), int(hex_str[2:4],16), int(hex_str[4:6],16))
 
 class Theme:
+    # 编译后的主题：颜色/边距/字号都预先转换好，实例在进程内共享，只读
+    __slots__ = ("fonts", "sizes", "pt", "colors", "margins", "logo", "bg")
+
     def __init__(self, cfg: Dict[str, Any]):
-        self.fonts = cfg["fonts"]
-        self.sizes = cfg["sizes"]
-        self.colors = {k: _rgb(v) for k, v in cfg["colors"].items()}
+        set_ = object.__setattr__
+        set_(self, "fonts", MappingProxyType(dict(cfg["fonts"])))
+        set_(self, "sizes", MappingProxyType(dict(cfg["sizes"])))
+        set_(self, "pt", MappingProxyType({k: Pt(v) for k, v in cfg["sizes"].items()}))
+        set_(self, "colors", MappingProxyType({k: _rgb(v) for k, v in cfg["colors"].items()}))
         m = cfg["margins"]
-        self.margins = {k: Inches(v) for k, v in m.items()}
-        self.logo = cfg.get("logo", {})
-        self.bg = cfg.get("background", {})
+        set_(self, "margins", MappingProxyType({k: Inches(v) for k, v in m.items()}))
+        set_(self, "logo", MappingProxyType(dict(cfg.get("logo") or {})))
+        set_(self, "bg", MappingProxyType(dict(cfg.get("background") or {})))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Theme is immutable")
 
 def load_theme() -> Theme:
-    with open(HERE / "templates" / "base_theme.yaml", "r", encoding="utf-8") as f:
-        return Theme(yaml.safe_load(f))
+    return REGISTRY.get("theme", (THEME_PATH,), lambda: Theme(read_yaml(THEME_PATH)))
 
-def new_presentation(theme: Theme) -> Presentation:
+def new_presentation(theme: Theme, options: RenderOptions = None) -> Presentation:
     prs = Presentation()
     # 背景色/图在 python-pptx 需要逐页设（可在各 layout 中处理）
     prs.slide_width = Inches(13.333333)
     prs.slide_height = Inches(7.5)
+    if options is not None and options.lean_text:
+        apply_text_defaults(prs, theme)
     return prs
 
-def add_title(prs, theme: Theme, text: str):
+def add_title(prs, theme: Theme, text: str, options: "RenderOptions" = None):
     slide = prs.slides.add_slide(prs.slide_layouts[6])
     left = theme.margins["left"]; top = theme.margins["top"]
     width = Inches(10) - theme.margins["left"] - theme.margins["right"]
@@ -45,9 +59,7 @@ def add_title(prs, theme: Theme, text: str):
     tf.word_wrap = True
     p = tf.paragraphs[0]
     p.text = text
-    p.font.name = theme.fonts["heading"]
-    p.font.size = Pt(theme.sizes["title_pt"])
-    p.font.bold = True
-    p.font.color.rgb = theme.colors["primary"]   # 深红色
-    p.alignment = PP_ALIGN.LEFT
+    style_font(p.font, theme, options, name=theme.fonts["heading"], size=theme.pt["title_pt"], bold=True,
+               color=theme.colors["primary"])   # 深红色
+    style_alignment(p, PP_ALIGN.LEFT, options)
     return slide
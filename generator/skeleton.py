@@ -0,0 +1,125 @@
+from copy import deepcopy
+
+from pptx.oxml.ns import qn
+from pptx.text.text import _Paragraph, _Run
+
+from .ppt_builder import new_presentation
+
+# 模板克隆引擎的公共部分：先用常规 python-pptx 代码在草稿页上画一遍原型，
+# 记下元素 XML；之后每页只需深拷贝原型、写入文本与几何，不再逐属性构建。
+
+
+def scratch_presentation(theme, width, height):
+    prs = new_presentation(theme)
+    prs.slide_width = width
+    prs.slide_height = height
+    return prs
+
+
+def scratch_slide(theme, width, height):
+    prs = scratch_presentation(theme, width, height)
+    return prs.slides.add_slide(prs.slide_layouts[6])
+
+
+def snapshot(element):
+    return deepcopy(element)
+
+
+def _xfrm(element):
+    xfrm = element.find(f"{qn('p:spPr')}/{qn('a:xfrm')}")
+    if xfrm is None:
+        xfrm = element.find(qn("p:xfrm"))
+    return xfrm
+
+
+def set_geometry(element, x, y, cx, cy):
+    xfrm = _xfrm(element)
+    off = xfrm.find(qn("a:off"))
+    ext = xfrm.find(qn("a:ext"))
+    off.set("x", str(int(x)))
+    off.set("y", str(int(y)))
+    ext.set("cx", str(int(cx)))
+    ext.set("cy", str(int(cy)))
+
+
+def set_line(element, begin_x, begin_y, end_x, end_y):
+    # 与 SlideShapes.add_connector 相同的端点换算
+    xfrm = _xfrm(element)
+    for attr, flipped in (("flipH", begin_x > end_x), ("flipV", begin_y > end_y)):
+        if flipped:
+            xfrm.set(attr, "1")
+        elif attr in xfrm.attrib:
+            del xfrm.attrib[attr]
+    set_geometry(
+        element,
+        min(begin_x, end_x),
+        min(begin_y, end_y),
+        abs(end_x - begin_x),
+        abs(end_y - begin_y),
+    )
+
+
+def text_body(element):
+    if element.tag == qn("a:tc"):
+        return element.find(qn("a:txBody"))
+    return element.find(qn("p:txBody"))
+
+
+def paragraphs(element):
+    return text_body(element).findall(qn("a:p"))
+
+
+def set_paragraph_text(p, text):
+    # 等价于 paragraph.text = text（保留 pPr，\n 转为换行符）
+    _Paragraph(p, None).text = text
+    return p
+
+
+def set_run_text(r, text):
+    _Run(r, None).text = text
+    return r
+
+
+def add_paragraph(element, proto_p, text=None):
+    p = deepcopy(proto_p)
+    if text is not None:
+        set_paragraph_text(p, text)
+    text_body(element).append(p)
+    return p
+
+
+def set_frame_text(element, proto_p, text):
+    # 等价于 text_frame.text = text 之后再格式化 paragraphs[0]：
+    # 第一段沿用原型段落属性，其余按换行拆出的段落保持默认
+    body = text_body(element)
+    for p in body.findall(qn("a:p")):
+        body.remove(p)
+    lines = text.split("\n")
+    first = deepcopy(proto_p)
+    set_paragraph_text(first, lines[0])
+    body.append(first)
+    for line in lines[1:]:
+        p = body.add_p()
+        p.append_text(line)
+
+
+class SlideCloner:
+    """Appends prototype clones to one slide, assigning shape ids/names the
+    same way python-pptx does."""
+
+    def __init__(self, slide):
+        self.spTree = slide.shapes._spTree
+        self._next_id = slide.shapes._next_shape_id
+
+    def add(self, proto, x=None, y=None, cx=None, cy=None):
+        element = deepcopy(proto)
+        c_nv_pr = element.find(f".//{qn('p:cNvPr')}")
+        shape_id = self._next_id
+        self._next_id += 1
+        prefix = c_nv_pr.get("name", "").rsplit(" ", 1)[0]
+        c_nv_pr.set("id", str(shape_id))
+        c_nv_pr.set("name", f"{prefix} {shape_id - 1}")
+        if x is not None:
+            set_geometry(element, x, y, cx, cy)
+        self.spTree.insert_element_before(element, "p:extLst")
+        return element
@@ -0,0 +1,181 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+from pptx.enum.text import PP_ALIGN
+from pptx.oxml.ns import qn
+from pptx.oxml.xmlchemy import OxmlElement
+from pptx.util import Emu, Inches, Pt
+
+from . import skeleton
+from .pagination import fill_pages, page_title
+from .ppt_builder import RenderOptions, Theme, add_title, load_theme
+from .text_metrics import frame_height, measurer
+from .text_styles import style_font
+
+# 批量建表：表头/正文单元格各按 python-pptx 常规写法画一次（边框、字体、对齐），
+# 记下 a:tc 原型；之后每个单元格只深拷贝原型并改 a:t 文本，不再逐格设置属性、重建边框。
+# 几百行的表按测量行高分页，续页重复表头。
+
+_T_PATH = f"{qn('a:txBody')}/{qn('a:p')}/{qn('a:r')}/{qn('a:t')}"
+# 能直接写进 a:t 的文本：非空、无换行/控制字符（其余交给 set_frame_text，与 cell.text 一致）
+_PLAIN = re.compile(r"[^\x00-\x1f]+\Z")
+
+
+@dataclass(frozen=True)
+class TableStyle:
+    size_pt: int = 14
+    header_bold: bool = True
+    border_hex: str = "000000"
+    header_align: PP_ALIGN = PP_ALIGN.CENTER
+    body_align: PP_ALIGN = PP_ALIGN.LEFT
+
+
+def _apply_cell_border(cell, color_hex="000000"):
+    tc = cell._tc
+    tcPr = tc.get_or_add_tcPr()
+    for tag in ("a:lnL", "a:lnR", "a:lnT", "a:lnB"):
+        existing = tcPr.find(qn(tag))
+        if existing is not None:
+            tcPr.remove(existing)
+        ln = OxmlElement(tag)
+        ln.set("w", str(int(Pt(1).emu)))
+
+        solid_fill = OxmlElement("a:solidFill")
+        srgb = OxmlElement("a:srgbClr")
+        srgb.set("val", color_hex)
+        solid_fill.append(srgb)
+        ln.append(solid_fill)
+
+        dash = OxmlElement("a:prstDash")
+        dash.set("val", "solid")
+        ln.append(dash)
+
+        tcPr.append(ln)
+
+
+def _style_cell(cell, text, theme, options, style, header=False):
+    # 逐格构建的常规写法；只用来画原型（以及基准里对照）
+    cell.text = text
+    cell.text_frame.word_wrap = True
+    paragraph = cell.text_frame.paragraphs[0]
+    style_font(paragraph.font, theme, options, name=theme.fonts["body"], size=Pt(style.size_pt),
+               bold=style.header_bold if header else None, color=theme.colors["text"], inherit=False)
+    paragraph.alignment = style.header_align if header else style.body_align
+    cell.fill.background()
+    _apply_cell_border(cell, style.border_hex)
+
+
+def _even(total, count):
+    # 与 CT_Table.new_tbl 相同的分配：最后一份补齐余数
+    size = total // count
+    return [size] * (count - 1) + [total - (count - 1) * size]
+
+
+class TableBuilder:
+    """Builds tables by cloning per-style cell prototypes. Get one with
+    :func:`table_builder`, which caches it per theme/options/style."""
+
+    def __init__(self, theme: Theme, options: RenderOptions, style: TableStyle):
+        self.theme = theme
+        self.style = style
+        slide = skeleton.scratch_slide(theme, Inches(13.333333), Inches(7.5))
+        shape = slide.shapes.add_table(2, 1, 0, 0, Inches(1), Inches(1))
+        for row, text in ((0, "表头"), (1, "内容")):
+            _style_cell(shape.table.cell(row, 0), text, theme, options, style, header=row == 0)
+
+        frame = skeleton.snapshot(shape._element)
+        tbl = frame.find(f".//{qn('a:tbl')}")
+        self._header_tc, self._body_tc = (tr.find(qn("a:tc")) for tr in tbl.findall(qn("a:tr")))
+        self._header_p = skeleton.paragraphs(self._header_tc)[0]
+        self._body_p = skeleton.paragraphs(self._body_tc)[0]
+        for child in tbl.findall(qn("a:tr")) + tbl.tblGrid.findall(qn("a:gridCol")):
+            child.getparent().remove(child)
+        self._frame = frame
+
+        self.header_m = measurer(theme.fonts["body"], style.size_pt, bold=style.header_bold)
+        self.body_m = measurer(theme.fonts["body"], style.size_pt)
+
+    def _cell(self, header, text):
+        tc = skeleton.snapshot(self._header_tc if header else self._body_tc)
+        if _PLAIN.match(text):
+            tc.find(_T_PATH).text = text
+        else:
+            skeleton.set_frame_text(tc, self._header_p if header else self._body_p, text)
+        return tc
+
+    def add(
+        self,
+        cloner: skeleton.SlideCloner,
+        left: int,
+        top: int,
+        width: int,
+        height: int,
+        headers: Sequence[str],
+        rows: Sequence[Sequence[str]],
+        row_heights: Optional[Sequence[int]] = None,
+        col_widths: Optional[Sequence[int]] = None,
+    ):
+        """Append a table graphicFrame to the cloner's slide and return it.
+        Without ``row_heights``/``col_widths`` the space is split evenly the
+        same way ``shapes.add_table`` does."""
+        element = cloner.add(self._frame, left, top, width, height)
+        tbl = element.find(f".//{qn('a:tbl')}")
+        for col_width in col_widths or _even(width, len(headers)):
+            tbl.tblGrid.add_gridCol(width=Emu(col_width))
+        heights = row_heights or _even(height, 1 + len(rows))
+        for row_idx, (values, row_height) in enumerate(zip([headers] + list(rows), heights)):
+            tr = tbl.add_tr(height=Emu(row_height))
+            header = row_idx == 0
+            for value in values:
+                tr.append(self._cell(header, value))
+        return element
+
+    def row_heights(self, rows: Sequence[Sequence[str]], col_widths: Sequence[int], header: bool = False) -> List[int]:
+        # 每行取最高的单元格；单元格默认内边距与文本框相同
+        m = self.header_m if header else self.body_m
+        return [
+            max(frame_height([(value, m, 0)], col_width) for value, col_width in zip(row, col_widths))
+            for row in rows
+        ]
+
+
+@lru_cache(maxsize=8)
+def table_builder(theme: Theme, options: Optional[RenderOptions] = None, style: TableStyle = TableStyle()) -> TableBuilder:
+    return TableBuilder(theme, options, style)
+
+
+def add_table_pages(
+    prs,
+    title: str,
+    headers: Sequence[str],
+    rows: Sequence[Sequence[str]],
+    theme: Optional[Theme] = None,
+    options: Optional[RenderOptions] = None,
+    style: TableStyle = TableStyle(),
+) -> list:
+    """Add as many titled slides as ``rows`` need, the header row repeated
+    on each. Returns the new slides."""
+    from .layouts.utils import ensure_bg
+
+    theme = theme or load_theme()
+    builder = table_builder(theme, options, style)
+    left = theme.margins["left"]
+    top = theme.margins["top"] + Inches(1.2)
+    width = prs.slide_width - left - theme.margins["right"]
+    height = prs.slide_height - top - theme.margins["bottom"]
+    col_widths = _even(width, len(headers))
+
+    header_h = builder.row_heights([headers], col_widths, header=True)
+    body_h = builder.row_heights(rows, col_widths)
+    pages = fill_pages(body_h, max(1, height - header_h[0])) or [(0, 0)]
+    slides = []
+    for page, (start, end) in enumerate(pages, start=1):
+        slide = add_title(prs, theme, page_title(title, page, len(pages)), options)
+        ensure_bg(slide, theme)
+        heights = header_h + body_h[start:end]
+        builder.add(skeleton.SlideCloner(slide), left, top, width, sum(heights), headers, rows[start:end],
+                    row_heights=heights, col_widths=col_widths)
+        slides.append(slide)
+    return slides
@@ -0,0 +1,348 @@
+import os
+import re
+import struct
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 文字排版测量：估算一段文字在给定宽度的文本框里折成几行、占多高（EMU），
+# 供布局在放置文本框前判断是否放得下。纯 Python，不依赖 PowerPoint 或 fontTools。
+#
+# 字宽优先从主题字体的 TrueType 文件（hmtx/cmap 表）读取；找不到字体文件时退回内置表：
+# 东亚宽字符按 1 em，拉丁字符用 Helvetica 的 AFM 字宽。每个（字体, 字号, 粗体）的
+# 字宽表只建一次，逐字缓存；折行结果按（文字, 宽度）缓存，布局可以反复调用。
+
+EMU_PER_PT = 12700
+# PowerPoint 文本框默认内边距：左右 0.1"，上下 0.05"
+DEFAULT_INSETS = (91440, 45720, 91440, 45720)
+
+HERE = Path(__file__).parent.parent
+FONT_DIRS = (
+    HERE / "templates" / "fonts",
+    Path.home() / ".fonts",
+    Path.home() / ".local" / "share" / "fonts",
+    Path("/usr/share/fonts"),
+    Path("/usr/local/share/fonts"),
+    Path("/Library/Fonts"),
+    Path("/System/Library/Fonts"),
+    Path(os.environ.get("WINDIR", "C:/Windows")) / "Fonts",
+)
+FONT_EXTENSIONS = (".ttf", ".ttc", ".otf")
+
+# 文件名与字体名对不上的常用中文字体
+_KNOWN_FILES = {
+    ("microsoftyahei", False): ("msyh.ttc", "msyh.ttf"),
+    ("microsoftyahei", True): ("msyhbd.ttc", "msyhbd.ttf"),
+    ("simhei", False): ("simhei.ttf",),
+    ("simsun", False): ("simsun.ttc",),
+    ("pingfangsc", False): ("PingFang.ttc",),
+    ("notosanscjksc", False): ("NotoSansCJK-Regular.ttc", "NotoSansCJKsc-Regular.otf"),
+    ("notosanscjksc", True): ("NotoSansCJK-Bold.ttc", "NotoSansCJKsc-Bold.otf"),
+}
+
+# Helvetica（≈Arial）ASCII 32–126 字宽，单位 1/1000 em
+_LATIN_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_FALLBACK_LINE = {"microsoftyahei": 1.32}
+_BOLD_LATIN = 1.05   # 没有粗体字体文件时，拉丁字符按 5% 加宽估算
+
+# 避头尾：这些标点不能出现在行首 / 行尾，和相邻的字一起折行
+_NO_START = "，。、；：？！）》」』】〕〉”’…—·％,.;:?!)]}%"
+_NO_END = "（《「『【〔〈“‘([{"
+_WIDE = r"\u1100-\u115f\u2e80-\u303e\u3040-\ua4cf\uac00-\ud7a3\uf900-\ufaff\ufe30-\ufe4f\uff00-\uff60\uffe0-\uffe6"
+_TOKEN = re.compile(
+    "[{o}]*(?:[{w}]|[^\\s{w}]+)[{c}]*|\\s+".format(
+        o=re.escape(_NO_END), w=_WIDE, c=re.escape(_NO_START),
+    )
+)
+
+
+def _norm_name(name: str) -> str:
+    return re.sub(r"[\s\-_]+", "", name or "").lower()
+
+
+# ---------- TrueType 读取 ----------
+class _FontFile:
+    # 只保留 cmap 子表与 hmtx；按字符查字宽（单位 em）
+    def __init__(self, data: bytes):
+        base = 0
+        if data[:4] == b"ttcf":
+            base = struct.unpack_from(">I", data, 12)[0]   # 字体集合取第一个字体
+        num_tables = struct.unpack_from(">H", data, base + 4)[0]
+        tables = {}
+        for i in range(num_tables):
+            tag, _, offset, length = struct.unpack_from(">4sIII", data, base + 12 + 16 * i)
+            tables[tag] = (offset, length)
+
+        head = tables[b"head"][0]
+        self.units = struct.unpack_from(">H", data, head + 18)[0]
+        hhea = tables[b"hhea"][0]
+        ascender, descender, line_gap = struct.unpack_from(">hhh", data, hhea + 4)
+        self.line_factor = (ascender - descender + line_gap) / self.units
+        count = struct.unpack_from(">H", data, hhea + 34)[0]
+        hmtx = tables[b"hmtx"][0]
+        self._advances = struct.unpack_from(">" + "Hxx" * count, data, hmtx)
+        self._cmap = self._read_cmap(data, tables[b"cmap"][0])
+
+    @staticmethod
+    def _read_cmap(data: bytes, cmap: int):
+        count = struct.unpack_from(">H", data, cmap + 2)[0]
+        subtables = {}
+        for i in range(count):
+            platform, encoding, offset = struct.unpack_from(">HHI", data, cmap + 4 + 8 * i)
+            subtables[(platform, encoding)] = cmap + offset
+        for key in ((3, 10), (0, 4), (3, 1), (0, 3)):
+            offset = subtables.get(key)
+            if offset is None:
+                continue
+            fmt = struct.unpack_from(">H", data, offset)[0]
+            if fmt == 12:
+                groups = struct.unpack_from(">I", data, offset + 12)[0]
+                flat = struct.unpack_from(">%dI" % (3 * groups), data, offset + 16)
+                return 12, (flat[1::3], flat[0::3], flat[2::3])
+            if fmt == 4:
+                segments = struct.unpack_from(">H", data, offset + 6)[0] // 2
+                ends = struct.unpack_from(">%dH" % segments, data, offset + 14)
+                starts = struct.unpack_from(">%dH" % segments, data, offset + 16 + 2 * segments)
+                deltas = struct.unpack_from(">%dh" % segments, data, offset + 16 + 4 * segments)
+                ranges_at = offset + 16 + 6 * segments
+                ranges = struct.unpack_from(">%dH" % segments, data, ranges_at)
+                length = struct.unpack_from(">H", data, offset + 2)[0]
+                # idRangeOffset 相对自身位置寻址，保留子表剩余部分（glyphIdArray）
+                return 4, (ends, starts, deltas, ranges, ranges_at - offset, data[offset:offset + length])
+        return None, None
+
+    def _glyph(self, code: int) -> int:
+        fmt, table = self._cmap
+        if fmt == 12:
+            ends, starts, first = table
+            i = bisect_left(ends, code)
+            if i < len(ends) and starts[i] <= code:
+                return first[i] + code - starts[i]
+            return 0
+        if fmt == 4 and code <= 0xFFFF:
+            ends, starts, deltas, ranges, ranges_at, raw = table
+            i = bisect_left(ends, code)
+            if i >= len(ends) or code < starts[i]:
+                return 0
+            if ranges[i] == 0:
+                return (code + deltas[i]) & 0xFFFF
+            at = ranges_at + 2 * i + ranges[i] + 2 * (code - starts[i])
+            glyph = struct.unpack_from(">H", raw, at)[0] if at + 2 <= len(raw) else 0
+            return (glyph + deltas[i]) & 0xFFFF if glyph else 0
+        return 0
+
+    def advance(self, ch: str) -> Optional[float]:
+        glyph = self._glyph(ord(ch))
+        if not glyph:
+            return None
+        advances = self._advances
+        return advances[min(glyph, len(advances) - 1)] / self.units
+
+
+@lru_cache(maxsize=1)
+def _font_index() -> Dict[str, Path]:
+    # 文件名（小写）→ 路径；只在第一次需要字体文件时扫描一遍字体目录
+    index: Dict[str, Path] = {}
+    for root in FONT_DIRS:
+        if not root.is_dir():
+            continue
+        for folder, _, files in os.walk(root):
+            for name in files:
+                if name.lower().endswith(FONT_EXTENSIONS):
+                    index.setdefault(name.lower(), Path(folder) / name)
+    return index
+
+
+def find_font_file(font_name: str, bold: bool = False) -> Optional[Path]:
+    key = _norm_name(font_name)
+    index = _font_index()
+    candidates = list(_KNOWN_FILES.get((key, bold), ()))
+    suffixes = ("bold", "bd", "b") if bold else ("", "regular")
+    candidates += [key + suffix + ext for suffix in suffixes for ext in FONT_EXTENSIONS]
+    for name in candidates:
+        path = index.get(name.lower())
+        if path is not None:
+            return path
+    # 文件名里带连字符/下划线的（DejaVuSans-Bold.ttf、NotoSans_Regular.ttf）
+    wanted = {key + suffix for suffix in suffixes}
+    for name, path in index.items():
+        if _norm_name(Path(name).stem) in wanted:
+            return path
+    return None
+
+
+@lru_cache(maxsize=16)
+def _load_font(font_name: str, bold: bool) -> Optional[_FontFile]:
+    path = find_font_file(font_name, bold)
+    if path is None:
+        return None
+    try:
+        return _FontFile(path.read_bytes())
+    except (OSError, KeyError, struct.error):
+        return None
+
+
+# ---------- 测量 ----------
+def _fallback_advance(ch: str, bold: bool) -> float:
+    code = ord(ch)
+    if 32 <= code < 127:
+        width = _LATIN_WIDTHS[code - 32] / 1000
+    elif unicodedata.east_asian_width(ch) in ("W", "F"):
+        return 1.0
+    elif unicodedata.combining(ch) or unicodedata.category(ch) in ("Mn", "Cf"):
+        return 0.0
+    else:
+        width = 0.556
+    return width * _BOLD_LATIN if bold else width
+
+
+class TextMeasurer:
+    """Glyph widths for one font / size / weight. Use :func:`measurer`,
+    which shares one instance per combination."""
+
+    def __init__(self, font_name: str, size_pt: float, bold: bool = False):
+        self.font_name = font_name
+        self.size_pt = size_pt
+        self.bold = bold
+        self.size_emu = int(round(size_pt * EMU_PER_PT))
+        self._font = _load_font(font_name, bold) or (_load_font(font_name, False) if bold else None)
+        # 只有常规体文件时粗体仍按加宽估算
+        self._widen = _BOLD_LATIN if bold and self._font is not None and find_font_file(font_name, True) is None else 1.0
+        factor = self._font.line_factor if self._font else _FALLBACK_LINE.get(_norm_name(font_name), 1.2)
+        self.line_height = int(round(self.size_emu * factor))
+        self._widths: Dict[str, int] = {}
+
+    @property
+    def from_font_file(self) -> bool:
+        return self._font is not None
+
+    def _advance(self, ch: str) -> int:
+        em = self._font.advance(ch) if self._font is not None else None
+        if em is None:
+            em = _fallback_advance(ch, self.bold)
+        elif self._widen != 1.0 and ch.isascii():
+            em *= self._widen
+        width = self._widths[ch] = int(round(em * self.size_emu))
+        return width
+
+    def width(self, text: str) -> int:
+        widths = self._widths
+        total = 0
+        for ch in text:
+            w = widths.get(ch)
+            total += self._advance(ch) if w is None else w
+        return total
+
+    def wrap(self, text: str, width: int) -> List[str]:
+        """Break ``text`` into the lines PowerPoint would show in a frame
+        ``width`` EMU wide (after insets). Hard line breaks are kept."""
+        lines: List[str] = []
+        for paragraph in (text or "").split("\n"):
+            lines.extend(self._wrap_paragraph(paragraph, width))
+        return lines
+
+    def _wrap_paragraph(self, text: str, width: int) -> List[str]:
+        if not text:
+            return [""]
+        lines: List[str] = []
+        line: List[str] = []
+        used = 0       # 当前行已占宽度（不含行尾空格）
+        pending = ""   # 行尾空格：放不下下一个词时不占宽度
+        for token in _TOKEN.findall(text):
+            if token.isspace():
+                if line:
+                    pending += token
+                continue
+            token_w = self.width(token)
+            gap = self.width(pending) if pending else 0
+            if used + gap + token_w <= width:
+                line.append(pending + token)
+                used += gap + token_w
+            else:
+                if line:
+                    lines.append("".join(line))
+                line, used = [], 0
+                if token_w > width:
+                    # 超长单词/URL：逐字断开
+                    for ch in token:
+                        ch_w = self.width(ch)
+                        if line and used + ch_w > width:
+                            lines.append("".join(line))
+                            line, used = [], 0
+                        line.append(ch)
+                        used += ch_w
+                else:
+                    line, used = [token], token_w
+            pending = ""
+        lines.append("".join(line))
+        return lines
+
+    def clip(self, text: str, width: int, max_lines: int = 1) -> str:
+        # 超出 max_lines 行时截断，末行以省略号结尾
+        lines = self.wrap(text, width)
+        if len(lines) <= max_lines:
+            return text
+        last = lines[max_lines - 1]
+        while last and self.width(last + "…") > width:
+            last = last[:-1]
+        kept = lines[:max_lines - 1] + [last.rstrip() + "…"]
+        clipped = kept[0]
+        for line in kept[1:]:
+            # 折行处丢掉的词间空格补回来
+            clipped += (" " if clipped[-1:].isascii() and line[:1].isascii() else "") + line
+        return clipped
+
+    def line_count(self, text: str, width: int) -> int:
+        return _line_count(self, text or "", int(width))
+
+    def height(self, text: str, width: int, spacing: float = 1.0) -> int:
+        return int(self.line_count(text, width) * self.line_height * spacing)
+
+
+@lru_cache(maxsize=16384)
+def _line_count(m: TextMeasurer, text: str, width: int) -> int:
+    return len(m.wrap(text, width))
+
+
+@lru_cache(maxsize=64)
+def _measurer(font_name: str, size_pt: float, bold: bool) -> TextMeasurer:
+    return TextMeasurer(font_name, size_pt, bold)
+
+
+def measurer(font_name: str, size, bold: bool = False) -> TextMeasurer:
+    # size 可以是磅值，也可以是 pptx 的 Length（Pt(12)，本身是 EMU 整数）
+    return _measurer(font_name, size.pt if hasattr(size, "pt") else float(size), bool(bold))
+
+
+def frame_height(
+    paragraphs: Iterable[Tuple[str, TextMeasurer, int]],
+    width: int,
+    insets: Sequence[int] = DEFAULT_INSETS,
+    spacing: float = 1.0,
+) -> int:
+    """Height in EMU of a word-wrapped text frame ``width`` EMU wide holding
+    ``(text, measurer, space_after_emu)`` paragraphs."""
+    left, top, right, bottom = insets
+    inner = max(1, int(width) - left - right)
+    total = top + bottom
+    for text, m, space_after in paragraphs:
+        total += m.height(text, inner, spacing) + int(space_after)
+    return total
+
+
+def fits(paragraphs: Iterable[Tuple[str, TextMeasurer, int]], width: int, height: int,
+         insets: Sequence[int] = DEFAULT_INSETS) -> bool:
+    return frame_height(paragraphs, width, insets) <= int(height)
+
+
+def cache_info():
+    return _line_count.cache_info()
@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+
+from lxml import etree
+from pptx.enum.text import PP_ALIGN
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import XmlPart
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn
+
+# 精简模式（RenderOptions.lean_text）：把正文字体/字号/颜色写进主题字体、母版 otherStyle
+# 与演示文稿 defaultTextStyle，各段落只输出与默认值不同的属性。
+#
+# 文本框（txBox）的文字完全继承上述默认值；自选图形与表格单元格自带 p:style / 表格样式，
+# 其 fontRef 只能可靠地继承字体（minor 主题字体），字号与颜色仍需逐段写出。
+
+_LEVELS = [f"a:lvl{i}pPr" for i in range(1, 10)]
+
+
+def _lean(options) -> bool:
+    return options is not None and getattr(options, "lean_text", False)
+
+
+def _set_theme_fonts(prs, theme) -> None:
+    # python-pptx 把主题当作二进制 Part 加载，没有可写的 XML；
+    # 解析后换成同名的 XmlPart，保存时按修改后的元素序列化
+    master_part = prs.slide_master.part
+    theme_part = master_part.part_related_by(RT.THEME)
+    root = parse_xml(theme_part.blob)
+    for scheme_tag, font_key in (("a:majorFont", "heading"), ("a:minorFont", "body")):
+        scheme = root.find(f".//{qn('a:fontScheme')}/{qn(scheme_tag)}")
+        if scheme is None:
+            continue
+        for script in ("a:latin", "a:ea"):
+            node = scheme.find(qn(script))
+            if node is not None:
+                node.set("typeface", theme.fonts[font_key])
+    new_part = XmlPart(theme_part.partname, theme_part.content_type, theme_part.package, root)
+    # 母版和演示文稿部件都引用主题；全部改指向新部件（主题关系在 XML 里不按 rId 引用）
+    for part in list(theme_part.package.iter_parts()):
+        for r_id, rel in list(part.rels.items()):
+            if not rel.is_external and rel.target_part is theme_part:
+                part.rels.pop(r_id)
+                part.relate_to(new_part, RT.THEME)
+
+
+def _set_level_defaults(style, theme) -> None:
+    size = str(int(theme.sizes["body_pt"] * 100))
+    color = str(theme.colors["text"])
+    for level in _LEVELS:
+        ppr = style.find(qn(level))
+        if ppr is None:
+            continue
+        def_rpr = ppr.find(qn("a:defRPr"))
+        if def_rpr is None:
+            continue
+        def_rpr.set("sz", size)
+        fill = def_rpr.find(qn("a:solidFill"))
+        if fill is not None:
+            for child in list(fill):
+                fill.remove(child)
+            srgb = etree.SubElement(fill, qn("a:srgbClr"))
+            srgb.set("val", color)
+
+
+def apply_text_defaults(prs, theme) -> None:
+    _set_theme_fonts(prs, theme)
+    default_style = prs.part._element.find(qn("p:defaultTextStyle"))
+    if default_style is not None:
+        _set_level_defaults(default_style, theme)
+    other_style = prs.slide_master._element.find(f".//{qn('p:txStyles')}/{qn('p:otherStyle')}")
+    if other_style is not None:
+        _set_level_defaults(other_style, theme)
+
+
+def style_font(font, theme, options=None, *, name=None, size=None, bold=None, color=None, inherit=True):
+    """Set font properties, skipping the ones lean mode can inherit.
+
+    ``inherit=False`` marks text in autoshapes/table cells, whose size and
+    color cannot come from the deck-level defaults.
+    """
+    lean = _lean(options)
+    if name is not None and not (lean and name == theme.fonts["body"]):
+        font.name = name
+    if size is not None and not (lean and inherit and size == theme.pt["body_pt"]):
+        font.size = size
+    if bold is not None:
+        font.bold = bold
+    if color is not None and not (lean and inherit and color == theme.colors["text"]):
+        font.color.rgb = color
+
+
+def style_alignment(paragraph, alignment, options=None, inherit=True):
+    if _lean(options) and inherit and alignment == PP_ALIGN.LEFT:
+        return
+    paragraph.alignment = alignment
+
+
+@dataclass
+class DeckStats:
+    # 精简模式只减少每段写出的属性，形状数不变，所以只统计 slide XML 字节数
+    slides: int
+    xml_bytes: int
+
+    def saved_against(self, baseline: "DeckStats") -> "DeckStats":
+        return DeckStats(slides=self.slides, xml_bytes=baseline.xml_bytes - self.xml_bytes)
+
+
+def deck_stats(prs) -> DeckStats:
+    xml_bytes = sum(len(etree.tostring(slide._element)) for slide in prs.slides)
+    return DeckStats(slides=len(prs.slides), xml_bytes=xml_bytes)
@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# 头图 URL 下载：渲染前并发拉取 RoutedContent 里所有远程 hero_image，存进本地缓存后
+# 把字段换成本地路径。图片按内容哈希存放（blobs/），另按 URL 记下 ETag/Last-Modified
+# （urls/），过了 fresh_seconds 再用条件请求重新验证，304 时直接复用已有文件。
+# 每个请求是 urllib 的阻塞调用，放在线程里跑，并发连接数由信号量限制。
+
+FETCH_VERSION = 1
+CONTENT_TYPES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/bmp": ".bmp",
+    "image/x-ms-bmp": ".bmp",
+    "image/tiff": ".tiff",
+}
+_CHUNK = 64 * 1024
+
+
+class FetchError(Exception):
+    pass
+
+
+@dataclass
+class FetchResult:
+    url: str
+    path: Optional[Path] = None
+    # hit: 缓存仍新鲜；revalidated: 304；fetched: 新下载；stale: 下载失败但有旧文件；error
+    status: str = "error"
+    error: Optional[str] = None
+
+
+def is_remote(value: Optional[str]) -> bool:
+    return bool(value) and value.split(":", 1)[0].lower() in ("http", "https")
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as stream:
+            stream.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+class ImageFetcher:
+    """Concurrent, size- and type-limited image downloads into a
+    content-addressed cache directory. Several processes may share one
+    directory: every file is written atomically."""
+
+    def __init__(
+        self,
+        directory: str,
+        max_connections: int = 8,
+        timeout: float = 15.0,
+        max_bytes: int = 20 * 1024 * 1024,
+        fresh_seconds: float = 600.0,
+        user_agent: str = "Text2PPT image fetcher",
+    ):
+        self.directory = Path(directory)
+        self.max_connections = max(1, max_connections)
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self.user_agent = user_agent
+        self.counts: Dict[str, int] = {}
+
+    def _index_path(self, url: str) -> Path:
+        return self.directory / "urls" / f"{_sha256(f'v{FETCH_VERSION}{url}')}.json"
+
+    def _blob_path(self, digest: str, suffix: str) -> Path:
+        return self.directory / "blobs" / digest[:2] / f"{digest}{suffix}"
+
+    def _load_entry(self, url: str) -> Optional[dict]:
+        try:
+            entry = json.loads(self._index_path(url).read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        # 索引里记的是相对缓存目录的路径，换了工作目录也能用
+        if not entry.get("blob") or not (self.directory / entry["blob"]).is_file():
+            return None
+        return entry
+
+    def _store_entry(self, url: str, entry: dict) -> None:
+        _write_atomic(self._index_path(url), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+    def _read_body(self, response) -> bytes:
+        length = response.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            raise FetchError(f"image is {int(length)} bytes, limit is {self.max_bytes}")
+        chunks: List[bytes] = []
+        size = 0
+        while True:
+            chunk = response.read(_CHUNK)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > self.max_bytes:
+                raise FetchError(f"image exceeds {self.max_bytes} bytes")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _fetch_sync(self, url: str) -> FetchResult:
+        entry = self._load_entry(url)
+        now = time.time()
+        if entry is not None and now - entry.get("checked_at", 0) < self.fresh_seconds:
+            return FetchResult(url, self.directory / entry["blob"], "hit")
+
+        headers = {"User-Agent": self.user_agent, "Accept": ", ".join(CONTENT_TYPES)}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    content_type = (response.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+                    if content_type not in CONTENT_TYPES:
+                        raise FetchError(f"unsupported content type '{content_type or 'missing'}'")
+                    data = self._read_body(response)
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+            except urllib.error.HTTPError as exc:
+                if exc.code == 304 and entry is not None:
+                    self._store_entry(url, dict(entry, checked_at=now))
+                    return FetchResult(url, self.directory / entry["blob"], "revalidated")
+                raise FetchError(f"HTTP {exc.code}") from exc
+        except (FetchError, urllib.error.URLError, OSError, ValueError) as exc:
+            reason = str(exc.reason if isinstance(exc, urllib.error.URLError) else exc)
+            # 源站暂时不可用时沿用上次下载的文件
+            if entry is not None:
+                return FetchResult(url, self.directory / entry["blob"], "stale", reason)
+            return FetchResult(url, None, "error", reason)
+
+        path = self._blob_path(hashlib.sha256(data).hexdigest(), CONTENT_TYPES[content_type])
+        if not path.is_file():
+            _write_atomic(path, data)
+        self._store_entry(url, {
+            "url": url,
+            "blob": path.relative_to(self.directory).as_posix(),
+            "content_type": content_type,
+            "etag": etag,
+            "last_modified": last_modified,
+            "checked_at": now,
+        })
+        return FetchResult(url, path, "fetched")
+
+    async def afetch_all(self, urls: Iterable[str]) -> Dict[str, FetchResult]:
+        unique = list(dict.fromkeys(u for u in urls if is_remote(u)))
+        semaphore = asyncio.Semaphore(self.max_connections)
+
+        async def one(url: str) -> FetchResult:
+            async with semaphore:
+                return await asyncio.to_thread(self._fetch_sync, url)
+
+        results = await asyncio.gather(*(one(url) for url in unique))
+        for result in results:
+            self.counts[result.status] = self.counts.get(result.status, 0) + 1
+        return dict(zip(unique, results))
+
+    def fetch_all(self, urls: Iterable[str]) -> Dict[str, FetchResult]:
+        return asyncio.run(self.afetch_all(urls))
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+
+def remote_images(routed) -> List[str]:
+    return [s.hero_image for s in routed.slides if is_remote(getattr(s, "hero_image", None))]
+
+
+def localize(routed, results: Dict[str, FetchResult]):
+    """Copy of ``routed`` whose remote ``hero_image`` values point at the
+    downloaded files; URLs that could not be fetched are left as they are."""
+    slides = []
+    for slide in routed.slides:
+        result = results.get(getattr(slide, "hero_image", None) or "")
+        if result is not None and result.path is not None:
+            slide = slide.model_copy(update={"hero_image": str(result.path)})
+        slides.append(slide)
+    return replace(routed, slides=slides)
+
+
+async def afetch_hero_images(routed, fetcher: ImageFetcher):
+    results = await fetcher.afetch_all(remote_images(routed))
+    return localize(routed, results), results
+
+
+def fetch_hero_images(routed, fetcher: ImageFetcher):
+    return asyncio.run(afetch_hero_images(routed, fetcher))
@@ -0,0 +1,503 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sqlite3
+import time
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import AppConfig
+from generator.options import ENGINES, TIMELINE_MODES, RenderOptions
+
+# 持久化任务队列：成批重新生成归档时把稿件放进本地 SQLite，由多个工作进程领取处理。
+# 每篇稿件分两个阶段：pending --LLM--> llm_done --渲染--> rendered，重试次数用完则为 failed。
+# LLM 阶段完成后立即把校验过的结构化结果存进库里，进程崩溃或中断后重启，
+# 只会从最后完成的阶段继续，不会再为已结构化的稿件调用一次 LLM。
+# 领取任务在 BEGIN IMMEDIATE 事务里完成并附带租约；持有者崩溃时租约过期，其他进程可重新领取。
+
+STATES = ("pending", "llm_done", "rendered", "failed")
+# 重试也不会有不同结果的错误直接记为 failed：结构化结果校验失败、布局无效、
+# 保存的 JSON 损坏（均为 ValueError）以及输入文件不存在；其余（网络、限流、超时）按退避重试
+PERMANENT_ERRORS = (ValueError, FileNotFoundError, IsADirectoryError)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    out TEXT NOT NULL UNIQUE,
+    text TEXT,
+    news_file TEXT,
+    layout TEXT,
+    state TEXT NOT NULL DEFAULT 'pending'
+        CHECK (state IN ('pending', 'llm_done', 'rendered', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_until REAL,
+    routed TEXT,
+    error TEXT,
+    llm_seconds REAL,
+    render_seconds REAL,
+    created_at REAL NOT NULL,
+    llm_done_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, next_attempt_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+"""
+
+
+@dataclass
+class Job:
+    id: int
+    out: str
+    text: Optional[str]
+    news_file: Optional[str]
+    layout: Optional[str]
+    state: str
+    attempts: int
+    routed: Optional[str]
+
+
+@dataclass
+class WorkerSettings:
+    model: str = AppConfig.model
+    use_cache: bool = True
+    refresh: bool = False
+    chunk_chars: int = AppConfig.chunk_chars
+    preprocess: bool = True
+    token_budget: Optional[int] = None
+    max_attempts: int = 5
+    backoff: float = 30.0          # 第 n 次失败后等待 backoff * 2**(n-1) 秒（带抖动）
+    max_backoff: float = 3600.0
+    lease_seconds: float = 900.0
+    poll_seconds: float = 5.0
+
+
+def backoff_delay(attempts: int, base: float, cap: float) -> float:
+    delay = min(cap, base * 2 ** max(0, attempts - 1))
+    # 抖动避免同一时刻失败的任务（如接口限流）又在同一时刻一起重试
+    return delay * random.uniform(0.5, 1.0)
+
+
+def worker_name(index: int) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+class JobQueue:
+    """SQLite-backed job queue. Every process opens its own connection;
+    claims and state changes run in ``BEGIN IMMEDIATE`` transactions, so
+    one job is never handed to two workers at once."""
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None：事务由下面的 _write 显式控制
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def enqueue(self, out: str, text: Optional[str] = None, news_file: Optional[str] = None,
+                layout: Optional[str] = None, routed: Optional[str] = None) -> bool:
+        """Add one job; returns False if a job for ``out`` already exists, so
+        re-enqueueing a manifest after a crash does not duplicate work."""
+        return self.enqueue_many([(out, text, news_file, layout, routed)]) == 1
+
+    def enqueue_many(self, rows: List[Tuple[str, Optional[str], Optional[str], Optional[str], Optional[str]]]) -> int:
+        now = time.time()
+        with self._write() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (out, text, news_file, layout, routed, state, created_at, llm_done_at) "
+                "VALUES (:out, :text, :news_file, :layout, :routed, "
+                "CASE WHEN :routed IS NULL THEN 'pending' ELSE 'llm_done' END, :now, "
+                "CASE WHEN :routed IS NULL THEN NULL ELSE :now END)",
+                [dict(out=out, text=text, news_file=news_file, layout=layout, routed=routed, now=now)
+                 for out, text, news_file, layout, routed in rows],
+            )
+            return conn.total_changes - before
+
+    def claim(self, owner: str, lease_seconds: float, max_attempts: int) -> Optional[Job]:
+        # 已结构化的任务优先：先把手上的 LLM 结果渲染掉，再去发新的请求
+        while True:
+            now = time.time()
+            with self._write() as conn:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE state IN ('pending', 'llm_done') AND next_attempt_at <= ? "
+                    "AND (lease_until IS NULL OR lease_until < ?) "
+                    "ORDER BY state = 'pending', id LIMIT 1",
+                    (now, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["attempts"] >= max_attempts:
+                    # 每次领取都计一次尝试；持有者接连崩溃（租约过期）也会用完次数
+                    conn.execute(
+                        "UPDATE jobs SET state = 'failed', lease_owner = NULL, lease_until = NULL, "
+                        "finished_at = ?, error = COALESCE(error, 'worker lost the job repeatedly') WHERE id = ?",
+                        (now, row["id"]),
+                    )
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET lease_owner = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                    (owner, now + lease_seconds, row["id"]),
+                )
+            return Job(
+                id=row["id"], out=row["out"], text=row["text"], news_file=row["news_file"], layout=row["layout"],
+                state=row["state"], attempts=row["attempts"] + 1, routed=row["routed"],
+            )
+
+    def _update_owned(self, job: Job, owner: str, assignments: str, params: tuple) -> bool:
+        # 租约已过期并被别的进程领走时不再覆盖对方的进度
+        with self._write() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND lease_owner = ?", params + (job.id, owner))
+            return cursor.rowcount == 1
+
+    def llm_done(self, job: Job, owner: str, routed: str, seconds: float, lease_seconds: float) -> bool:
+        # 进入新阶段时重置尝试次数并续租：渲染阶段有自己的重试额度和租期
+        job.state, job.routed, job.attempts = "llm_done", routed, 1
+        now = time.time()
+        return self._update_owned(
+            job, owner,
+            "state = 'llm_done', routed = ?, llm_seconds = ?, llm_done_at = ?, attempts = 1, error = NULL, "
+            "lease_until = ?",
+            (routed, seconds, now, now + lease_seconds),
+        )
+
+    def rendered(self, job: Job, owner: str, seconds: float) -> bool:
+        return self._update_owned(
+            job, owner,
+            "state = 'rendered', render_seconds = ?, finished_at = ?, error = NULL, "
+            "lease_owner = NULL, lease_until = NULL",
+            (seconds, time.time()),
+        )
+
+    def fail(self, job: Job, owner: str, error: str, settings: WorkerSettings, permanent: bool = False) -> str:
+        now = time.time()
+        if permanent or job.attempts >= settings.max_attempts:
+            state, next_attempt_at, finished_at = "failed", now, now
+        else:
+            state = job.state
+            next_attempt_at = now + backoff_delay(job.attempts, settings.backoff, settings.max_backoff)
+            finished_at = None
+        self._update_owned(
+            job, owner,
+            "state = ?, error = ?, next_attempt_at = ?, finished_at = ?, lease_owner = NULL, lease_until = NULL",
+            (state, error, next_attempt_at, finished_at),
+        )
+        return state
+
+    def release(self, job: Job, owner: str) -> None:
+        # 被中断（Ctrl-C）的任务立即放回，不计这次尝试
+        self._update_owned(job, owner, "lease_owner = NULL, lease_until = NULL, attempts = MAX(0, attempts - 1)", ())
+
+    def retry_failed(self) -> int:
+        with self._write() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = CASE WHEN routed IS NULL THEN 'pending' ELSE 'llm_done' END, "
+                "attempts = 0, next_attempt_at = 0, finished_at = NULL WHERE state = 'failed'")
+            return cursor.rowcount
+
+    def next_wakeup(self) -> Optional[float]:
+        """Earliest time an unfinished job can be claimed, or None when the
+        queue has nothing left to do."""
+        row = self.conn.execute(
+            "SELECT MIN(MAX(next_attempt_at, COALESCE(lease_until, 0))) FROM jobs "
+            "WHERE state IN ('pending', 'llm_done')").fetchone()
+        return row[0]
+
+    def failures(self, limit: int = 20) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            "SELECT id, out, attempts, error FROM jobs WHERE state = 'failed' ORDER BY id LIMIT ?", (limit,)).fetchall()
+
+    def stats(self, windows: Tuple[int, ...] = (60, 600, 3600)) -> Dict[str, object]:
+        now = time.time()
+        depth = {state: 0 for state in STATES}
+        for state, count in self.conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"):
+            depth[state] = count
+        leased, waiting = self.conn.execute(
+            "SELECT COALESCE(SUM(lease_until >= ?), 0), COALESCE(SUM(next_attempt_at > ? AND "
+            "(lease_until IS NULL OR lease_until < ?)), 0) FROM jobs WHERE state IN ('pending', 'llm_done')",
+            (now, now, now)).fetchone()
+        throughput = {}
+        for window in windows:
+            since = now - window
+            # 从 JSON 入队的任务入队时就是 llm_done，没有 llm_seconds，不算进结构化吞吐
+            llm, rendered = self.conn.execute(
+                "SELECT COALESCE(SUM(llm_done_at >= ? AND llm_seconds IS NOT NULL), 0), "
+                "COALESCE(SUM(state = 'rendered' AND finished_at >= ?), 0) FROM jobs", (since, since)).fetchone()
+            throughput[window] = {"llm_per_min": llm * 60 / window, "rendered_per_min": rendered * 60 / window}
+        llm_avg, render_avg = self.conn.execute(
+            "SELECT AVG(llm_seconds), AVG(render_seconds) FROM jobs WHERE state = 'rendered'").fetchone()
+        return {
+            "depth": depth,
+            "in_progress": leased,
+            "backing_off": waiting,
+            "throughput": throughput,
+            "avg_llm_seconds": llm_avg,
+            "avg_render_seconds": render_avg,
+        }
+
+
+def _format_error(exc: BaseException) -> str:
+    detail = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+    return detail or type(exc).__name__
+
+
+def _structure(job: Job, settings: WorkerSettings, cache) -> str:
+    from llm_router import _routed_payload, choose_and_structure
+
+    text = job.text if job.text is not None else Path(job.news_file).read_text(encoding="utf-8")
+    if settings.preprocess:
+        from text_preprocess import preprocess
+
+        text, _ = preprocess(text, settings.token_budget)
+    routed = choose_and_structure(text, model=settings.model, forced_layout=job.layout, cache=cache,
+                                  refresh=settings.refresh, chunk_chars=settings.chunk_chars)
+    return json.dumps(_routed_payload(routed), ensure_ascii=False)
+
+
+def _render(job: Job, options: RenderOptions) -> None:
+    from llm_router import _validate_routed
+    from main import render_deck
+
+    # 库里的结果在写入前已校验过，这里重新构造模型对象
+    routed = _validate_routed(json.loads(job.routed), job.layout)
+    out = Path(job.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    # 先写临时文件再改名：中途崩溃不会留下半截 .pptx
+    tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+    try:
+        render_deck(routed, str(tmp), options)
+        os.replace(tmp, out)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def process_job(queue: JobQueue, job: Job, owner: str, settings: WorkerSettings,
+                options: RenderOptions, cache=None) -> str:
+    """Run the remaining stages of ``job``; returns its new state."""
+    try:
+        if job.state == "pending":
+            started = time.perf_counter()
+            routed = _structure(job, settings, cache)
+            if not queue.llm_done(job, owner, routed, time.perf_counter() - started,
+                                 settings.lease_seconds):
+                return "lost"
+        started = time.perf_counter()
+        _render(job, options)
+        if not queue.rendered(job, owner, time.perf_counter() - started):
+            return "lost"
+        return "rendered"
+    except Exception as exc:
+        return queue.fail(job, owner, _format_error(exc), settings, permanent=isinstance(exc, PERMANENT_ERRORS))
+
+
+def run_worker(db_path: str, index: int, settings: WorkerSettings, options: RenderOptions,
+               max_jobs: Optional[int] = None) -> Dict[str, int]:
+    """Claim and process jobs until the queue has nothing left (or
+    ``max_jobs`` were handled). Jobs waiting on a backoff or on another
+    worker's lease keep the worker polling."""
+    from main import build_cache
+
+    queue = JobQueue(db_path)
+    owner = worker_name(index)
+    cache = build_cache(settings.use_cache)
+    counts: Dict[str, int] = {}
+    handled = 0
+    try:
+        while max_jobs is None or handled < max_jobs:
+            job = queue.claim(owner, settings.lease_seconds, settings.max_attempts)
+            if job is None:
+                wakeup = queue.next_wakeup()
+                if wakeup is None:
+                    break
+                time.sleep(min(settings.poll_seconds, max(0.05, wakeup - time.time())))
+                continue
+            try:
+                state = process_job(queue, job, owner, settings, options, cache)
+            except KeyboardInterrupt:
+                queue.release(job, owner)
+                raise
+            counts[state] = counts.get(state, 0) + 1
+            handled += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        queue.close()
+    return counts
+
+
+def _worker_main(db_path: str, index: int, settings: WorkerSettings, options: RenderOptions,
+                 max_jobs: Optional[int]) -> None:
+    counts = run_worker(db_path, index, settings, options, max_jobs)
+    summary = ", ".join(f"{state} {count}" for state, count in sorted(counts.items())) or "无任务"
+    print(f"工作进程 {index}: {summary}", flush=True)
+
+
+def run_workers(db_path: str, workers: int, settings: WorkerSettings, options: RenderOptions,
+                max_jobs: Optional[int] = None) -> None:
+    if workers <= 1:
+        _worker_main(db_path, 0, settings, options, max_jobs)
+        return
+    processes = [
+        multiprocessing.Process(target=_worker_main, args=(db_path, index, settings, options, max_jobs))
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # 子进程同样收到 SIGINT，会把手上的任务放回队列后退出
+        for process in processes:
+            process.join()
+
+
+def enqueue_manifest(queue: JobQueue, manifest_path: str, default_layout: Optional[str] = None,
+                     from_json_dir: Optional[str] = None) -> Tuple[int, int, List[str]]:
+    """Enqueue a batch manifest (same format as ``--batch``). Items with
+    ``from_json`` start at ``llm_done``. Returns (added, skipped, errors)."""
+    from batch import load_manifest
+    from llm_router import _routed_payload, load_routed_json
+
+    rows = []
+    errors = []
+    for item in load_manifest(manifest_path, default_layout=default_layout, from_json_dir=from_json_dir):
+        if item.error:
+            errors.append(f"#{item.index}: {item.error}")
+            continue
+        routed = None
+        if item.from_json:
+            try:
+                routed = json.dumps(_routed_payload(load_routed_json(item.from_json, item.layout)), ensure_ascii=False)
+            except (OSError, ValueError) as exc:
+                errors.append(f"#{item.index}: {_format_error(exc)}")
+                continue
+        rows.append((str(Path(item.out).resolve()), item.text, item.news_file and str(Path(item.news_file).resolve()),
+                     item.layout, routed))
+    added = queue.enqueue_many(rows)
+    return added, len(rows) - added, errors
+
+
+def print_stats(stats: Dict[str, object]) -> None:
+    depth = stats["depth"]
+    total = sum(depth.values())
+    print(f"队列: 共 {total} | 待结构化 {depth['pending']} | 待渲染 {depth['llm_done']} | "
+          f"已完成 {depth['rendered']} | 失败 {depth['failed']}")
+    print(f"处理中 {stats['in_progress']} | 等待重试 {stats['backing_off']}")
+    for window, rates in stats["throughput"].items():
+        print(f"最近 {window // 60:>3} 分钟: 结构化 {rates['llm_per_min']:7.1f} 篇/分, "
+              f"渲染 {rates['rendered_per_min']:7.1f} 篇/分")
+    if stats["avg_llm_seconds"] is not None or stats["avg_render_seconds"] is not None:
+        llm = stats["avg_llm_seconds"] or 0.0
+        render = stats["avg_render_seconds"] or 0.0
+        print(f"平均耗时: LLM {llm:.2f} s, 渲染 {render:.2f} s")
+    rate = stats["throughput"][max(stats["throughput"])]["rendered_per_min"]
+    remaining = depth["pending"] + depth["llm_done"]
+    if remaining and rate:
+        print(f"预计剩余: {remaining / rate:.0f} 分钟")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Durable SQLite job queue for large batch runs")
+    ap.add_argument("--db", type=str, default=".cache/jobs.sqlite", help="Queue database file")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    enqueue = sub.add_parser("enqueue", help="Add the items of a JSONL manifest (same format as --batch)")
+    enqueue.add_argument("manifest", type=str)
+    enqueue.add_argument("--layout", type=str, default=None, help="Layout for items without their own")
+    enqueue.add_argument("--from-json", type=str, default=None, help="Directory of saved JSON; such items skip the LLM")
+
+    work = sub.add_parser("work", help="Run worker processes until the queue is drained")
+    work.add_argument("--workers", type=int, default=AppConfig.render_workers, help="Worker processes")
+    work.add_argument("--max-jobs", type=int, default=None, help="Stop each worker after this many jobs")
+    work.add_argument("--model", type=str, default=AppConfig.model)
+    work.add_argument("--max-attempts", type=int, default=5, help="Attempts per stage before a job is marked failed")
+    work.add_argument("--backoff", type=float, default=30.0, help="Retry delay after the first failure, doubled each time")
+    work.add_argument("--lease", type=float, default=900.0, help="Seconds before a job held by a silent worker is reclaimed")
+    work.add_argument("--no-cache", action="store_true", help="Neither read nor write the structured-output cache")
+    work.add_argument("--refresh", action="store_true", help="Ignore cached results but store the fresh ones")
+    work.add_argument("--chunk-chars", type=int, default=AppConfig.chunk_chars, help="Split texts longer than this into chunks (default 0: off)")
+    work.add_argument("--no-preprocess", action="store_true", help="Send the text as-is")
+    work.add_argument("--token-budget", type=int, default=None, help="Summarize input above this token estimate")
+    work.add_argument("--engine", type=str, choices=ENGINES, default="clone", help="Render engine")
+    work.add_argument("--timeline-mode", type=str, choices=TIMELINE_MODES, default="fishbone")
+    work.add_argument("--lean-text", action="store_true", help="Put body font/size/color into deck defaults")
+    work.add_argument("--zip-level", type=int, choices=range(10), default=AppConfig.zip_level, metavar="0-9")
+    work.add_argument("--store-media", action="store_true", help="Store already-compressed media without deflating it")
+
+    stats = sub.add_parser("stats", help="Show queue depth and throughput")
+    stats.add_argument("--json", action="store_true", help="Print the numbers as JSON")
+    stats.add_argument("--failures", type=int, default=0, help="Also list up to N failed jobs")
+
+    sub.add_parser("retry", help="Put failed jobs back at the stage they failed in")
+    args = ap.parse_args(argv)
+
+    queue = JobQueue(args.db)
+    try:
+        if args.command == "enqueue":
+            added, skipped, errors = enqueue_manifest(queue, args.manifest, args.layout, args.from_json)
+            for error in errors:
+                print(f"跳过: {error}")
+            print(f"✅ 已加入 {added} 个任务（已存在 {skipped}，无效 {len(errors)}）")
+            return 1 if errors else 0
+        if args.command == "retry":
+            print(f"✅ 已重新排队 {queue.retry_failed()} 个失败任务")
+            return 0
+        if args.command == "stats":
+            numbers = queue.stats()
+            if args.json:
+                print(json.dumps(numbers, ensure_ascii=False, indent=2))
+            else:
+                print_stats(numbers)
+            for row in queue.failures(args.failures) if args.failures else ():
+                print(f"  #{row['id']} {row['out']} (尝试 {row['attempts']}): {row['error']}")
+            return 0
+    finally:
+        queue.close()
+
+    settings = WorkerSettings(
+        model=args.model, use_cache=not args.no_cache, refresh=args.refresh, chunk_chars=args.chunk_chars,
+        preprocess=not args.no_preprocess, token_budget=args.token_budget, max_attempts=max(1, args.max_attempts),
+        backoff=args.backoff, lease_seconds=args.lease,
+    )
+    options = RenderOptions(engine=args.engine, timeline_mode=args.timeline_mode, lean_text=args.lean_text,
+                            image_cache_dir=AppConfig.image_cache_dir, zip_level=args.zip_level,
+                            zip_store_media=args.store_media)
+    started = time.perf_counter()
+    run_workers(args.db, max(1, args.workers), settings, options, args.max_jobs)
+    queue = JobQueue(args.db)
+    try:
+        numbers = queue.stats()
+    finally:
+        queue.close()
+    print(f"用时 {time.perf_counter() - started:.1f} s")
+    print_stats(numbers)
+    return 1 if numbers["depth"]["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,97 @@
+import re
+
+# 模型输出的常见 JSON 瑕疵：Markdown 代码块、前后多余文字、尾逗号、
+# 用中文弯引号当作字符串定界符、Python 字面量、输出被截断（字符串/括号未闭合）。
+# 单遍扫描，字符串内部的内容原样保留。
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.S)
+_WORD = re.compile(r"\w+")
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_OPEN_QUOTES = {'"': '"', "“": "”", "”": "”"}
+_CLOSERS = {"{": "}", "[": "]"}
+_CONTROL = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def _strip_wrapping(text: str) -> str:
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start > 0:
+        text = text[start:]
+    return text.strip()
+
+
+def _trim_tail(text: str, in_object: bool) -> str:
+    # 截断处残留的逗号，以及对象里只写了键、还没写值的 "key" / "key":
+    while True:
+        text = text.rstrip()
+        if text.endswith(","):
+            text = text[:-1]
+            continue
+        if in_object:
+            key = re.search(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*:?$', text)
+            if key:
+                text = text[:key.start() + 1] if key.group(1) == "{" else text[:key.start()]
+                continue
+        return text
+
+
+def repair_json(raw: str) -> str:
+    text = _strip_wrapping(raw or "")
+    out = []
+    stack = []
+    closing_quote = None
+    escape = False
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if closing_quote is not None:
+            if escape:
+                escape = False
+                out.append(ch)
+            elif ch == "\\":
+                escape = True
+                out.append(ch)
+            elif ch == closing_quote or (closing_quote == "”" and ch == '"'):
+                closing_quote = None
+                out.append('"')
+            elif ch == '"':
+                out.append('\\"')
+            elif ch in _CONTROL:
+                out.append(_CONTROL[ch])
+            else:
+                out.append(ch)
+        elif ch in _OPEN_QUOTES:
+            closing_quote = _OPEN_QUOTES[ch]
+            out.append('"')
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+            out.append(ch)
+        elif ch in "}]":
+            # 去掉尾逗号
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if stack and stack[-1] == ch:
+                stack.pop()
+            out.append(ch)
+        elif ch.isalpha():
+            # 未加引号的词（含中文）原样保留，交给 json.loads 报错
+            word = _WORD.match(text, i).group(0)
+            out.append(_LITERALS.get(word, word))
+            i += len(word)
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    if closing_quote is not None:
+        if escape:
+            out.pop()
+        out.append('"')
+    repaired = "".join(out)
+    if stack:
+        repaired = _trim_tail(repaired, stack[-1] == "}") + "".join(reversed(stack))
+    return repaired
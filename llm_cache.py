@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+CACHE_VERSION = 1
+
+
+def normalize_news_text(text: str) -> str:
+    # 同一篇稿件经不同渠道转发时常见的全角/空白差异不应导致缓存未命中
+    normalized = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", normalized).strip()
+
+
+def make_cache_key(model: str, system_prompt: str, enabled_layouts: Iterable[str], news_text: str) -> str:
+    digest = hashlib.sha256()
+    for part in (
+        f"v{CACHE_VERSION}",
+        model,
+        system_prompt,
+        ",".join(enabled_layouts),
+        normalize_news_text(news_text),
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class LLMCache:
+    """Content-addressed on-disk cache for validated LLM output.
+
+    Entries are written atomically (temp file + rename), so several processes
+    can share one directory. Reads bump the file mtime, which drives LRU
+    eviction once the directory exceeds ``max_bytes``; entries older than
+    ``max_age_seconds`` are treated as misses and removed. The first write of
+    each instance scans the directory and enforces both limits, later writes
+    re-run eviction as soon as the tracked size goes over ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age_seconds: Optional[float] = 7 * 24 * 3600,
+        evict_every: int = 64,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.evict_every = max(1, evict_every)
+        # 目录总字节数：首次写入时扫描得到，之后随本进程的写入累加
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.max_age_seconds is not None and now - created_at > self.max_age_seconds
+
+    def get(self, key: str, validate: Optional[Callable[[Any], Any]] = None) -> Any:
+        """Cached payload for ``key``. With ``validate``, returns its result
+        instead; a payload it rejects with ValueError/TypeError is a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as stream:
+                entry = json.load(stream)
+        except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError):
+            self.misses += 1
+            return None
+
+        now = time.time()
+        if self._expired(entry.get("created_at", 0), now):
+            self._unlink(path)
+            self.misses += 1
+            return None
+
+        payload = entry.get("payload")
+        if validate is not None:
+            try:
+                payload = validate(payload)
+            except (ValueError, TypeError):
+                self.misses += 1
+                return None
+
+        try:
+            os.utime(path, (now, now))
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return payload
+
+    def put(self, key: str, payload: dict) -> None:
+        if self._size is None:
+            # 每个 CLI 进程通常只写几次，按写入计数触发永远到不了；第一次写入时先整理一遍
+            self.evict()
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        entry = {"created_at": time.time(), "payload": payload}
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as stream:
+                json.dump(entry, stream, ensure_ascii=False)
+            written = os.path.getsize(tmp_name)
+            os.replace(tmp_name, path)
+        except BaseException:
+            self._unlink(Path(tmp_name))
+            raise
+        self.stores += 1
+        self._size += written - replaced
+        # 共享目录时其他进程的写入不在 _size 里，定期重新扫描一次
+        if self._size > self.max_bytes or self.stores % self.evict_every == 0:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[Path, os.stat_result]]:
+        entries = []
+        if not self.directory.exists():
+            return entries
+        for path in self.directory.glob("*/*.json"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def keys(self) -> Iterator[str]:
+        """Keys of the entries currently on disk (expired ones included
+        until they are evicted)."""
+        return (path.stem for path, _ in self._entries())
+
+    def evict(self) -> int:
+        now = time.time()
+        removed = 0
+        entries = self._entries()
+        kept = []
+        for path, stat in entries:
+            # mtime 会随命中刷新，因此按 mtime 判断过期等价于"长时间未被访问"；
+            # 读取时再按写入时间精确判断
+            if self._expired(stat.st_mtime, now):
+                removed += self._unlink(path)
+            else:
+                kept.append((path, stat))
+
+        total = sum(stat.st_size for _, stat in kept)
+        if total > self.max_bytes:
+            kept.sort(key=lambda item: item[1].st_mtime)
+            for path, stat in kept:
+                if total <= self.max_bytes:
+                    break
+                removed += self._unlink(path)
+                total -= stat.st_size
+
+        self._size = total
+        self.evictions += removed
+        return removed
+
+    @staticmethod
+    def _unlink(path: Path) -> int:
+        try:
+            path.unlink()
+            return 1
+        except FileNotFoundError:
+            return 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
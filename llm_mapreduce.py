@@ -0,0 +1,244 @@
+import asyncio
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from llm_cache import LLMCache
+from llm_router import (
+    AsyncLLMPool,
+    RoutedContent,
+    _build_messages,
+    _cache_lookup,
+    _cache_store,
+    _load_output_json,
+    _request_options,
+    _select_layouts,
+    _validate_routed,
+)
+from text_chunks import split_chunks
+
+# 长文 map-reduce：切块后并行让模型只抽取本块的局部结构（时间线事件、报告小节等），
+# 再在本地合并成一份完整 payload，最后仍走 pydantic 校验（补全逻辑在模型的 validator 里）。
+# 总耗时取决于并发度，而不是全文长度。
+
+CHUNK_NOTE = (
+    "以下是一篇长文的第 {index}/{total} 部分。只根据这一部分提取内容，"
+    "不要补充其他部分的信息；字段数量可以少于布局要求。"
+)
+
+
+def _build_chunk_messages(chunk: str, enabled_layouts: List[str], index: int, total: int) -> List[dict]:
+    messages = _build_messages(chunk, enabled_layouts)
+    messages[1]["content"] = CHUNK_NOTE.format(index=index, total=total) + "\n" + messages[1]["content"]
+    return messages
+
+
+def _norm(value: Any) -> str:
+    return re.sub(r"\s+", "", str(value or "")).lower()
+
+
+def _dedupe(items: List[Any], key: Callable[[Any], str] = _norm) -> List[Any]:
+    seen = set()
+    unique = []
+    for item in items:
+        marker = key(item)
+        if not marker or marker in seen:
+            continue
+        seen.add(marker)
+        unique.append(item)
+    return unique
+
+
+def _first(slides: List[dict], *path: str) -> Any:
+    for slide in slides:
+        value: Any = slide
+        for name in path:
+            value = value.get(name) if isinstance(value, dict) else None
+        if value:
+            return value
+    return None
+
+
+def _slides(partials: List[dict]) -> List[dict]:
+    return [s for p in partials for s in (p.get("slides") or []) if isinstance(s, dict)]
+
+
+def _date_key(date: Any) -> Optional[tuple]:
+    digits = re.findall(r"\d+", str(date or ""))
+    if not digits or len(digits[0]) != 4:
+        return None
+    return tuple(int(d) for d in digits[:3])
+
+
+def _merge_timeline(partials: List[dict]) -> List[dict]:
+    slides = _slides(partials)
+    events = [e for s in slides for e in (s.get("events") or []) if isinstance(e, dict)]
+    # 各块按文档顺序排列，块之间不重叠；同一事件在多个块里被提到（如导语回顾）时
+    # 日期和标题都相同，只保留第一次出现的。同一天的不同事件都保留
+    events = _dedupe(events, key=lambda e: "|".join((_norm(e.get("date")), _norm(e.get("headline")))).strip("|"))
+    keys = [_date_key(e.get("date")) for e in events]
+    if events and all(k is not None for k in keys):
+        events = [e for _, e in sorted(zip(keys, events), key=lambda pair: pair[0])]
+
+    analyses = [s.get("analysis") for s in slides if isinstance(s.get("analysis"), dict)]
+    headers = _first(analyses, "table_headers")
+    rows = [
+        row for a in analyses
+        if a.get("table_rows") and (not headers or a.get("table_headers") in (None, headers))
+        for row in a["table_rows"] if isinstance(row, list)
+    ]
+    analysis = {
+        "table_headers": headers,
+        "table_rows": _dedupe(rows, key=lambda row: "|".join(_norm(c) for c in row)) or None,
+        "key_points": _dedupe([p for a in analyses for p in (a.get("key_points") or [])]) or None,
+    }
+    return [{
+        "title": _first(slides, "title"),
+        "header_title": _first(slides, "header_title"),
+        "heading": _first(slides, "heading"),
+        "events": events,
+        "analysis": analysis if any(analysis.values()) else None,
+    }]
+
+
+def _merge_column(slides: List[dict], side: str) -> dict:
+    sections: Dict[str, dict] = {}
+    for slide in slides:
+        column = slide.get(side) if isinstance(slide.get(side), dict) else {}
+        for section in column.get("sections") or []:
+            if not isinstance(section, dict):
+                continue
+            key = _norm(section.get("subtitle_bold")) or f"#{len(sections)}"
+            merged = sections.setdefault(key, {"subtitle_bold": section.get("subtitle_bold"), "bullets": []})
+            merged["bullets"] = _dedupe(merged["bullets"] + list(section.get("bullets") or []))
+    return {"title": _first(slides, side, "title"), "sections": list(sections.values())}
+
+
+def _merge_news_report(partials: List[dict]) -> List[dict]:
+    slides = _slides(partials)
+    references = [r for s in slides for r in (s.get("references") or []) if isinstance(r, dict)]
+    return [{
+        "header_title": _first(slides, "header_title"),
+        "brand_tag": _first(slides, "brand_tag"),
+        "summary": {
+            "label": _first(slides, "summary", "label"),
+            "bullets": _dedupe([b for s in slides for b in ((s.get("summary") or {}).get("bullets") or [])]),
+        },
+        "left": _merge_column(slides, "left"),
+        "right": _merge_column(slides, "right"),
+        "references": _dedupe(references, key=lambda r: _norm(r.get("label"))) or None,
+    }]
+
+
+def _merge_summary(partials: List[dict]) -> List[dict]:
+    slides = _slides(partials)
+    return [{
+        "title": _first(slides, "title"),
+        "bullets": _dedupe([b for s in slides for b in (s.get("bullets") or [])]),
+    }]
+
+
+MERGERS: Dict[str, Callable[[List[dict]], List[dict]]] = {
+    "timeline": _merge_timeline,
+    "news_report": _merge_news_report,
+    "summary": _merge_summary,
+}
+
+
+def merge_partials(layout: str, partials: List[dict]) -> dict:
+    merger = MERGERS.get(layout)
+    # 没有专门合并规则的布局（如 image_headline）按块顺序拼接各页
+    slides = merger(partials) if merger else _slides(partials)
+    return {"layout": layout, "slides": slides}
+
+
+async def _map_chunk(
+    pool: AsyncLLMPool, model: str, chunk: str, layouts: List[str], index: int, total: int,
+    timeout: Optional[float],
+) -> dict:
+    messages = _build_chunk_messages(chunk, layouts, index, total)
+    response = await pool.create_response(model, messages, timeout=timeout, **_request_options(layouts, partial=True))
+    return _load_output_json(response.output_text)
+
+
+async def _map_all(pool, model, chunks, layouts, indexes, timeout) -> Dict[int, Any]:
+    results = await asyncio.gather(
+        *(_map_chunk(pool, model, chunks[i], layouts, i + 1, len(chunks), timeout) for i in indexes),
+        return_exceptions=True,
+    )
+    for result in results:
+        # 网络/超时错误直接抛出；单块 JSON 无效则跳过该块
+        if isinstance(result, BaseException) and not isinstance(result, ValueError):
+            raise result
+    return dict(zip(indexes, results))
+
+
+def _vote_layout(partials: Dict[int, Any], forced_layout: Optional[str]) -> str:
+    if forced_layout:
+        return forced_layout
+    votes = Counter(p.get("layout") for p in partials.values() if isinstance(p, dict) and p.get("layout"))
+    if not votes:
+        raise ValueError("AI response must include a non-empty 'layout' field")
+    return votes.most_common(1)[0][0]
+
+
+async def astructure_chunked(
+    news_text: str,
+    model: str = "o4-mini",
+    forced_layout: Optional[str] = None,
+    *,
+    chunk_chars: int,
+    pool: AsyncLLMPool,
+    timeout: Optional[float] = None,
+    cache: Optional[LLMCache] = None,
+    refresh: bool = False,
+) -> RoutedContent:
+    enabled_layouts = _select_layouts(forced_layout)
+    # 与整篇请求的结果分开缓存
+    cache_model = f"{model}#chunks={chunk_chars}"
+    key, cached = _cache_lookup(cache, refresh, cache_model, _build_messages(news_text, enabled_layouts),
+                                enabled_layouts, news_text)
+    if cached is not None:
+        return cached
+
+    chunks = split_chunks(news_text, chunk_chars)
+    partials = await _map_all(pool, model, chunks, enabled_layouts, list(range(len(chunks))), timeout)
+    layout = _vote_layout(partials, forced_layout)
+
+    # 选了其他布局的块按多数票布局重新抽取
+    stray = [i for i, p in partials.items() if isinstance(p, dict) and p.get("layout") != layout]
+    if stray:
+        partials.update(await _map_all(pool, model, chunks, [layout], stray, timeout))
+
+    usable = [partials[i] for i in sorted(partials) if isinstance(partials[i], dict) and partials[i].get("layout") == layout]
+    if not usable:
+        errors = [p for p in partials.values() if isinstance(p, BaseException)]
+        raise errors[0] if errors else ValueError("no chunk produced a usable partial result")
+
+    routed = _validate_routed(merge_partials(layout, usable), forced_layout)
+    _cache_store(cache, key, routed)
+    return routed
+
+
+def structure_chunked(
+    news_text: str,
+    model: str = "o4-mini",
+    forced_layout: Optional[str] = None,
+    *,
+    chunk_chars: int,
+    max_concurrency: int = 8,
+    timeout: Optional[float] = None,
+    cache: Optional[LLMCache] = None,
+    refresh: bool = False,
+) -> RoutedContent:
+    async def run() -> RoutedContent:
+        pool = AsyncLLMPool(max_concurrency=max_concurrency, timeout=timeout or 120.0)
+        try:
+            return await astructure_chunked(
+                news_text, model, forced_layout, chunk_chars=chunk_chars, pool=pool,
+                timeout=timeout, cache=cache, refresh=refresh,
+            )
+        finally:
+            await pool.aclose()
+
+    return asyncio.run(run())
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from llm_cache import LLMCache
+
+# llm_router 之下的一层：给定一次 responses.create 请求，返回 output_text。
+# llm_standin 把这些 provider 包装成本地 HTTP 服务，客户端代码不需要任何改动，
+# 只要把 OPENAI_BASE_URL 指向它即可录制或回放。
+
+# 参与请求指纹的字段；stream、timeout 等传输层参数不影响模型输出
+REQUEST_FIELDS = ("model", "instructions", "input", "text", "reasoning", "temperature")
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    fingerprint = {name: request.get(name) for name in REQUEST_FIELDS if request.get(name) is not None}
+    canonical = json.dumps(fingerprint, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ProviderError(Exception):
+    """An error the stand-in server reports to the client as an HTTP status."""
+
+    def __init__(self, status: int, message: str, code: str = "provider_error"):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.code = code
+
+
+class Provider(ABC):
+    @abstractmethod
+    def respond(self, request: Dict[str, Any]) -> str:
+        """Return the ``output_text`` for one responses.create request."""
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+class OpenAIProvider(Provider):
+    """Forwards requests to a real OpenAI-compatible endpoint."""
+
+    def __init__(self, base_url: str = "https://api.openai.com/v1", api_key: Optional[str] = None,
+                 timeout: float = 120.0):
+        from openai import OpenAI
+
+        # 显式传 base_url：避免读到指向 stand-in 自身的 OPENAI_BASE_URL
+        self._client = OpenAI(base_url=base_url, api_key=api_key, timeout=timeout)
+        self.requests = 0
+
+    def respond(self, request: Dict[str, Any]) -> str:
+        params = {name: request[name] for name in REQUEST_FIELDS if request.get(name) is not None}
+        self.requests += 1
+        return self._client.responses.create(**params).output_text
+
+    def stats(self) -> Dict[str, int]:
+        return {"upstream_requests": self.requests}
+
+
+class ReplayStore:
+    """Recorded ``output_text`` per request fingerprint, stored with the same
+    sharded, atomic layout as :class:`LLMCache` but never evicted."""
+
+    def __init__(self, directory: str):
+        self._cache = LLMCache(directory, max_bytes=math.inf, max_age_seconds=None)
+        self._keys: Optional[List[str]] = None
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._cache.get(key)
+        return None if entry is None else entry.get("output_text")
+
+    def put(self, key: str, request: Dict[str, Any], output_text: str) -> None:
+        self._cache.put(key, {"model": request.get("model"), "output_text": output_text})
+        self._keys = None
+
+    def keys(self) -> List[str]:
+        if self._keys is None:
+            self._keys = sorted(self._cache.keys())
+        return self._keys
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+
+class RecordingProvider(Provider):
+    def __init__(self, upstream: Provider, store: ReplayStore):
+        self.upstream = upstream
+        self.store = store
+        self.recorded = 0
+
+    def respond(self, request: Dict[str, Any]) -> str:
+        output_text = self.upstream.respond(request)
+        self.store.put(request_key(request), request, output_text)
+        self.recorded += 1
+        return output_text
+
+    def stats(self) -> Dict[str, int]:
+        return {"recorded": self.recorded, **self.upstream.stats()}
+
+
+class Latency:
+    """Artificial service time, parsed from ``none``, ``fixed:S``,
+    ``uniform:LOW,HIGH`` or ``lognormal:MEDIAN,SIGMA`` (seconds)."""
+
+    def __init__(self, spec: str = "none", seed: Optional[int] = None):
+        kind, _, args = spec.partition(":")
+        values = [float(v) for v in args.split(",") if v.strip()]
+        expected = {"none": 0, "fixed": 1, "uniform": 2, "lognormal": 2}
+        if kind not in expected or len(values) != expected[kind]:
+            raise ValueError(f"invalid latency spec {spec!r}")
+        self.spec = spec
+        self.kind = kind
+        self.values = values
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.kind == "fixed":
+                return self.values[0]
+            if self.kind == "uniform":
+                return self._rng.uniform(*self.values)
+            if self.kind == "lognormal":
+                median, sigma = self.values
+                return self._rng.lognormvariate(math.log(median), sigma)
+            return 0.0
+
+
+class ReplayProvider(Provider):
+    """Serves recorded responses with artificial latency and injected errors.
+
+    ``on_miss="any"`` answers unknown requests with a recording picked
+    deterministically from the request fingerprint, so load tests can use
+    texts that were never recorded.
+    """
+
+    def __init__(
+        self,
+        store: ReplayStore,
+        latency: Optional[Latency] = None,
+        error_rate: float = 0.0,
+        error_statuses: tuple = (500,),
+        on_miss: str = "error",
+        seed: Optional[int] = None,
+    ):
+        if on_miss not in ("error", "any"):
+            raise ValueError("on_miss must be 'error' or 'any'")
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.store = store
+        self.latency = latency or Latency()
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.on_miss = on_miss
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.injected_errors = 0
+
+    def _inject_error(self) -> Optional[int]:
+        with self._lock:
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.injected_errors += 1
+                return self._rng.choice(self.error_statuses)
+        return None
+
+    def lookup(self, request: Dict[str, Any]) -> str:
+        key = request_key(request)
+        output_text = self.store.get(key)
+        with self._lock:
+            if output_text is not None:
+                self.hits += 1
+                return output_text
+            self.misses += 1
+        keys = self.store.keys()
+        if self.on_miss == "any" and keys:
+            output_text = self.store.get(keys[int(key, 16) % len(keys)])
+            if output_text is not None:
+                return output_text
+        raise ProviderError(404, f"no recording for request {key[:12]}", code="replay_miss")
+
+    def respond(self, request: Dict[str, Any]) -> str:
+        time.sleep(self.latency.sample())
+        status = self._inject_error()
+        if status is not None:
+            raise ProviderError(status, f"injected error {status}", code="injected_error")
+        return self.lookup(request)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "injected_errors": self.injected_errors}
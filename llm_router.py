@@ -1,13 +1,22 @@
-﻿import json
+﻿from __future__ import annotations
+
+import json
+from collections import Counter
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from config_registry import REGISTRY, freeze, read_yaml
+from json_repair import repair_json
+from llm_cache import LLMCache, make_cache_key
+from stream_parser import SlideStreamParser
 
-import yaml
-from openai import OpenAI
-from pydantic import ValidationError
+# openai / pydantic / asyncio 导入较慢，推迟到真正需要调用或校验时再导入
+if TYPE_CHECKING:
+    import asyncio
 
-from content_schema import RoutedNewsReport, RoutedTimeline
+    from openai import AsyncOpenAI, OpenAI
 
 HERE = Path(__file__).parent
 PROMPT_DIR = HERE / "templates" / "prompts"
@@ -19,13 +28,20 @@ class RoutedContent:
     slides: List[dict]
 
 
+LAYOUTS_PATH = HERE / "templates" / "layouts.yaml"
+
+# 进程内计数：schema 请求数、JSON 修复、校验失败页、重问、被补全/截断的字段
+ROUTER_STATS: Counter = Counter()
+_VALIDATION_CONTEXT = {"stats": ROUTER_STATS}
+
+
 def _read_prompt(path: Path) -> str:
     if not path.exists():
         return ""
     return path.read_text(encoding="utf-8").strip()
 
 
-def build_system_prompt(enabled_layouts: List[str]) -> str:
+def _compile_system_prompt(enabled_layouts: Tuple[str, ...]) -> str:
     base_prompt = _read_prompt(PROMPT_DIR / "base.md")
     if not base_prompt:
         raise FileNotFoundError(f"Missing base prompt file at {PROMPT_DIR / 'base.md'}")
@@ -38,103 +54,87 @@ def build_system_prompt(enabled_layouts: List[str]) -> str:
     return "\n\n".join(part for part in sections if part)
 
 
-def load_layouts() -> Dict[str, Any]:
-    with open(HERE / "templates" / "layouts.yaml", "r", encoding="utf-8") as stream:
-        return yaml.safe_load(stream)
+def build_system_prompt(enabled_layouts: List[str]) -> str:
+    layouts = tuple(enabled_layouts)
+    paths = [PROMPT_DIR / "base.md"] + [PROMPT_DIR / f"{layout}.md" for layout in layouts]
+    return REGISTRY.get(("system_prompt", layouts), paths, lambda: _compile_system_prompt(layouts))
 
 
-LAYOUT_VALIDATORS = {
-    "news_report": RoutedNewsReport,
-    "timeline": RoutedTimeline,
-}
+def load_layouts() -> Mapping[str, Any]:
+    return REGISTRY.get("layouts", (LAYOUTS_PATH,), lambda: freeze(read_yaml(LAYOUTS_PATH)))
 
 
-def _fill_bullets(source, minimum: int, placeholder: str) -> List[str]:
-    cleaned = [str(item).strip() for item in (source or []) if str(item).strip()]
-    if not cleaned:
-        cleaned = [placeholder]
-    cleaned = cleaned[:6]
-    while len(cleaned) < minimum:
-        cleaned.append(cleaned[-1])
-    return cleaned
+@lru_cache(maxsize=None)
+def slide_models() -> Dict[str, Any]:
+    from content_schema import ImageHeadlineSlide, NewsReportSlide, SummarySlide, TimelineSlide
 
+    return {
+        "news_report": NewsReportSlide,
+        "timeline": TimelineSlide,
+        "summary": SummarySlide,
+        "image_headline": ImageHeadlineSlide,
+    }
 
-def _coerce_news_report_payload(data: dict) -> dict:
-    slides = data.get("slides")
-    if not isinstance(slides, list):
-        return data
-    placeholder = "待补充"
-    for slide in slides:
-        if not isinstance(slide, dict):
-            continue
-        summary = slide.get("summary") or {}
-        summary_bullets = _fill_bullets(summary.get("bullets"), 3, placeholder)
-        summary["bullets"] = summary_bullets
-        slide["summary"] = summary
-        for side, label in (("left", "左列"), ("right", "右列")):
-            column = slide.get(side) or {}
-            sections = [sec for sec in (column.get("sections") or []) if isinstance(sec, dict)]
-            while len(sections) < 2:
-                sections.append({
-                    "subtitle_bold": f"{label}补充{len(sections) + 1}",
-                    "bullets": summary_bullets[:3],
-                })
-            for idx, section in enumerate(sections):
-                section["bullets"] = _fill_bullets(section.get("bullets"), 3, placeholder)
-                if not section.get("subtitle_bold"):
-                    section["subtitle_bold"] = f"{label}要点{idx + 1}"
-            column["sections"] = sections[:6]
-            if not column.get("title"):
-                column["title"] = f"{label}要点"
-            slide[side] = column
-    return data
 
+@lru_cache(maxsize=None)
+def slide_validators() -> Dict[str, Any]:
+    # 每个布局一个 TypeAdapter，核心校验器只编译一次；补全逻辑在模型的 validator 里
+    from pydantic import TypeAdapter
 
-def _coerce_timeline_payload(data: dict) -> dict:
-    slides = data.get("slides")
-    if not isinstance(slides, list):
-        return data
-    for slide in slides:
-        if not isinstance(slide, dict):
-            continue
-        events = [ev for ev in (slide.get("events") or []) if isinstance(ev, dict)]
-        if not events:
-            continue
-        for idx, event in enumerate(events, start=1):
-            date_raw = str(event.get("date", "")).strip()
-            if not date_raw:
-                event["date"] = f"日期缺失-事件{idx}"
-            else:
-                event["date"] = date_raw
-            headline_raw = str(event.get("headline", "")).strip()
-            if not headline_raw:
-                event["headline"] = f"事件{idx}"
-            else:
-                event["headline"] = headline_raw
-            detail_raw = event.get("detail")
-            if detail_raw is not None:
-                trimmed = str(detail_raw).strip()
-                event["detail"] = trimmed or None
-        slide["events"] = events[:8]
-    return data
+    return {layout: TypeAdapter(model) for layout, model in slide_models().items()}
+
+
+@lru_cache(maxsize=None)
+def _deck_format(enabled_layouts: Tuple[str, ...], partial: bool = False) -> Optional[dict]:
+    models = slide_models()
+    if not all(layout in models for layout in enabled_layouts):
+        # 有布局没有对应模型时无法约束，只靠提示词
+        return None
+    from output_schema import deck_schema, text_format
+
+    schema = deck_schema({layout: models[layout] for layout in enabled_layouts}, partial=partial)
+    return text_format("routed_deck_chunk" if partial else "routed_deck", schema)
 
 
-def choose_and_structure(news_text: str, model: str = "o4-mini", forced_layout: Optional[str] = None) -> RoutedContent:
+@lru_cache(maxsize=None)
+def _slide_format(layout: str) -> Optional[dict]:
+    model = slide_models().get(layout)
+    if model is None:
+        return None
+    from output_schema import slide_schema, text_format
+
+    return text_format(f"{layout}_slide", slide_schema(model))
+
+
+def _request_options(enabled_layouts: List[str], single_slide: bool = False, partial: bool = False) -> Dict[str, Any]:
+    # 按布局集合缓存的 structured output 格式；layouts.yaml 里 structured_output: false 可关闭。
+    # partial 用于 map-reduce 的分块请求：字段可为 null，合并后的完整结果再按模型校验
+    if not load_layouts().get("structured_output", True):
+        return {}
+    fmt = _slide_format(enabled_layouts[0]) if single_slide else _deck_format(tuple(enabled_layouts), partial)
+    if fmt is None:
+        return {}
+    ROUTER_STATS["schema_requests"] += 1
+    return {"text": fmt}
+
+
+def _select_layouts(forced_layout: Optional[str]) -> List[str]:
     layouts_cfg = load_layouts()
     available_layouts = layouts_cfg.get("layouts", {})
 
     if forced_layout:
         if forced_layout not in available_layouts:
             raise ValueError(f"Unknown layout '{forced_layout}' requested via --layout")
-        enabled_layouts = [forced_layout]
-    else:
-        enabled_layouts = [name for name, cfg in available_layouts.items() if cfg.get("enabled", False)]
-        if not enabled_layouts:
-            raise ValueError("No layouts are enabled in templates/layouts.yaml")
+        return [forced_layout]
 
-    system_prompt = build_system_prompt(enabled_layouts)
+    enabled_layouts = [name for name, cfg in available_layouts.items() if cfg.get("enabled", False)]
+    if not enabled_layouts:
+        raise ValueError("No layouts are enabled in templates/layouts.yaml")
+    return enabled_layouts
 
-    client = OpenAI()
+
+def _build_messages(news_text: str, enabled_layouts: List[str]) -> List[dict]:
+    system_prompt = build_system_prompt(enabled_layouts)
     user_prompt = (
         "可选布局: "
         + ", ".join(enabled_layouts)
@@ -142,47 +142,587 @@ def choose_and_structure(news_text: str, model: str = "o4-mini", forced_layout:
         + news_text.strip()
         + "\"\"\""
     )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
 
-    response = client.responses.create(
-        model=model,
-        input=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-    )
-
-    raw_output = response.output_text
 
+def _load_output_json(raw_output: str) -> dict:
     try:
         data = json.loads(raw_output)
     except json.JSONDecodeError as exc:
-        snippet = raw_output[:300].replace("\n", " ")
-        raise ValueError(f"AI response is not valid JSON: {exc}. Snippet: {snippet}...") from exc
+        # 代码块、尾逗号、弯引号、截断等常见瑕疵先在本地修复，修不好再报错
+        try:
+            data = json.loads(repair_json(raw_output))
+            ROUTER_STATS["json_repaired"] += 1
+        except json.JSONDecodeError:
+            snippet = raw_output[:300].replace("\n", " ")
+            raise ValueError(f"AI response is not valid JSON: {exc}. Snippet: {snippet}...") from exc
+    if not isinstance(data, dict):
+        raise ValueError("AI response must be a JSON object")
+    return data
 
-    layout = data.get("layout")
+
+def _parse_routed_output(raw_output: str, forced_layout: Optional[str]) -> RoutedContent:
+    return _validate_routed(_load_output_json(raw_output), forced_layout)
+
+
+@dataclass
+class SlideFailure:
+    index: int
+    slide: Any
+    errors: List[str]
+
+    def describe(self) -> str:
+        return f"slide {self.index}: " + "; ".join(self.errors)
+
+
+def _error_paths(exc: Any) -> List[str]:
+    # pydantic 错误路径，例如 "events.3.date: Value error, ..."
+    errors = []
+    for err in exc.errors():
+        path = ".".join(str(part) for part in err["loc"])
+        errors.append(f"{path}: {err['msg']}" if path else err["msg"])
+    return errors
+
+
+def _check_slide(layout: str, slide: Any) -> Tuple[Any, Optional[List[str]]]:
+    validator = slide_validators().get(layout)
+    if validator is None:
+        return slide, None
+    from pydantic import ValidationError
+
+    try:
+        return validator.validate_python(slide, context=_VALIDATION_CONTEXT), None
+    except ValidationError as exc:
+        return slide, _error_paths(exc)
+
+
+def _check_layout(layout: Any, forced_layout: Optional[str]) -> None:
     if not isinstance(layout, str) or not layout:
         raise ValueError("AI response must include a non-empty 'layout' field")
-
     if forced_layout and layout != forced_layout:
         raise ValueError(f"AI response layout '{layout}' did not match forced layout '{forced_layout}'")
+    # 没有渲染器的布局在这里拦下，不要等到渲染阶段才失败
+    from generator.layouts import LAYOUTS
+
+    if layout not in LAYOUTS:
+        raise ValueError(f"AI response layout '{layout}' is not one of: {', '.join(LAYOUTS)}")
 
-    if layout == "news_report":
-        data = _coerce_news_report_payload(data)
-    elif layout == "timeline":
-        data = _coerce_timeline_payload(data)
+
+def _validate_routed_partial(
+    data: dict, forced_layout: Optional[str]
+) -> Tuple[str, List[Any], List[SlideFailure]]:
+    """Validate ``data`` slide by slide. Returns the layout, the validated
+    slides (``None`` where a slide failed) and one :class:`SlideFailure` per
+    failed slide."""
+    layout = data.get("layout")
+    _check_layout(layout, forced_layout)
 
     slides_payload = data.get("slides")
     if not isinstance(slides_payload, list):
         raise ValueError("AI response must include a 'slides' array")
 
-    validator = LAYOUT_VALIDATORS.get(layout)
-    if validator:
-        try:
-            validated = validator(**data)
-        except ValidationError as exc:
-            raise ValueError(f"AI JSON failed validation for layout '{layout}': {exc}") from exc
-        slides = [slide.model_dump(mode="python") for slide in validated.slides]
-    else:
-        slides = slides_payload
-
+    slides: List[Any] = []
+    failures: List[SlideFailure] = []
+    for index, slide in enumerate(slides_payload):
+        checked, errors = _check_slide(layout, slide)
+        if errors:
+            failures.append(SlideFailure(index, slide, errors))
+            checked = None
+        slides.append(checked)
+    ROUTER_STATS["failed_slides"] += len(failures)
+    return layout, slides, failures
+
+
+def _validate_routed(data: dict, forced_layout: Optional[str]) -> RoutedContent:
+    layout, slides, failures = _validate_routed_partial(data, forced_layout)
+    if failures:
+        detail = " | ".join(failure.describe() for failure in failures)
+        raise ValueError(f"AI JSON failed validation for layout '{layout}': {detail}")
     return RoutedContent(layout=layout, slides=slides)
+
+
+REASK_NOTE = (
+    "你上一次输出的第 {number} 页 slide 没有通过校验，错误如下：\n{errors}\n\n"
+    "该页原输出：\n{slide}\n\n"
+    "请根据原文只重新生成这一页，只返回修正后的这一页 slide JSON 对象，"
+    "不要包含 layout 或 slides 外层。"
+)
+
+
+def _reask_messages(news_text: str, layout: str, failure: SlideFailure) -> List[dict]:
+    # 前缀与首次请求相同，只追加一条针对失败页的说明，输出也只有一页
+    messages = _build_messages(news_text, [layout])
+    messages.append({
+        "role": "user",
+        "content": REASK_NOTE.format(
+            number=failure.index + 1,
+            errors="\n".join(f"- {error}" for error in failure.errors),
+            slide=json.dumps(failure.slide, ensure_ascii=False),
+        ),
+    })
+    return messages
+
+
+def _parse_reask_output(raw_output: str, layout: str) -> Optional[Any]:
+    try:
+        data = _load_output_json(raw_output)
+    except ValueError:
+        return None
+    slides = data.get("slides")
+    if isinstance(slides, list) and len(slides) == 1:
+        # 模型有时仍按整篇格式返回
+        data = slides[0]
+    slide, errors = _check_slide(layout, data)
+    return None if errors else slide
+
+
+def _merge_reasked(
+    layout: str, slides: List[Any], failures: List[SlideFailure], fixed: List[Optional[Any]]
+) -> RoutedContent:
+    # 重问仍失败的页直接丢弃；一页都没有留下时才报错
+    replaced = {failure.index: slide for failure, slide in zip(failures, fixed)}
+    kept = [replaced.get(index) if slide is None else slide for index, slide in enumerate(slides)]
+    kept = [slide for slide in kept if slide is not None]
+    if not kept:
+        detail = " | ".join(failure.describe() for failure in failures)
+        raise ValueError(f"AI JSON failed validation for layout '{layout}': {detail}")
+    return RoutedContent(layout=layout, slides=kept)
+
+
+_client: Optional[OpenAI] = None
+
+
+def _get_client() -> OpenAI:
+    global _client
+    if _client is None:
+        from openai import OpenAI
+
+        _client = OpenAI()
+    return _client
+
+
+def _cache_lookup(
+    cache: Optional[LLMCache],
+    refresh: bool,
+    model: str,
+    messages: List[dict],
+    enabled_layouts: List[str],
+    news_text: str,
+) -> Tuple[Optional[str], Optional[RoutedContent]]:
+    if cache is None:
+        return None, None
+    key = make_cache_key(model, messages[0]["content"], enabled_layouts, news_text)
+    if refresh:
+        return key, None
+    # 模型定义变了、旧缓存不再通过校验时按未命中处理（不计入命中）
+    return key, cache.get(key, lambda payload: _validate_routed(dict(payload), None))
+
+
+def _routed_payload(routed: RoutedContent) -> dict:
+    # 模型转回与 LLM 输出同格式、可 JSON 序列化的 dict
+    slides = [slide.model_dump(mode="json") if hasattr(slide, "model_dump") else slide for slide in routed.slides]
+    return {"layout": routed.layout, "slides": slides}
+
+
+def _cache_store(cache: Optional[LLMCache], key: Optional[str], routed: RoutedContent) -> None:
+    if cache is not None and key is not None:
+        cache.put(key, _routed_payload(routed))
+
+
+def _needs_chunking(news_text: str, chunk_chars: int) -> bool:
+    # chunk_chars 为 0 表示关闭分块；超过该长度的正文走 llm_mapreduce
+    return bool(chunk_chars) and len(news_text) > chunk_chars
+
+
+def dump_routed_json(routed: RoutedContent, path) -> None:
+    # 与模型输出同一格式，之后可以跳过 LLM 直接重新渲染
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(_routed_payload(routed), ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def load_routed_json(path, forced_layout: Optional[str] = None) -> RoutedContent:
+    # 文件可能被编辑手工修改过，按模型输出同样的规则重新校验
+    return _parse_routed_output(Path(path).read_text(encoding="utf-8"), forced_layout)
+
+
+def choose_and_structure(
+    news_text: str,
+    model: str = "o4-mini",
+    forced_layout: Optional[str] = None,
+    cache: Optional[LLMCache] = None,
+    refresh: bool = False,
+    chunk_chars: int = 0,
+    chunk_concurrency: int = 8,
+    timeout: Optional[float] = None,
+) -> RoutedContent:
+    if _needs_chunking(news_text, chunk_chars):
+        from llm_mapreduce import structure_chunked
+
+        return structure_chunked(news_text, model, forced_layout, chunk_chars=chunk_chars,
+                                 max_concurrency=chunk_concurrency, timeout=timeout, cache=cache, refresh=refresh)
+
+    enabled_layouts = _select_layouts(forced_layout)
+    messages = _build_messages(news_text, enabled_layouts)
+    key, cached = _cache_lookup(cache, refresh, model, messages, enabled_layouts, news_text)
+    if cached is not None:
+        return cached
+
+    response = _get_client().responses.create(model=model, input=messages, **_timeout_option(timeout),
+                                              **_request_options(enabled_layouts))
+
+    layout, slides, failures = _validate_routed_partial(_load_output_json(response.output_text), forced_layout)
+    fixed = _reask_slides(news_text, model, layout, failures, timeout)
+    routed = _merge_reasked(layout, slides, failures, fixed)
+    _cache_store(cache, key, routed)
+    return routed
+
+
+def _timeout_option(timeout: Optional[float]) -> dict:
+    # 不传则用客户端默认超时；显式传 None 在 openai SDK 里表示不限时
+    return {} if timeout is None else {"timeout": timeout}
+
+
+def _reask_slide(
+    news_text: str, model: str, layout: str, failure: SlideFailure, timeout: Optional[float] = None
+) -> Optional[Any]:
+    ROUTER_STATS["reasks"] += 1
+    response = _get_client().responses.create(model=model, input=_reask_messages(news_text, layout, failure),
+                                              **_timeout_option(timeout),
+                                              **_request_options([layout], single_slide=True))
+    return _parse_reask_output(response.output_text, layout)
+
+
+def _reask_slides(
+    news_text: str, model: str, layout: str, failures: List[SlideFailure], timeout: Optional[float] = None
+) -> List[Optional[Any]]:
+    if len(failures) <= 1:
+        return [_reask_slide(news_text, model, layout, failure, timeout) for failure in failures]
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(len(failures), 8)) as executor:
+        return list(executor.map(lambda failure: _reask_slide(news_text, model, layout, failure, timeout),
+                                 failures))
+
+
+class AsyncLLMPool:
+    # 共享一个长连接 AsyncOpenAI 客户端，信号量限制同时在途的请求数。
+    # 连接与事件循环绑定：换了 loop（例如连续两次 asyncio.run）时会重建客户端。
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        timeout: float = 120.0,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        max_retries: int = 2,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.base_url = base_url
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self._client: Optional[AsyncOpenAI] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind(self) -> None:
+        import asyncio
+
+        from openai import AsyncOpenAI
+
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._client is not None:
+            return
+        self._loop = loop
+        self._client = AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            timeout=self.timeout,
+            max_retries=self.max_retries,
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        self._bind()
+        return self._client
+
+    async def create_response(
+        self, model: str, messages: List[dict], timeout: Optional[float] = None, **options: Any
+    ):
+        self._bind()
+        async with self._semaphore:
+            return await self._client.responses.create(
+                model=model,
+                input=messages,
+                timeout=timeout if timeout is not None else self.timeout,
+                **options,
+            )
+
+    async def stream_response(
+        self, model: str, messages: List[dict], timeout: Optional[float] = None, **options: Any
+    ) -> AsyncIterator[Any]:
+        self._bind()
+        async with self._semaphore:
+            stream = await self._client.responses.create(
+                model=model,
+                input=messages,
+                stream=True,
+                timeout=timeout if timeout is not None else self.timeout,
+                **options,
+            )
+            async with stream:
+                async for event in stream:
+                    yield event
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+
+
+_default_pool: Optional[AsyncLLMPool] = None
+
+
+def get_async_pool() -> AsyncLLMPool:
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = AsyncLLMPool()
+    return _default_pool
+
+
+async def achoose_and_structure(
+    news_text: str,
+    model: str = "o4-mini",
+    forced_layout: Optional[str] = None,
+    *,
+    pool: Optional[AsyncLLMPool] = None,
+    timeout: Optional[float] = None,
+    cache: Optional[LLMCache] = None,
+    refresh: bool = False,
+    chunk_chars: int = 0,
+) -> RoutedContent:
+    if _needs_chunking(news_text, chunk_chars):
+        from llm_mapreduce import astructure_chunked
+
+        return await astructure_chunked(news_text, model, forced_layout, chunk_chars=chunk_chars,
+                                        pool=pool or get_async_pool(), timeout=timeout,
+                                        cache=cache, refresh=refresh)
+
+    enabled_layouts = _select_layouts(forced_layout)
+    messages = _build_messages(news_text, enabled_layouts)
+    key, cached = _cache_lookup(cache, refresh, model, messages, enabled_layouts, news_text)
+    if cached is not None:
+        return cached
+
+    pool = pool or get_async_pool()
+    response = await pool.create_response(model, messages, timeout=timeout, **_request_options(enabled_layouts))
+
+    layout, slides, failures = _validate_routed_partial(_load_output_json(response.output_text), forced_layout)
+    fixed = await _areask_slides(pool, news_text, model, layout, failures, timeout)
+    routed = _merge_reasked(layout, slides, failures, fixed)
+    _cache_store(cache, key, routed)
+    return routed
+
+
+async def _areask_slide(
+    pool: AsyncLLMPool, news_text: str, model: str, layout: str, failure: SlideFailure,
+    timeout: Optional[float],
+) -> Optional[Any]:
+    ROUTER_STATS["reasks"] += 1
+    messages = _reask_messages(news_text, layout, failure)
+    response = await pool.create_response(model, messages, timeout=timeout,
+                                          **_request_options([layout], single_slide=True))
+    return _parse_reask_output(response.output_text, layout)
+
+
+async def _areask_slides(
+    pool: AsyncLLMPool, news_text: str, model: str, layout: str, failures: List[SlideFailure],
+    timeout: Optional[float],
+) -> List[Optional[Any]]:
+    import asyncio
+
+    return list(await asyncio.gather(
+        *(_areask_slide(pool, news_text, model, layout, failure, timeout) for failure in failures)
+    ))
+
+
+class _SlideStream:
+    # 把增量解析出的 slide 逐个校验后交出；增量解析失败时退回整篇解析（含 JSON 修复）。
+    # 校验失败的页以 SlideFailure 交出，由调用方重问后再 record。
+    def __init__(self, forced_layout: Optional[str]):
+        self.forced_layout = forced_layout
+        self.parser = SlideStreamParser()
+        self.layout: Optional[str] = None
+        self.pending: List[Any] = []
+        self.slides: List[Any] = []
+        self.seen = 0
+
+    def _emit(self, slide: Any) -> Any:
+        index = self.seen
+        self.seen += 1
+        checked, errors = _check_slide(self.layout, slide)
+        if errors:
+            ROUTER_STATS["failed_slides"] += 1
+            return SlideFailure(index, slide, errors)
+        return self.layout, checked
+
+    def feed(self, delta: str) -> List[Any]:
+        ready = []
+        for kind, value in self.parser.feed(delta):
+            if kind == "layout":
+                _check_layout(value, self.forced_layout)
+                self.layout = value
+                ready.extend(self._emit(slide) for slide in self.pending)
+                self.pending.clear()
+            elif self.layout is not None:
+                ready.append(self._emit(value))
+            else:
+                self.pending.append(value)
+        return ready
+
+    def finish(self) -> List[Any]:
+        parser = self.parser
+        if parser.complete and not parser.failed and self.layout is not None and not self.pending:
+            return []
+        layout, slides, failures = _validate_routed_partial(_load_output_json(parser.text), self.forced_layout)
+        self.layout = layout
+        failed = {failure.index: failure for failure in failures}
+        remainder = [failed.get(index) or (layout, slide) for index, slide in enumerate(slides) if index >= self.seen]
+        self.seen = max(self.seen, len(slides))
+        return remainder
+
+    def record(self, slide: Any) -> Tuple[str, Any]:
+        self.slides.append(slide)
+        return self.layout, slide
+
+    def result(self) -> RoutedContent:
+        if not self.slides:
+            raise ValueError(f"AI JSON failed validation for layout '{self.layout}': no slide passed validation")
+        return RoutedContent(layout=self.layout, slides=list(self.slides))
+
+
+def _stream_event_text(event: Any) -> Optional[str]:
+    event_type = getattr(event, "type", "")
+    if event_type == "response.output_text.delta":
+        return event.delta
+    if event_type in ("error", "response.failed"):
+        detail = getattr(event, "message", None) or getattr(getattr(event, "response", None), "error", None)
+        raise ValueError(f"AI response stream failed: {detail or event_type}")
+    return None
+
+
+def stream_structure(
+    news_text: str,
+    model: str = "o4-mini",
+    forced_layout: Optional[str] = None,
+    cache: Optional[LLMCache] = None,
+    refresh: bool = False,
+    chunk_chars: int = 0,
+    chunk_concurrency: int = 8,
+    timeout: Optional[float] = None,
+) -> Iterator[Tuple[str, Any]]:
+    """Yield ``(layout, slide)`` pairs as soon as each slide is complete and valid."""
+    if _needs_chunking(news_text, chunk_chars):
+        # 分块结果要合并后才能校验，无法逐页流式交付
+        routed = choose_and_structure(news_text, model, forced_layout, cache, refresh,
+                                      chunk_chars=chunk_chars, chunk_concurrency=chunk_concurrency, timeout=timeout)
+        for slide in routed.slides:
+            yield routed.layout, slide
+        return
+
+    enabled_layouts = _select_layouts(forced_layout)
+    messages = _build_messages(news_text, enabled_layouts)
+    key, cached = _cache_lookup(cache, refresh, model, messages, enabled_layouts, news_text)
+    if cached is not None:
+        for slide in cached.slides:
+            yield cached.layout, slide
+        return
+
+    state = _SlideStream(forced_layout)
+
+    def settle(items: List[Any]) -> Iterator[Tuple[str, Any]]:
+        for item in items:
+            if isinstance(item, SlideFailure):
+                # 同步流式：就地重问失败页，页序不变
+                slide = _reask_slide(news_text, model, state.layout, item, timeout)
+                if slide is not None:
+                    yield state.record(slide)
+            else:
+                yield state.record(item[1])
+
+    with _get_client().responses.create(model=model, input=messages, stream=True, **_timeout_option(timeout),
+                                        **_request_options(enabled_layouts)) as events:
+        for event in events:
+            delta = _stream_event_text(event)
+            if delta:
+                yield from settle(state.feed(delta))
+    yield from settle(state.finish())
+    _cache_store(cache, key, state.result())
+
+
+async def astream_structure(
+    news_text: str,
+    model: str = "o4-mini",
+    forced_layout: Optional[str] = None,
+    *,
+    pool: Optional[AsyncLLMPool] = None,
+    timeout: Optional[float] = None,
+    cache: Optional[LLMCache] = None,
+    refresh: bool = False,
+) -> AsyncIterator[Tuple[str, Any]]:
+    enabled_layouts = _select_layouts(forced_layout)
+    messages = _build_messages(news_text, enabled_layouts)
+    key, cached = _cache_lookup(cache, refresh, model, messages, enabled_layouts, news_text)
+    if cached is not None:
+        for slide in cached.slides:
+            yield cached.layout, slide
+        return
+
+    import asyncio
+
+    pool = pool or get_async_pool()
+    state = _SlideStream(forced_layout)
+    # 失败页的重问与剩余输出并行；重问返回之前到达的页先排队，保持页序。
+    # 流本身占着连接池的一个名额，所以只在流结束后才等待未完成的重问。
+    queue: List[Any] = []
+
+    def schedule(items: List[Any]) -> None:
+        for item in items:
+            if isinstance(item, SlideFailure):
+                item = asyncio.ensure_future(_areask_slide(pool, news_text, model, state.layout, item, timeout))
+            queue.append(item)
+
+    def head_ready() -> bool:
+        return bool(queue) and (not isinstance(queue[0], asyncio.Future) or queue[0].done())
+
+    try:
+        async for event in pool.stream_response(model, messages, timeout=timeout,
+                                                **_request_options(enabled_layouts)):
+            delta = _stream_event_text(event)
+            if delta:
+                schedule(state.feed(delta))
+                while head_ready():
+                    item = queue.pop(0)
+                    slide = item.result() if isinstance(item, asyncio.Future) else item[1]
+                    if slide is not None:
+                        yield state.record(slide)
+        schedule(state.finish())
+        while queue:
+            item = queue.pop(0)
+            slide = await item if isinstance(item, asyncio.Future) else item[1]
+            if slide is not None:
+                yield state.record(slide)
+    finally:
+        for item in queue:
+            if isinstance(item, asyncio.Future):
+                item.cancel()
+    _cache_store(cache, key, state.result())
@@ -0,0 +1,241 @@
+"""Local stand-in for the OpenAI Responses API.
+
+Speaks just enough of ``POST /v1/responses`` (plain JSON and SSE streaming)
+for the unchanged ``OpenAI``/``AsyncOpenAI`` clients. Point them at it with
+``OPENAI_BASE_URL=http://127.0.0.1:8765/v1``.
+
+    # 录制：转发到真实 API，并把 output_text 按请求指纹存盘
+    python llm_standin.py --mode record --store .cache/replay
+    # 回放：带人工延迟与错误注入
+    python llm_standin.py --mode replay --store .cache/replay --latency lognormal:2.0,0.5 --error-rate 0.02
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from llm_providers import (
+    Latency,
+    OpenAIProvider,
+    Provider,
+    ProviderError,
+    RecordingProvider,
+    ReplayProvider,
+    ReplayStore,
+)
+
+_ids = itertools.count(1)
+
+
+def _response_object(request: Dict[str, Any], output_text: str) -> Dict[str, Any]:
+    number = next(_ids)
+    return {
+        "id": f"resp_{number}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": request.get("model", ""),
+        "status": "completed",
+        "output": [{
+            "type": "message",
+            "id": f"msg_{number}",
+            "status": "completed",
+            "role": "assistant",
+            "content": [{"type": "output_text", "text": output_text, "annotations": []}],
+        }],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+    }
+
+
+class _Counters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.inflight = 0
+        self.max_inflight = 0
+        self.started = time.time()
+
+    def enter(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+
+    def leave(self, failed: bool) -> None:
+        with self._lock:
+            self.inflight -= 1
+            self.errors += int(failed)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "inflight": self.inflight,
+                "max_inflight": self.max_inflight,
+                "uptime_s": round(time.time() - self.started, 3),
+            }
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, provider: Provider, chunk_chars: int = 16, chunk_delay: float = 0.0):
+        super().__init__(address, _Handler)
+        self.provider = provider
+        self.chunk_chars = max(1, chunk_chars)
+        self.chunk_delay = chunk_delay
+        self.counters = _Counters()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters.snapshot(), **self.provider.stats()}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandInServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, exc: ProviderError) -> None:
+        headers = {"retry-after-ms": "200"} if exc.status == 429 else None
+        self._send_json(exc.status, {"error": {"message": exc.message, "type": "stand_in_error", "code": exc.code}},
+                        headers)
+
+    def _send_event(self, event: Dict[str, Any]) -> None:
+        payload = f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        self.wfile.write(payload.encode("utf-8"))
+        self.wfile.flush()
+
+    def _stream(self, request: Dict[str, Any], output_text: str) -> None:
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("connection", "close")
+        self.end_headers()
+        response = _response_object(request, output_text)
+        item_id = response["output"][0]["id"]
+        sequence = itertools.count()
+        self._send_event({"type": "response.created", "sequence_number": next(sequence),
+                          "response": {**response, "status": "in_progress", "output": []}})
+        size = self.server.chunk_chars
+        for start in range(0, len(output_text), size):
+            if start and self.server.chunk_delay:
+                time.sleep(self.server.chunk_delay)
+            self._send_event({
+                "type": "response.output_text.delta", "sequence_number": next(sequence),
+                "item_id": item_id, "output_index": 0, "content_index": 0,
+                "delta": output_text[start:start + size], "logprobs": [],
+            })
+        self._send_event({"type": "response.completed", "sequence_number": next(sequence), "response": response})
+        self.close_connection = True
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/health", "/v1/health"):
+            self._send_json(200, {"status": "ok"})
+        elif self.path.rstrip("/") in ("/stats", "/v1/stats"):
+            self._send_json(200, self.server.stats())
+        else:
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+
+    def do_POST(self):
+        if self.path.rstrip("/") not in ("/v1/responses", "/responses"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        length = int(self.headers.get("content-length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as exc:
+            self._send_json(400, {"error": {"message": f"invalid JSON body: {exc}"}})
+            return
+
+        counters = self.server.counters
+        counters.enter()
+        failed = True
+        try:
+            output_text = self.server.provider.respond(request)
+            failed = False
+        except ProviderError as exc:
+            self._send_error(exc)
+            return
+        except Exception as exc:
+            self._send_error(ProviderError(502, f"upstream failed: {exc}", code="upstream_error"))
+            return
+        finally:
+            counters.leave(failed)
+
+        if request.get("stream"):
+            self._stream(request, output_text)
+        else:
+            self._send_json(200, _response_object(request, output_text))
+
+
+def start_server(provider: Provider, host: str = "127.0.0.1", port: int = 0,
+                 chunk_chars: int = 16, chunk_delay: float = 0.0) -> StandInServer:
+    """Start the stand-in on a daemon thread; ``port=0`` picks a free port."""
+    server = StandInServer((host, port), provider, chunk_chars=chunk_chars, chunk_delay=chunk_delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def build_provider(args) -> Provider:
+    store = ReplayStore(args.store)
+    if args.mode == "record":
+        return RecordingProvider(OpenAIProvider(base_url=args.upstream), store)
+    statuses = tuple(int(s) for s in args.error_status.split(",") if s.strip())
+    return ReplayProvider(
+        store,
+        latency=Latency(args.latency, seed=args.seed),
+        error_rate=args.error_rate,
+        error_statuses=statuses,
+        on_miss=args.on_miss,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="OpenAI Responses API stand-in with record/replay")
+    ap.add_argument("--mode", choices=("record", "replay"), default="replay")
+    ap.add_argument("--store", type=str, default=".cache/replay", help="Directory holding recorded responses")
+    ap.add_argument("--host", type=str, default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--upstream", type=str, default="https://api.openai.com/v1", help="Real API base URL (record mode)")
+    ap.add_argument("--latency", type=str, default="none", help="none | fixed:S | uniform:LOW,HIGH | lognormal:MEDIAN,SIGMA")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Fraction of replayed requests answered with an error")
+    ap.add_argument("--error-status", type=str, default="500,429,503", help="Comma-separated statuses to inject")
+    ap.add_argument("--on-miss", choices=("error", "any"), default="error", help="Unrecorded requests: 404, or serve some recording")
+    ap.add_argument("--chunk-chars", type=int, default=16, help="Characters per streamed delta")
+    ap.add_argument("--chunk-delay", type=float, default=0.0, help="Seconds between streamed deltas")
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args()
+
+    server = StandInServer((args.host, args.port), build_provider(args),
+                           chunk_chars=args.chunk_chars, chunk_delay=args.chunk_delay)
+    print(f"stand-in 已启动: {server.base_url} ({args.mode}, {args.store})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats(), ensure_ascii=False))
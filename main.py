@@ -1,34 +1,181 @@
 import argparse
+import io
+import time
+from dataclasses import replace
 from pathlib import Path
-from typing import Optional
-from pptx import Presentation
+from typing import IO, TYPE_CHECKING, Optional, Tuple, Union
 from config import AppConfig
-from llm_router import choose_and_structure
-from generator.ppt_builder import load_theme, new_presentation
-from generator.layouts import timeline as L_timeline
-from generator.layouts import summary as L_summary
-from generator.layouts import image_headline as L_img
-from generator.layouts import news_report as L_news
-
-LAYOUT_IMPL = {
-    "timeline": L_timeline.render,
-    "summary": L_summary.render,
-    "image_headline": L_img.render,
-    "news_report": L_news.render,   # 新增
-}
-
-def run(news_text: str, model: str, out_file: str, layout: Optional[str]):
-    routed = choose_and_structure(news_text, model=model, forced_layout=layout)  # LLM selects layout + structures JSON
-    theme = load_theme()
-    prs = new_presentation(theme)
+from llm_cache import LLMCache
+from llm_router import ROUTER_STATS, RoutedContent, choose_and_structure, dump_routed_json, load_routed_json, stream_structure
+from generator.options import ENGINES, TIMELINE_MODES, RenderOptions
+from generator.layouts import LAYOUTS
+
+if TYPE_CHECKING:
+    from pptx.presentation import Presentation
+
+# 版式由 templates/layouts.yaml 的 module 声明，首次用到时才导入（连同 python-pptx）
+LAYOUT_IMPL = LAYOUTS
+
+def _renderer(layout: str):
+    if layout not in LAYOUT_IMPL:
+        raise ValueError(f"layout '{layout}' has no renderer")
+    return LAYOUT_IMPL[layout]
 
-    if routed.layout not in LAYOUT_IMPL:
-        raise SystemExit(f"未实现布局: {routed.layout}")
+def fetch_images(routed: RoutedContent) -> RoutedContent:
+    # hero_image 是 URL 时，渲染前并发下载到本地缓存并换成本地路径
+    from image_fetch import ImageFetcher, fetch_hero_images, remote_images
+
+    if not remote_images(routed):
+        return routed
+    fetcher = ImageFetcher(
+        AppConfig.fetch_cache_dir,
+        max_connections=AppConfig.fetch_connections,
+        timeout=AppConfig.fetch_timeout,
+        max_bytes=AppConfig.fetch_max_mb * 1024 * 1024,
+    )
+    routed, results = fetch_hero_images(routed, fetcher)
+    for result in results.values():
+        if result.status == "error":
+            print(f"头图下载失败: {result.url} ({result.error})")
+        elif result.status == "stale":
+            print(f"头图下载失败，沿用缓存: {result.url} ({result.error})")
+    return routed
+
+def build_deck(routed: RoutedContent, options: Optional[RenderOptions] = None) -> "Presentation":
+    from generator.ppt_builder import load_theme, new_presentation
+
+    theme = load_theme()
+    prs = new_presentation(theme, options)
 
     # 渲染
-    LAYOUT_IMPL[routed.layout](prs, routed)
+    _renderer(routed.layout)(prs, fetch_images(routed), theme, options)
+    return prs
+
+def save_deck(prs: "Presentation", out: Union[str, IO[bytes]], options: Optional[RenderOptions] = None):
+    from generator.packaging import save_with_options
+
+    save_with_options(prs, out, options or RenderOptions())
+
+def render_deck(routed: RoutedContent, out_file: Union[str, IO[bytes]], options: Optional[RenderOptions] = None) -> "Presentation":
+    # out_file 也可以是可写的二进制流（如 BytesIO），不经过临时文件
+    prs = build_deck(routed, options)
+    save_deck(prs, out_file, options)
+    return prs
+
+def render_bytes(routed: RoutedContent, options: Optional[RenderOptions] = None) -> bytes:
+    stream = io.BytesIO()
+    render_deck(routed, stream, options)
+    return stream.getvalue()
+
+def print_package_report(prs: "Presentation"):
+    from generator.packaging import packaging_report
+
+    # 只在内存里打包，比较各压缩级别的耗时与体积
+    for row in packaging_report(prs):
+        media = "全部原样" if row["level"] == 0 else ("媒体原样" if row["store_media"] else "媒体压缩")
+        print(f"打包: 级别 {row['level']} {media:<4}  {row['seconds'] * 1000:7.1f} ms  {row['bytes'] / 1024:9.1f} KB")
+
+def print_lean_report(routed: RoutedContent, prs: "Presentation", options: RenderOptions):
+    from generator.text_styles import deck_stats
 
-    prs.save(out_file)
+    # 在内存中按非精简模式再渲染一遍作为基线，只统计不落盘；
+    # routed 应是 fetch_images 之后的结果，基线不会再下载一遍头图
+    baseline = deck_stats(build_deck(routed, replace(options, lean_text=False)))
+    current = deck_stats(prs)
+    saved = current.saved_against(baseline)
+    ratio = saved.xml_bytes / baseline.xml_bytes * 100 if baseline.xml_bytes else 0.0
+    print(f"精简文本: {current.slides} 页, "
+          f"slide XML {current.xml_bytes} 字节 (减少 {saved.xml_bytes}, {ratio:.1f}%)")
+
+def print_reports(routed: RoutedContent, prs: "Presentation", options: Optional[RenderOptions],
+                  lean_report: bool = False, package_report: bool = False):
+    if lean_report:
+        print_lean_report(routed, prs, options or RenderOptions())
+    if package_report:
+        print_package_report(prs)
+
+def render_streamed(slides, out_file: str, options: Optional[RenderOptions] = None
+                    ) -> Tuple["Presentation", Optional[RoutedContent]]:
+    # slides: 可迭代的 (layout, slide)，每到一页就立即渲染，与生成过程重叠。
+    # 同时返回实际渲染的内容（头图已换成本地路径），供报告复用
+    from generator.ppt_builder import load_theme, new_presentation
+
+    theme = load_theme()
+    prs = new_presentation(theme, options)
+    rendered = []
+    started = time.perf_counter()
+    for layout, slide in slides:
+        local = fetch_images(RoutedContent(layout=layout, slides=[slide]))
+        _renderer(layout)(prs, local, theme, options)
+        rendered.extend(local.slides)
+        if len(rendered) == 1:
+            print(f"首页已渲染: {time.perf_counter() - started:.2f}s")
+    save_deck(prs, out_file, options)
+    return prs, RoutedContent(layout=layout, slides=rendered) if rendered else None
+
+def build_cache(enabled: bool = True) -> Optional[LLMCache]:
+    if not enabled:
+        return None
+    return LLMCache(
+        AppConfig.cache_dir,
+        max_bytes=AppConfig.cache_max_mb * 1024 * 1024,
+        max_age_seconds=AppConfig.cache_max_age_hours * 3600,
+    )
+
+def print_cache_stats(cache: Optional[LLMCache]):
+    if cache is not None:
+        stats = cache.stats()
+        print(f"缓存: 命中 {stats['hits']} / 未命中 {stats['misses']} / 写入 {stats['stores']}")
+
+def print_router_stats():
+    if ROUTER_STATS:
+        print(f"结构化: schema 请求 {ROUTER_STATS['schema_requests']} / JSON 修复 {ROUTER_STATS['json_repaired']}"
+              f" / 校验失败页 {ROUTER_STATS['failed_slides']} / 重问 {ROUTER_STATS['reasks']}"
+              f" / 补全字段 {ROUTER_STATS['coerced_fields']}")
+
+def run(news_text: str, model: str, out_file: str, layout: Optional[str],
+        cache: Optional[LLMCache] = None, refresh: bool = False, stream: bool = False,
+        options: Optional[RenderOptions] = None, lean_report: bool = False,
+        dump_json: Optional[str] = None, chunk_chars: int = 0,
+        preprocess_input: bool = True, token_budget: Optional[int] = None, package_report: bool = False,
+        llm_timeout: Optional[float] = None):
+    if preprocess_input:
+        from text_preprocess import preprocess
+
+        news_text, report = preprocess(news_text, token_budget)
+        print(f"输入压缩: {report.describe()}")
+    chunking = dict(chunk_chars=chunk_chars, chunk_concurrency=AppConfig.llm_workers, timeout=llm_timeout)
+    if stream:
+        streamed = []
+        slides = stream_structure(news_text, model=model, forced_layout=layout, cache=cache, refresh=refresh,
+                                  **chunking)
+        prs, rendered = render_streamed(_collect(slides, streamed), out_file, options)
+        routed = RoutedContent(layout=streamed[0][0], slides=[s for _, s in streamed]) if streamed else None
+        if rendered is not None:
+            print_reports(rendered, prs, options, lean_report, package_report)
+    else:
+        routed = choose_and_structure(news_text, model=model, forced_layout=layout,
+                                      cache=cache, refresh=refresh, **chunking)  # LLM selects layout + structures JSON
+        # 头图只下载一次：报告里的基线渲染复用本地路径；--dump-json 仍保存原始 URL
+        local = fetch_images(routed)
+        prs = render_deck(local, out_file, options)
+        print_reports(local, prs, options, lean_report, package_report)
+    if dump_json and routed is not None:
+        dump_routed_json(routed, dump_json)
+        print(f"结构化结果已保存: {dump_json}")
+    print(f"✅ 已生成: {out_file}")
+
+def _collect(slides, into: list):
+    for layout, slide in slides:
+        into.append((layout, slide))
+        yield layout, slide
+
+def rerender(json_file: str, out_file: str, layout: Optional[str] = None,
+             options: Optional[RenderOptions] = None, lean_report: bool = False, package_report: bool = False):
+    # 不调用 LLM：直接渲染之前 --dump-json 保存的结果
+    routed = fetch_images(load_routed_json(json_file, forced_layout=layout))
+    prs = render_deck(routed, out_file, options)
+    print_reports(routed, prs, options, lean_report, package_report)
     print(f"✅ 已生成: {out_file}")
 
 if __name__ == "__main__":
@@ -37,8 +184,78 @@ if __name__ == "__main__":
     ap.add_argument("--model", type=str, default=AppConfig.model)
     ap.add_argument("--layout", type=str, choices=sorted(LAYOUT_IMPL.keys()), default=None, help="Force a specific layout; leave empty to let AI decide")
     ap.add_argument("--out", type=str, default=AppConfig.out_file)
+    ap.add_argument("--batch", type=str, default=None, help="JSONL manifest; each line has text/news_file, layout and out")
+    ap.add_argument("--batch-report", type=str, default=None, help="Where to write per-item results (default: <manifest>.results.jsonl)")
+    ap.add_argument("--llm-workers", type=int, default=AppConfig.llm_workers, help="Concurrent LLM requests in batch mode")
+    ap.add_argument("--render-workers", type=int, default=AppConfig.render_workers, help="Render processes in batch mode")
+    ap.add_argument("--llm-timeout", type=float, default=AppConfig.llm_timeout, help="Per-request LLM timeout in seconds")
+    ap.add_argument("--no-cache", action="store_true", help="Neither read nor write the structured-output cache")
+    ap.add_argument("--refresh", action="store_true", help="Ignore cached results but store the fresh ones")
+    ap.add_argument("--stream", action="store_true", help="Stream the LLM response and render each slide as soon as it is complete")
+    ap.add_argument("--engine", type=str, choices=ENGINES, default="shapes", help="Render engine: build shapes one by one, or clone precompiled layout skeletons")
+    ap.add_argument("--timeline-mode", type=str, choices=TIMELINE_MODES, default="fishbone", help="Timeline layout: alternating fishbone boxes, or dense multi-lane labels with leader lines")
+    ap.add_argument("--timeline-by-date", action="store_true", help="Dense timelines: space events by their real date distance")
+    ap.add_argument("--image-dpi", type=int, default=AppConfig.image_dpi, help="Downscale hero images to this DPI at their display size (0 embeds them as-is)")
+    ap.add_argument("--image-quality", type=int, default=AppConfig.image_quality, help="JPEG quality for recompressed hero images (1-95)")
+    ap.add_argument("--no-image-cache", action="store_true", help="Do not read or write the on-disk cache of processed images")
+    ap.add_argument("--zip-level", type=int, choices=range(10), default=AppConfig.zip_level, metavar="0-9", help="Deflate level of the saved .pptx (0 stores, 9 smallest)")
+    ap.add_argument("--store-media", action="store_true", help="Store already-compressed media (JPEG/PNG/audio/video) without deflating it again")
+    ap.add_argument("--package-report", action="store_true", help="Also package the deck in memory at several zip levels and print time and size")
+    ap.add_argument("--lean-text", action="store_true", help="Put body font/size/color into deck defaults and only write per-run overrides")
+    ap.add_argument("--lean-report", action="store_true", help="Also render a non-lean baseline in memory and print the XML bytes saved")
+    ap.add_argument("--dump-json", type=str, default=None, help="Save the validated layout + slides as JSON (batch: directory, one <out stem>.json per item)")
+    ap.add_argument("--from-json", type=str, default=None, help="Render a JSON saved by --dump-json without calling the LLM (batch: directory)")
+    ap.add_argument("--chunk-chars", type=int, default=AppConfig.chunk_chars, help="Split texts longer than this into chunks structured in parallel and merged (default 0: off)")
+    ap.add_argument("--no-preprocess", action="store_true", help="Send the text as-is, without whitespace/boilerplate/duplicate cleanup")
+    ap.add_argument("--token-budget", type=int, default=None, help="Summarize input above this token estimate (default: templates/preprocess.yaml; 0 disables)")
     args = ap.parse_args()
 
-    text = Path(args.news_file).read_text(encoding="utf-8")
-    run(text, args.model, args.out, args.layout)
+    options = RenderOptions(engine=args.engine, lean_text=args.lean_text, timeline_mode=args.timeline_mode,
+                            timeline_by_date=args.timeline_by_date, image_dpi=args.image_dpi,
+                            image_quality=args.image_quality,
+                            image_cache_dir=None if args.no_image_cache else AppConfig.image_cache_dir,
+                            zip_level=args.zip_level, zip_store_media=args.store_media)
+
+    cache = build_cache(not args.no_cache)
+
+    if args.batch:
+        from batch import run_batch
+
+        results = run_batch(
+            args.batch,
+            model=args.model,
+            report_path=args.batch_report,
+            llm_workers=args.llm_workers,
+            render_workers=args.render_workers,
+            default_layout=args.layout,
+            llm_timeout=args.llm_timeout,
+            cache=cache,
+            refresh=args.refresh,
+            options=options,
+            dump_json_dir=args.dump_json,
+            from_json_dir=args.from_json,
+            chunk_chars=args.chunk_chars,
+            preprocess_input=not args.no_preprocess,
+            token_budget=args.token_budget,
+        )
+        failed = [r for r in results if r.status != "ok"]
+        print(f"✅ 批量完成: {len(results) - len(failed)}/{len(results)} 成功")
+        print_cache_stats(cache)
+        print_router_stats()
+        raise SystemExit(1 if failed else 0)
 
+    try:
+        if args.from_json:
+            rerender(args.from_json, args.out, args.layout, options=options, lean_report=args.lean_report,
+                     package_report=args.package_report)
+        else:
+            text = Path(args.news_file).read_text(encoding="utf-8")
+            run(text, args.model, args.out, args.layout, cache=cache, refresh=args.refresh, stream=args.stream,
+                options=options, lean_report=args.lean_report, dump_json=args.dump_json,
+                chunk_chars=args.chunk_chars, preprocess_input=not args.no_preprocess, token_budget=args.token_budget,
+                package_report=args.package_report, llm_timeout=args.llm_timeout)
+            print_cache_stats(cache)
+            print_router_stats()
+    except ValueError as exc:
+        # 结构化结果不合法或布局没有渲染器：只在命令行入口转成退出码
+        raise SystemExit(f"生成失败: {exc}")
@@ -0,0 +1,74 @@
+from typing import Any, Dict, Mapping
+
+# 由 content_schema 的 pydantic 模型生成 Responses API 的 structured output 格式
+# （text.format = json_schema, strict）。strict 模式要求每个对象列出全部属性为 required
+# 且 additionalProperties=false；可选字段在 pydantic 生成的 schema 里已是 anyOf [..., null]。
+# schema 只约束结构：minItems 也去掉，否则模型会为凑数编造小节/事件；
+# 数量要求（每列至少 2 节、每节至少 3 条要点、至少 3 个事件）由模型的 validator
+# 补齐或报错，报错的页走逐页重问。strict 模式不支持的 minLength 等同样去掉。
+
+_DROP_KEYS = ("title", "default", "minLength", "maxLength", "minItems")
+
+
+def _strict(schema: Any) -> Any:
+    if isinstance(schema, list):
+        return [_strict(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    out: Dict[str, Any] = {}
+    for key, value in schema.items():
+        if key in _DROP_KEYS:
+            continue
+        if key in ("properties", "$defs"):
+            # 这里的键是字段名/模型名（可能恰好叫 title），不能按关键字过滤
+            out[key] = {name: _strict(sub) for name, sub in value.items()}
+        else:
+            out[key] = _strict(value)
+    if out.get("type") == "object":
+        out["required"] = list(out.get("properties", {}))
+        out["additionalProperties"] = False
+    return out
+
+
+def _nullable(schema: Dict[str, Any]) -> Dict[str, Any]:
+    if {"type": "null"} in schema.get("anyOf", ()):
+        return schema
+    return {"anyOf": [schema, {"type": "null"}]}
+
+
+def _partial(definition: Dict[str, Any]) -> Dict[str, Any]:
+    # 分块抽取时某一块可能没有某个字段的内容：字段仍全部 required（strict 的要求），但都允许为 null
+    properties = definition.get("properties")
+    if not properties:
+        return definition
+    return {**definition, "properties": {name: _nullable(sub) for name, sub in properties.items()}}
+
+
+def deck_schema(slide_models: Mapping[str, Any], partial: bool = False) -> Dict[str, Any]:
+    """``{"layout": ..., "slides": [...]}`` where each slide matches one of
+    ``slide_models`` (layout name → pydantic model). With ``partial``, every
+    slide field may be null, for map requests that see only part of the text."""
+    from pydantic.json_schema import models_json_schema
+
+    models = list(slide_models.values())
+    refs, definitions = models_json_schema([(model, "validation") for model in models])
+    items = [refs[(model, "validation")] for model in models]
+    defs = definitions.get("$defs", {})
+    if partial:
+        defs = {name: _partial(definition) for name, definition in defs.items()}
+    return _strict({
+        "type": "object",
+        "properties": {
+            "layout": {"type": "string", "enum": list(slide_models)},
+            "slides": {"type": "array", "items": items[0] if len(items) == 1 else {"anyOf": items}},
+        },
+        "$defs": defs,
+    })
+
+
+def slide_schema(model: Any) -> Dict[str, Any]:
+    return _strict(model.model_json_schema())
+
+
+def text_format(name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    return {"format": {"type": "json_schema", "name": name, "schema": schema, "strict": True}}
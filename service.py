@@ -0,0 +1,417 @@
+"""Long-running HTTP service: news text in, .pptx out.
+
+The theme, prompts, layout renderers and the pooled LLM client stay warm
+between requests. Requests beyond ``--max-active`` (being structured,
+rendered or waiting as jobs) are refused with 429 instead of queueing
+without bound.
+
+    python service.py --port 8080
+    # 离线压测：进程内启动 llm_standin，回放录制的响应
+    python service.py --standin-store .cache/replay --standin-latency lognormal:2.0,0.5
+
+Endpoints::
+
+    POST /v1/decks           {"text": ..., "layout"?, "model"?, "options"?: {...}, "async"?: true}
+                             or {"routed": {"layout": ..., "slides": [...]}} to skip the LLM;
+                             returns the .pptx bytes, or 202 {"job_id": ...} when async
+    GET  /v1/jobs/<id>       job status
+    GET  /v1/jobs/<id>/deck  .pptx bytes of a finished job
+    GET  /health, /metrics
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from http import HTTPStatus
+from typing import Any, Dict, Optional, Tuple
+
+from config import AppConfig
+from generator.options import ENGINES, RenderOptions
+from llm_cache import LLMCache
+from llm_router import ROUTER_STATS, AsyncLLMPool, achoose_and_structure, _validate_routed
+
+PPTX_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+# 请求里可以覆盖的渲染选项；缓存目录、线程数等由服务端决定
+REQUEST_OPTIONS = ("engine", "lean_text", "timeline_mode", "timeline_by_date", "image_dpi", "image_quality",
+                   "zip_level", "zip_store_media")
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+@dataclass
+class ServiceConfig:
+    host: str = "127.0.0.1"
+    port: int = 8080
+    model: str = AppConfig.model
+    max_active: int = 16            # 同时在处理（含异步任务）的请求上限，超出返回 429
+    llm_concurrency: int = AppConfig.llm_workers
+    llm_timeout: float = AppConfig.llm_timeout
+    llm_base_url: Optional[str] = None
+    llm_api_key: Optional[str] = None
+    render_workers: int = 1         # 渲染线程；原型、字宽表等缓存在进程内共享
+    chunk_chars: int = AppConfig.chunk_chars
+    use_cache: bool = True
+    max_body_bytes: int = 4 * 1024 * 1024
+    max_jobs: int = 1000            # 保留的任务记录数，超出后丢弃最早完成的
+
+
+def _timeout_errors() -> tuple:
+    # openai SDK 的超时是 APITimeoutError，不是 asyncio.TimeoutError
+    try:
+        from openai import APITimeoutError
+    except ImportError:
+        return (asyncio.TimeoutError,)
+    return (asyncio.TimeoutError, APITimeoutError)
+
+
+def _json(status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Response:
+    data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    return status, {"Content-Type": "application/json; charset=utf-8", **(headers or {})}, data
+
+
+def _deck(data: bytes) -> Response:
+    return 200, {"Content-Type": PPTX_TYPE}, data
+
+
+def render_options(raw: Optional[Dict[str, Any]], base: RenderOptions) -> RenderOptions:
+    raw = raw or {}
+    if not isinstance(raw, dict):
+        raise HTTPError(400, "'options' must be an object")
+    unknown = sorted(set(raw) - set(REQUEST_OPTIONS))
+    if unknown:
+        raise HTTPError(400, f"unknown option(s): {', '.join(unknown)}")
+    try:
+        return replace(base, **raw)
+    except (TypeError, ValueError) as exc:
+        raise HTTPError(400, str(exc)) from exc
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.time()
+        self.counts: Dict[str, int] = {}
+        self.latency: deque = deque(maxlen=1024)
+        self.llm_seconds = 0.0
+        self.render_seconds = 0.0
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        latency = sorted(self.latency)
+        summary = {}
+        if latency:
+            summary = {
+                "p50": round(statistics.median(latency), 4),
+                "p95": round(latency[min(len(latency) - 1, int(len(latency) * 0.95))], 4),
+                "max": round(latency[-1], 4),
+            }
+        return {
+            "uptime_s": round(time.time() - self.started, 3),
+            "counts": dict(self.counts),
+            "deck_latency_s": summary,
+            "llm_seconds": round(self.llm_seconds, 3),
+            "render_seconds": round(self.render_seconds, 3),
+        }
+
+
+class DeckService:
+    def __init__(self, config: ServiceConfig, options: Optional[RenderOptions] = None):
+        self.config = config
+        self.options = options or RenderOptions()
+        self.pool = AsyncLLMPool(max_concurrency=config.llm_concurrency, timeout=config.llm_timeout,
+                                 base_url=config.llm_base_url, api_key=config.llm_api_key)
+        self.cache = None
+        if config.use_cache:
+            self.cache = LLMCache(AppConfig.cache_dir, max_bytes=AppConfig.cache_max_mb * 1024 * 1024,
+                                  max_age_seconds=AppConfig.cache_max_age_hours * 3600)
+        self.renderer = ThreadPoolExecutor(max_workers=max(1, config.render_workers), thread_name_prefix="render")
+        self.metrics = Metrics()
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.active = 0
+        self.max_seen = 0
+
+    def warm(self) -> None:
+        # 启动时把冷启动开销一次付清：python-pptx、主题、各布局渲染器、提示词与输出 schema
+        from generator.layouts import LAYOUTS
+        from generator.ppt_builder import load_theme, new_presentation
+        from llm_router import _build_messages, _request_options, _select_layouts
+
+        theme = load_theme()
+        for name in LAYOUTS:
+            LAYOUTS[name]
+        layouts = _select_layouts(None)
+        _build_messages("", layouts)
+        _request_options(layouts)
+        new_presentation(theme, self.options)
+
+    # ---------- 处理 ----------
+
+    async def _routed(self, request: Dict[str, Any]):
+        layout = request.get("layout")
+        if request.get("routed") is not None:
+            try:
+                return _validate_routed(request["routed"], layout), "json"
+            except (AttributeError, ValueError) as exc:
+                raise HTTPError(400, f"invalid 'routed': {exc}") from exc
+        text = request.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise HTTPError(400, "'text' must be a non-empty string")
+        if request.get("preprocess", True):
+            from text_preprocess import preprocess
+
+            text, _ = preprocess(text)
+        started = time.perf_counter()
+        try:
+            routed = await achoose_and_structure(
+                text, request.get("model") or self.config.model, layout, pool=self.pool,
+                timeout=self.config.llm_timeout, cache=self.cache, chunk_chars=self.config.chunk_chars,
+            )
+        except ValueError as exc:
+            raise HTTPError(422, str(exc)) from exc
+        except Exception as exc:
+            if isinstance(exc, _timeout_errors()):
+                raise HTTPError(504, "LLM request timed out") from exc
+            raise HTTPError(502, f"LLM request failed: {exc}") from exc
+        finally:
+            self.metrics.llm_seconds += time.perf_counter() - started
+        return routed, "llm"
+
+    async def build(self, request: Dict[str, Any], options: RenderOptions) -> bytes:
+        from main import render_bytes
+
+        started = time.perf_counter()
+        routed, source = await self._routed(request)
+        self.metrics.count(f"source_{source}")
+        render_started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            data = await loop.run_in_executor(self.renderer, render_bytes, routed, options)
+        except ValueError as exc:
+            raise HTTPError(422, f"cannot render deck: {exc}") from exc
+        now = time.perf_counter()
+        self.metrics.render_seconds += now - render_started
+        self.metrics.latency.append(now - started)
+        return data
+
+    def _admit(self) -> None:
+        if self.active >= self.config.max_active:
+            self.metrics.count("rejected")
+            raise HTTPError(429, "service is saturated, retry later", {"Retry-After": "1"})
+        self.active += 1
+        self.max_seen = max(self.max_seen, self.active)
+
+    async def _run_job(self, job_id: str, request: Dict[str, Any], options: RenderOptions) -> None:
+        job = self.jobs[job_id]
+        job["status"] = "running"
+        try:
+            job["deck"] = await self.build(request, options)
+            job["status"] = "done"
+            self.metrics.count("jobs_done")
+        except HTTPError as exc:
+            job.update(status="failed", error=exc.message)
+            self.metrics.count("jobs_failed")
+        except Exception as exc:
+            job.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+            self.metrics.count("jobs_failed")
+        finally:
+            job["finished_at"] = time.time()
+            self.active -= 1
+            self._trim_jobs()
+
+    def _trim_jobs(self) -> None:
+        finished = [key for key, job in self.jobs.items() if job["status"] in ("done", "failed")]
+        for key in finished[:max(0, len(self.jobs) - self.config.max_jobs)]:
+            del self.jobs[key]
+
+    async def create_deck(self, body: bytes) -> Response:
+        try:
+            request = json.loads(body or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+            raise HTTPError(400, f"invalid JSON body: {exc}") from exc
+        if not isinstance(request, dict):
+            raise HTTPError(400, "request body must be a JSON object")
+        options = render_options(request.get("options"), self.options)
+
+        self._admit()
+        if request.get("async"):
+            job_id = uuid.uuid4().hex
+            self.jobs[job_id] = {"status": "queued", "created_at": time.time()}
+            asyncio.get_running_loop().create_task(self._run_job(job_id, request, options))
+            self.metrics.count("jobs_created")
+            return _json(202, {"job_id": job_id, "status": "queued"}, {"Location": f"/v1/jobs/{job_id}"})
+        try:
+            return _deck(await self.build(request, options))
+        finally:
+            self.active -= 1
+
+    def job(self, job_id: str, deck: bool) -> Response:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise HTTPError(404, f"unknown job {job_id}")
+        if not deck:
+            info = {key: value for key, value in job.items() if key != "deck"}
+            if "deck" in job:
+                info["bytes"] = len(job["deck"])
+            return _json(200, {"job_id": job_id, **info})
+        if job["status"] != "done":
+            raise HTTPError(409, f"job is {job['status']}")
+        return _deck(job["deck"])
+
+    def health(self) -> Response:
+        return _json(200, {"status": "ok", "active": self.active, "max_active": self.config.max_active})
+
+    def metrics_body(self) -> Response:
+        snapshot = self.metrics.snapshot()
+        snapshot.update(
+            active=self.active,
+            max_active=self.config.max_active,
+            max_active_seen=self.max_seen,
+            jobs={state: sum(1 for job in self.jobs.values() if job["status"] == state)
+                  for state in ("queued", "running", "done", "failed")},
+            router=dict(ROUTER_STATS),
+            cache=self.cache.stats() if self.cache is not None else None,
+        )
+        return _json(200, snapshot)
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Response:
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        if method == "GET" and path == "/health":
+            return self.health()
+        if method == "GET" and path == "/metrics":
+            return self.metrics_body()
+        if path == "/v1/decks":
+            if method != "POST":
+                raise HTTPError(405, "use POST", {"Allow": "POST"})
+            return await self.create_deck(body)
+        if method == "GET" and path.startswith("/v1/jobs/"):
+            parts = path[len("/v1/jobs/"):].split("/")
+            if len(parts) == 1 or (len(parts) == 2 and parts[1] == "deck"):
+                return self.job(parts[0], deck=len(parts) == 2)
+        raise HTTPError(404, f"unknown path {path}")
+
+    # ---------- HTTP/1.1 ----------
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError as exc:
+            raise HTTPError(400, "malformed request line") from exc
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        length = headers.get("content-length", "0")
+        if not length.isdigit():
+            raise HTTPError(400, "invalid Content-Length")
+        if int(length) > self.config.max_body_bytes:
+            raise HTTPError(413, f"body exceeds {self.config.max_body_bytes} bytes")
+        body = await reader.readexactly(int(length))
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        return method.upper(), target, body, keep_alive
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    method, target, body, keep_alive = await self._read_request(reader)
+                    self.metrics.count("requests")
+                    status, headers, payload = await self.dispatch(method, target, body)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    status, headers, payload = _json(431, {"error": "request headers too large"})
+                except HTTPError as exc:
+                    status, headers, payload = _json(exc.status, {"error": exc.message}, exc.headers)
+                    if exc.status in (400, 413):
+                        keep_alive = False
+                except Exception as exc:
+                    status, headers, payload = _json(500, {"error": f"{type(exc).__name__}: {exc}"})
+                self.metrics.count(f"status_{status}")
+
+                reason = HTTPStatus(status).phrase
+                head = [f"HTTP/1.1 {status} {reason}", f"Content-Length: {len(payload)}"]
+                head += [f"{name}: {value}" for name, value in headers.items()]
+                head.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        # LLM 客户端在第一次请求文本时才创建：只渲染 routed JSON 时不需要 OPENAI_API_KEY
+        self.warm()
+        server = await asyncio.start_server(self.handle_connection, self.config.host, self.config.port)
+        addresses = ", ".join(f"http://{s.getsockname()[0]}:{s.getsockname()[1]}" for s in server.sockets)
+        print(f"服务已启动: {addresses}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.pool.aclose()
+            self.renderer.shutdown(wait=False)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Text2PPT HTTP service")
+    ap.add_argument("--host", type=str, default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--model", type=str, default=AppConfig.model)
+    ap.add_argument("--max-active", type=int, default=16, help="Requests processed at once (incl. async jobs) before answering 429")
+    ap.add_argument("--llm-workers", type=int, default=AppConfig.llm_workers, help="Concurrent LLM requests")
+    ap.add_argument("--llm-timeout", type=float, default=AppConfig.llm_timeout, help="Per-request LLM timeout in seconds")
+    ap.add_argument("--llm-base-url", type=str, default=None, help="OpenAI-compatible base URL (default: OPENAI_BASE_URL or the real API)")
+    ap.add_argument("--render-workers", type=int, default=1, help="Render threads")
+    ap.add_argument("--chunk-chars", type=int, default=AppConfig.chunk_chars, help="Split texts longer than this into chunks structured in parallel (default 0: off)")
+    ap.add_argument("--no-cache", action="store_true", help="Neither read nor write the structured-output cache")
+    ap.add_argument("--engine", type=str, choices=ENGINES, default="clone", help="Default render engine (requests may override)")
+    ap.add_argument("--standin-store", type=str, default=None, help="Run an in-process LLM stand-in replaying this directory (offline)")
+    ap.add_argument("--standin-latency", type=str, default="none", help="Stand-in latency: none | fixed:S | uniform:LOW,HIGH | lognormal:MEDIAN,SIGMA")
+    args = ap.parse_args(argv)
+
+    config = ServiceConfig(
+        host=args.host, port=args.port, model=args.model, max_active=max(1, args.max_active),
+        llm_concurrency=max(1, args.llm_workers), llm_timeout=args.llm_timeout, llm_base_url=args.llm_base_url,
+        render_workers=args.render_workers, chunk_chars=args.chunk_chars, use_cache=not args.no_cache,
+    )
+    if args.standin_store:
+        from llm_providers import Latency, ReplayProvider, ReplayStore
+        from llm_standin import start_server
+
+        # 未录制过的文本也回放某条录制结果，任意文本都能用来压测
+        provider = ReplayProvider(ReplayStore(args.standin_store), latency=Latency(args.standin_latency), on_miss="any")
+        standin = start_server(provider)
+        config.llm_base_url, config.llm_api_key = standin.base_url, "stand-in"
+        print(f"stand-in 已启动: {standin.base_url} ({args.standin_store})")
+
+    service = DeckService(config, RenderOptions(engine=args.engine, image_cache_dir=AppConfig.image_cache_dir))
+    try:
+        asyncio.run(service.serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
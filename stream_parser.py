@@ -0,0 +1,128 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class SlideStreamParser:
+    """Incremental scanner for the routed JSON document.
+
+    ``feed()`` accepts text deltas as they arrive and returns newly completed
+    events: ``("layout", str)`` once the top-level layout value is closed and
+    ``("slide", dict)`` for every element of the top-level ``slides`` array as
+    soon as its closing brace is seen. Each character is scanned once and the
+    scan buffer only keeps the slide or string still open, so the total cost
+    is linear in the response length.
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        # 待扫描文本：之前的部分只保留尚未闭合的 slide / 字符串，位置都相对于它
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start: Optional[int] = None
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._expect_value = False
+        self._in_slides = False
+        self._slide_start: Optional[int] = None
+        self.layout: Optional[str] = None
+        self.slide_count = 0
+        self.complete = False
+        self.failed = False
+
+    @property
+    def text(self) -> str:
+        # 完整响应只在退回整篇解析时才需要，按需拼接一次
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self._chunks.append(chunk)
+        if self.failed:
+            return []
+        text = self._buf + chunk
+        events: List[Tuple[str, Any]] = []
+        pos = self._pos
+        while pos < len(text):
+            ch = text[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._on_string_end(text, pos, events)
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif ch in "{[":
+                self._on_open(ch, pos)
+            elif ch in "}]":
+                self._on_close(text, pos, events)
+            elif ch == ":" and self._depth == 1:
+                self._key = self._last_string
+                self._expect_value = True
+            elif ch == "," and self._depth == 1:
+                self._key = None
+                self._expect_value = False
+            pos += 1
+            if self.failed:
+                break
+        self._trim(text, pos)
+        return events
+
+    def _trim(self, text: str, pos: int) -> None:
+        keep = pos
+        if self._slide_start is not None:
+            keep = min(keep, self._slide_start)
+        if self._in_string and self._string_start is not None:
+            keep = min(keep, self._string_start)
+        self._buf = text[keep:]
+        self._pos = pos - keep
+        if self._slide_start is not None:
+            self._slide_start -= keep
+        if self._string_start is not None:
+            self._string_start = self._string_start - keep if self._in_string else None
+
+    def _on_string_end(self, text: str, pos: int, events: List[Tuple[str, Any]]) -> None:
+        if self._depth != 1:
+            return
+        try:
+            value = json.loads(text[self._string_start:pos + 1])
+        except json.JSONDecodeError:
+            self.failed = True
+            return
+        if self._expect_value and self._key == "layout":
+            self.layout = value
+            self._expect_value = False
+            events.append(("layout", value))
+        else:
+            self._last_string = value
+
+    def _on_open(self, ch: str, pos: int) -> None:
+        self._depth += 1
+        if self._depth == 2 and ch == "[" and self._expect_value and self._key == "slides":
+            self._in_slides = True
+        elif self._depth == 3 and self._in_slides and ch == "{":
+            self._slide_start = pos
+
+    def _on_close(self, text: str, pos: int, events: List[Tuple[str, Any]]) -> None:
+        if self._depth == 3 and self._slide_start is not None:
+            try:
+                slide = json.loads(text[self._slide_start:pos + 1])
+            except json.JSONDecodeError:
+                self.failed = True
+                return
+            self._slide_start = None
+            self.slide_count += 1
+            events.append(("slide", slide))
+        elif self._depth == 2 and self._in_slides:
+            self._in_slides = False
+            self._expect_value = False
+        elif self._depth == 1:
+            self.complete = True
+        self._depth -= 1
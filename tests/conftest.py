@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 顶层模块（llm_router、job_queue 等）不是包，直接把仓库根目录放进 sys.path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,154 @@
+import json
+import time
+
+import pytest
+
+import job_queue
+from benchmarks.synthetic import make_raw_payload
+from generator.options import RenderOptions
+from job_queue import JobQueue, WorkerSettings, process_job
+
+SETTINGS = WorkerSettings(use_cache=False, preprocess=False, backoff=60.0, lease_seconds=60.0, max_attempts=3)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    yield queue
+    queue.close()
+
+
+def _row(queue, job_id):
+    return queue.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+
+def test_enqueue_ignores_duplicate_outputs(queue):
+    assert queue.enqueue("a.pptx", text="正文")
+    assert not queue.enqueue("a.pptx", text="另一篇")
+    assert queue.enqueue_many([("a.pptx", "x", None, None, None), ("b.pptx", "y", None, "summary", None)]) == 1
+    assert queue.stats()["depth"]["pending"] == 2
+
+
+def test_claim_hands_each_job_to_one_worker(queue):
+    queue.enqueue("a.pptx", text="正文")
+    other = JobQueue(queue.path)
+    try:
+        job = queue.claim("w1", SETTINGS.lease_seconds, SETTINGS.max_attempts)
+        assert job is not None and job.attempts == 1
+        assert other.claim("w2", SETTINGS.lease_seconds, SETTINGS.max_attempts) is None
+    finally:
+        other.close()
+
+
+def test_claim_prefers_structured_jobs(queue):
+    queue.enqueue("a.pptx", text="正文")
+    queue.enqueue("b.pptx", routed="{}")
+    assert queue.claim("w1", 60, 3).out == "b.pptx"
+
+
+def test_expired_lease_is_reclaimed_and_stale_owner_is_rejected(queue):
+    queue.enqueue("a.pptx", text="正文")
+    stale = queue.claim("w1", 0.01, SETTINGS.max_attempts)
+    time.sleep(0.02)
+    job = queue.claim("w2", 60, SETTINGS.max_attempts)
+    assert job.id == stale.id and job.attempts == 2
+    # 原持有者的租约已过期，它写回的结果不能覆盖新持有者的进度
+    assert not queue.llm_done(stale, "w1", "{}", 1.0, 60)
+    assert queue.llm_done(job, "w2", "{}", 1.0, 60)
+    assert _row(queue, job.id)["state"] == "llm_done"
+
+
+def test_job_lost_too_often_fails(queue):
+    queue.enqueue("a.pptx", text="正文")
+    for _ in range(2):
+        assert queue.claim("w1", 0.01, 2) is not None
+        time.sleep(0.02)
+    assert queue.claim("w1", 0.01, 2) is None
+    row = _row(queue, 1)
+    assert row["state"] == "failed"
+    assert "lost" in row["error"]
+
+
+def test_transient_error_backs_off_and_retries(queue, monkeypatch):
+    def flaky(job, settings, cache):
+        raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(job_queue, "_structure", flaky)
+    queue.enqueue("a.pptx", text="正文")
+    job = queue.claim("w1", 60, SETTINGS.max_attempts)
+    assert process_job(queue, job, "w1", SETTINGS, RenderOptions()) == "pending"
+
+    row = _row(queue, job.id)
+    assert row["lease_owner"] is None and "ConnectionError" in row["error"]
+    # 退避期内领不到，退避结束后再次领取并计入尝试次数
+    assert row["next_attempt_at"] > time.time() + 20
+    assert queue.claim("w1", 60, SETTINGS.max_attempts) is None
+    queue.conn.execute("UPDATE jobs SET next_attempt_at = 0")
+    assert queue.claim("w1", 60, SETTINGS.max_attempts).attempts == 2
+
+
+def test_transient_error_fails_after_max_attempts(queue, monkeypatch):
+    def slow(job, settings, cache):
+        raise TimeoutError()
+
+    monkeypatch.setattr(job_queue, "_structure", slow)
+    queue.enqueue("a.pptx", text="正文")
+    states = []
+    for _ in range(SETTINGS.max_attempts):
+        job = queue.claim("w1", 60, SETTINGS.max_attempts)
+        states.append(process_job(queue, job, "w1", SETTINGS, RenderOptions()))
+        queue.conn.execute("UPDATE jobs SET next_attempt_at = 0")
+    assert states == ["pending", "pending", "failed"]
+
+
+@pytest.mark.parametrize("error", [ValueError("AI response must include a non-empty 'layout' field"),
+                                   FileNotFoundError("news.txt")])
+def test_permanent_error_fails_at_once(queue, monkeypatch, error):
+    def broken(job, settings, cache):
+        raise error
+
+    monkeypatch.setattr(job_queue, "_structure", broken)
+    queue.enqueue("a.pptx", text="正文")
+    job = queue.claim("w1", 60, SETTINGS.max_attempts)
+    assert process_job(queue, job, "w1", SETTINGS, RenderOptions()) == "failed"
+    assert [row["out"] for row in queue.failures()] == ["a.pptx"]
+
+    assert queue.retry_failed() == 1
+    assert queue.claim("w1", 60, SETTINGS.max_attempts).attempts == 1
+
+
+def test_structured_job_renders_to_output(queue, tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue, "_structure",
+                        lambda job, settings, cache: json.dumps(make_raw_payload("summary"), ensure_ascii=False))
+    out = tmp_path / "decks" / "a.pptx"
+    queue.enqueue(str(out), text="正文", layout="summary")
+    job = queue.claim("w1", 60, SETTINGS.max_attempts)
+    assert process_job(queue, job, "w1", SETTINGS, RenderOptions()) == "rendered"
+    assert out.stat().st_size > 0
+    assert not list(out.parent.glob(".*.tmp"))
+
+    stats = queue.stats(windows=(60,))
+    assert stats["depth"]["rendered"] == 1
+    assert stats["throughput"][60]["llm_per_min"] == 1
+    assert stats["avg_llm_seconds"] is not None
+
+
+def test_jobs_enqueued_from_json_are_not_llm_throughput(queue, tmp_path):
+    routed = json.dumps(make_raw_payload("summary"), ensure_ascii=False)
+    out = tmp_path / "a.pptx"
+    queue.enqueue(str(out), routed=routed, layout="summary")
+    job = queue.claim("w1", 60, SETTINGS.max_attempts)
+    assert process_job(queue, job, "w1", SETTINGS, RenderOptions()) == "rendered"
+
+    throughput = queue.stats(windows=(60,))["throughput"][60]
+    assert throughput["llm_per_min"] == 0
+    assert throughput["rendered_per_min"] == 1
+
+
+def test_release_returns_job_without_counting_attempt(queue):
+    queue.enqueue("a.pptx", text="正文")
+    job = queue.claim("w1", 60, 3)
+    queue.release(job, "w1")
+    again = queue.claim("w2", 60, 3)
+    assert again.id == job.id and again.attempts == 1
+    assert queue.next_wakeup() is not None
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from json_repair import repair_json
+from llm_router import _load_output_json
+
+
+def _load(raw):
+    return json.loads(repair_json(raw))
+
+
+def test_valid_json_is_unchanged():
+    raw = '{"layout": "summary", "slides": [{"title": "a", "bullets": ["b"]}]}'
+    assert repair_json(raw) == raw
+
+
+def test_strips_code_fence_and_surrounding_text():
+    raw = '好的，结果如下：\n```json\n{"layout": "summary"}\n```\n以上。'
+    assert _load(raw) == {"layout": "summary"}
+
+
+def test_removes_trailing_commas():
+    assert _load('{"a": [1, 2, ], "b": 3, }') == {"a": [1, 2], "b": 3}
+
+
+def test_curly_quotes_as_delimiters():
+    assert _load('{“title”: “标题”}') == {"title": "标题"}
+
+
+def test_python_literals():
+    assert _load('{"a": True}') == {"a": True}
+    assert _load('{"a": False, "b": None}') == {"a": False, "b": None}
+
+
+def test_literal_words_inside_strings_are_kept():
+    assert _load('{"a": "True or None"}') == {"a": "True or None"}
+
+
+def test_unescaped_control_characters_in_strings():
+    assert _load('{"a": "line1\nline2\tend"}') == {"a": "line1\nline2\tend"}
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ('{"slides": [{"title": "a"}, {"title": "b', {"slides": [{"title": "a"}, {"title": "b"}]}),
+    ('{"slides": [{"title": "a"},', {"slides": [{"title": "a"}]}),
+    ('{"layout": "summary", "slides"', {"layout": "summary"}),
+    ('{"layout": "summary", "slides":', {"layout": "summary"}),
+    ('{"a": "x\\', {"a": "x"}),
+])
+def test_truncated_output_is_closed(raw, expected):
+    assert _load(raw) == expected
+
+
+@pytest.mark.parametrize("raw", ['{"a": 中文}', '{"a": été}', '{"a": True_x}'])
+def test_unquoted_words_are_left_for_the_parser_to_reject(raw):
+    assert repair_json(raw) == raw
+    with pytest.raises(json.JSONDecodeError):
+        _load(raw)
+    with pytest.raises(ValueError, match="not valid JSON"):
+        _load_output_json(raw)
+
+
+def test_empty_input_stays_invalid():
+    with pytest.raises(json.JSONDecodeError):
+        _load("")
@@ -0,0 +1,92 @@
+import os
+import time
+
+import pytest
+
+from llm_cache import LLMCache, make_cache_key, normalize_news_text
+
+
+def _age(cache, key, seconds):
+    path = cache._path(key)
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_round_trip_and_counters(tmp_path):
+    cache = LLMCache(str(tmp_path))
+    assert cache.get("ab" * 32) is None
+    cache.put("ab" * 32, {"layout": "summary"})
+    assert cache.get("ab" * 32) == {"layout": "summary"}
+    assert cache.stats() == {"hits": 1, "misses": 1, "stores": 1, "evictions": 0}
+    assert list(cache.keys()) == ["ab" * 32]
+
+
+def test_key_ignores_whitespace_and_width_differences():
+    assert normalize_news_text("  新闻\r\n\n\n正文  ") == normalize_news_text("新闻 正文")
+    assert make_cache_key("m", "p", ["a"], "ＧＤＰ增长 5%") == make_cache_key("m", "p", ["a"], "GDP增长  5%")
+    assert make_cache_key("m", "p", ["a"], "x") != make_cache_key("m2", "p", ["a"], "x")
+
+
+def test_first_put_enforces_size_limit_on_existing_directory(tmp_path):
+    # 之前的进程留下的条目已超出上限：新实例第一次写入就要整理，而不是等到第 evict_every 次
+    big = {"text": "x" * 1000}
+    LLMCache(str(tmp_path), max_bytes=10**9).put("aa" * 32, big)
+    LLMCache(str(tmp_path), max_bytes=10**9).put("bb" * 32, big)
+    cache = LLMCache(str(tmp_path), max_bytes=2500, evict_every=1000)
+    _age(cache, "aa" * 32, 60)
+    cache.put("cc" * 32, big)
+    assert sorted(cache.keys()) == ["bb" * 32, "cc" * 32]
+    assert cache.evictions == 1
+
+
+def test_put_evicts_least_recently_used_once_over_limit(tmp_path):
+    big = {"text": "x" * 1000}
+    cache = LLMCache(str(tmp_path), max_bytes=2500, evict_every=1000)
+    for index, key in enumerate(("aa" * 32, "bb" * 32)):
+        cache.put(key, big)
+        _age(cache, key, 100 - index)
+    # 命中会刷新 mtime，于是最久未用的变成 bb
+    assert cache.get("aa" * 32) == big
+    cache.put("cc" * 32, big)
+    assert sorted(cache.keys()) == ["aa" * 32, "cc" * 32]
+
+
+def test_expired_entries_are_misses_and_evicted(tmp_path):
+    cache = LLMCache(str(tmp_path), max_age_seconds=3600)
+    cache.put("aa" * 32, {"a": 1})
+    _age(cache, "aa" * 32, 7200)
+    assert cache.evict() == 1
+    assert list(cache.keys()) == []
+
+    cache.put("bb" * 32, {"b": 1})
+    cache.max_age_seconds = 0
+    time.sleep(0.01)
+    assert cache.get("bb" * 32) is None
+    assert list(cache.keys()) == []
+
+
+def test_rejected_payload_counts_as_miss(tmp_path):
+    def validate(payload):
+        if "layout" not in payload:
+            raise ValueError("missing layout")
+        return payload["layout"]
+
+    cache = LLMCache(str(tmp_path))
+    cache.put("aa" * 32, {"slides": []})
+    cache.put("bb" * 32, {"layout": "summary"})
+    assert cache.get("aa" * 32, validate) is None
+    assert cache.get("bb" * 32, validate) == "summary"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("content", ["{not json", b"\xff\xfe"])
+def test_corrupt_entries_are_misses(tmp_path, content):
+    cache = LLMCache(str(tmp_path))
+    path = cache._path("aa" * 32)
+    path.parent.mkdir(parents=True)
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+    else:
+        path.write_text(content, encoding="utf-8")
+    assert cache.get("aa" * 32) is None
+    assert cache.misses == 1
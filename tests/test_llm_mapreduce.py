@@ -0,0 +1,56 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from llm_mapreduce import astructure_chunked, merge_partials
+
+
+class FakePool:
+    """Returns one canned partial per chunk and records the request options."""
+
+    def __init__(self, partials):
+        self.partials = list(partials)
+        self.requests = []
+
+    async def create_response(self, model, messages, timeout=None, **options):
+        self.requests.append(options)
+        return SimpleNamespace(output_text=json.dumps(self.partials.pop(0), ensure_ascii=False))
+
+
+def _timeline(*events, **fields):
+    return {"layout": "timeline", "slides": [{"events": [
+        {"date": date, "headline": headline, "detail": None} for date, headline in events], **fields}]}
+
+
+def _run(pool, text, chunk_chars=20):
+    return asyncio.run(astructure_chunked(text, "m", "timeline", chunk_chars=chunk_chars, pool=pool))
+
+
+def test_map_requests_use_the_partial_schema():
+    pool = FakePool([
+        _timeline(("2024-01-01", "立项"), title="项目"),
+        _timeline(("2024-02-01", "开工"), ("2024-03-01", "完工"), title=None),
+    ])
+    routed = _run(pool, "第一部分内容写在这里。\n\n第二部分内容写在这里。")
+    fmt = pool.requests[0]["text"]["format"]
+    assert fmt["name"] == "routed_deck_chunk"
+    slide = fmt["schema"]["$defs"]["TimelineSlide"]["properties"]
+    assert {"type": "null"} in slide["events"]["anyOf"]
+    assert [e.headline for e in routed.slides[0].events] == ["立项", "开工", "完工"]
+    assert routed.slides[0].title == "项目"
+
+
+def test_merge_keeps_different_events_on_the_same_day():
+    merged = merge_partials("timeline", [
+        _timeline(("2024-01-01", "发布公告"), ("2024-01-01", "股价上涨")),
+        _timeline(("2024-01-01", "发布 公告"), ("2023-12-01", "提交申请")),
+    ])
+    events = merged["slides"][0]["events"]
+    assert [(e["date"], e["headline"]) for e in events] == [
+        ("2023-12-01", "提交申请"), ("2024-01-01", "发布公告"), ("2024-01-01", "股价上涨"),
+    ]
+
+
+def test_merge_keeps_events_without_dates_in_document_order():
+    merged = merge_partials("timeline", [_timeline(("早期", "甲"), (None, "乙")), _timeline(("后来", "丙"))])
+    assert [e["headline"] for e in merged["slides"][0]["events"]] == ["甲", "乙", "丙"]
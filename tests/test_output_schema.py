@@ -0,0 +1,42 @@
+import json
+
+from llm_router import _deck_format, _slide_format, slide_models, slide_validators
+
+LAYOUTS = ("news_report", "timeline", "summary", "image_headline")
+
+
+def _keys(schema):
+    if isinstance(schema, dict):
+        for key, value in schema.items():
+            yield key
+            yield from _keys(value)
+    elif isinstance(schema, list):
+        for item in schema:
+            yield from _keys(item)
+
+
+def test_deck_schema_is_strict_and_has_no_count_constraints():
+    schema = _deck_format(LAYOUTS)["format"]["schema"]
+    keys = set(_keys(schema))
+    assert not keys & {"minItems", "minLength", "maxLength", "default"}
+    for name, definition in schema["$defs"].items():
+        assert definition["additionalProperties"] is False
+        assert definition["required"] == list(definition["properties"])
+    assert schema["properties"]["layout"]["enum"] == list(LAYOUTS)
+
+
+def test_slide_schema_names_follow_layout():
+    for layout in slide_models():
+        assert _slide_format(layout)["format"]["name"] == f"{layout}_slide"
+
+
+def test_validators_fill_counts_the_schema_no_longer_forces():
+    slide = {
+        "header_title": "标题",
+        "summary": {"label": "摘要", "bullets": ["一"]},
+        "left": {"title": "左", "sections": [{"subtitle_bold": "小节", "bullets": ["甲"]}]},
+        "right": {"title": "右", "sections": []},
+    }
+    checked = slide_validators()["news_report"].validate_python(json.loads(json.dumps(slide)))
+    assert len(checked.left.sections) == 2 and len(checked.right.sections) == 2
+    assert len(checked.summary.bullets) == 3
@@ -0,0 +1,51 @@
+import io
+import zipfile
+
+import pytest
+from pptx import Presentation
+from pptx.util import Inches
+
+from generator import packaging
+from generator.packaging import deck_bytes
+
+
+@pytest.fixture
+def prs():
+    PIL = pytest.importorskip("PIL.Image")
+    image = io.BytesIO()
+    PIL.new("RGB", (64, 64), "red").save(image, "PNG")
+    image.seek(0)
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    slide.shapes.add_picture(image, Inches(1), Inches(1))
+    return prs
+
+
+def _saved_names(prs):
+    stream = io.BytesIO()
+    prs.save(stream)
+    with zipfile.ZipFile(stream) as zipf:
+        return zipf.namelist()
+
+
+def _infos(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as zipf:
+        return {info.filename: info.compress_type for info in zipf.infolist()}
+
+
+@pytest.mark.parametrize("private_api", [True, False])
+def test_members_match_python_pptx_and_honour_options(prs, monkeypatch, private_api):
+    if not private_api:
+        # python-pptx 改版、私有接口消失时退回 prs.save() 再重新打包
+        monkeypatch.setattr(packaging, "_ContentTypesItem", None)
+    data = deck_bytes(prs, level=9, store_media=True)
+    infos = _infos(data)
+    assert list(infos) == _saved_names(prs)
+    media = [name for name in infos if name.endswith(".png")]
+    assert media and all(infos[name] == zipfile.ZIP_STORED for name in media)
+    assert infos["ppt/presentation.xml"] == zipfile.ZIP_DEFLATED
+    assert len(Presentation(io.BytesIO(data)).slides) == 1
+
+
+def test_level_zero_stores_everything(prs):
+    assert set(_infos(deck_bytes(prs, level=0)).values()) == {zipfile.ZIP_STORED}
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from benchmarks.synthetic import Scale, make_raw_payload
+from llm_router import SlideFailure, _SlideStream
+from stream_parser import SlideStreamParser
+
+
+def _deltas(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _feed_all(parser, deltas):
+    events = []
+    for delta in deltas:
+        events.extend(parser.feed(delta))
+    return events
+
+
+@pytest.mark.parametrize("size", [1, 7, 10_000])
+def test_parser_emits_layout_and_every_slide(size):
+    payload = make_raw_payload("summary", Scale(slides=3))
+    text = json.dumps(payload, ensure_ascii=False)
+    parser = SlideStreamParser()
+    events = _feed_all(parser, _deltas(text, size))
+    assert events == [("layout", "summary")] + [("slide", slide) for slide in payload["slides"]]
+    assert parser.complete and not parser.failed
+    assert parser.text == text
+
+
+def test_parser_handles_braces_and_escapes_inside_strings():
+    slide = {"title": 'a "}" b', "bullets": ["[x]", "\\", "{"]}
+    text = json.dumps({"slides": [slide], "layout": "summary"})
+    assert _feed_all(SlideStreamParser(), text) == [("slide", slide), ("layout", "summary")]
+
+
+def test_parser_buffer_keeps_only_the_open_slide():
+    # 逐字喂入时扫描缓冲只保留未闭合的那一页，总开销随响应长度线性增长
+    payload = make_raw_payload("summary", Scale(slides=40))
+    text = json.dumps(payload, ensure_ascii=False)
+    longest_slide = max(len(json.dumps(slide, ensure_ascii=False)) for slide in payload["slides"])
+    parser = SlideStreamParser()
+    peak = 0
+    for ch in text:
+        parser.feed(ch)
+        peak = max(peak, len(parser._buf))
+    assert parser.slide_count == 40
+    assert peak <= longest_slide + 1
+
+
+def test_parser_reports_truncated_document_as_incomplete():
+    text = json.dumps(make_raw_payload("summary", Scale(slides=2)), ensure_ascii=False)
+    parser = SlideStreamParser()
+    events = _feed_all(parser, [text[:-20]])
+    assert [kind for kind, _ in events] == ["layout", "slide"]
+    assert not parser.complete
+
+
+def _stream(slides, layout="summary", forced_layout=None):
+    return json.dumps({"layout": layout, "slides": slides}, ensure_ascii=False), _SlideStream(forced_layout)
+
+
+def test_slide_stream_validates_slides_as_they_arrive():
+    text, stream = _stream([{"title": "一", "bullets": ["甲"]}, {"title": "二", "bullets": ["乙"]}])
+    ready = []
+    for delta in _deltas(text, 5):
+        ready.extend(stream.feed(delta))
+    assert stream.finish() == []
+    assert [layout for layout, _ in ready] == ["summary", "summary"]
+    assert [slide.title for _, slide in ready] == ["一", "二"]
+
+
+def test_slide_stream_holds_slides_until_layout_is_known():
+    slides = [{"title": "一", "bullets": ["甲"]}]
+    text = json.dumps({"slides": slides, "layout": "summary"}, ensure_ascii=False)
+    stream = _SlideStream(None)
+    ready = stream.feed(text[:text.index('"layout"')])
+    assert ready == []
+    ready = stream.feed(text[text.index('"layout"'):])
+    assert [(layout, slide.title) for layout, slide in ready] == [("summary", "一")]
+
+
+def test_slide_stream_yields_failures_for_invalid_slides():
+    text, stream = _stream([{"title": "一", "bullets": ["甲"]}, {"bullets": ["乙"]}])
+    ready = stream.feed(text) + stream.finish()
+    assert isinstance(ready[1], SlideFailure)
+    assert ready[1].index == 1
+    assert any("title" in error for error in ready[1].errors)
+
+    layout, slide = ready[0]
+    stream.record(slide)
+    result = stream.result()
+    assert result.layout == "summary"
+    assert [s.title for s in result.slides] == ["一"]
+
+
+def test_slide_stream_result_without_valid_slides_fails():
+    text, stream = _stream([{"bullets": ["乙"]}])
+    stream.feed(text)
+    stream.finish()
+    with pytest.raises(ValueError, match="no slide passed validation"):
+        stream.result()
+
+
+@pytest.mark.parametrize("layout, forced", [("summary", "timeline"), ("no_such_layout", None)])
+def test_slide_stream_rejects_unexpected_layouts(layout, forced):
+    text, stream = _stream([{"title": "一", "bullets": ["甲"]}], layout=layout, forced_layout=forced)
+    with pytest.raises(ValueError, match="layout"):
+        stream.feed(text)
+
+
+def test_slide_stream_finish_repairs_a_truncated_response():
+    text, stream = _stream([{"title": "一", "bullets": ["甲"]}, {"title": "二", "bullets": ["乙", "丙"]}])
+    cut = text.index("丙")
+    ready = stream.feed(text[:cut])
+    assert [slide.title for _, slide in ready] == ["一"]
+    rest = stream.finish()
+    assert [(slide.title, slide.bullets) for _, slide in rest] == [("二", ["乙"])]
@@ -0,0 +1,61 @@
+import re
+
+import pytest
+
+from text_chunks import split_chunks, split_paragraphs, split_sentences
+
+
+def _compact(text):
+    return re.sub(r"\s+", "", text)
+
+
+def test_split_paragraphs_on_blank_lines():
+    assert split_paragraphs("第一段。\n\n第二段。\n  \n第三段。") == ["第一段。", "第二段。", "第三段。"]
+
+
+def test_split_paragraphs_falls_back_to_single_newlines():
+    assert split_paragraphs("一行。\n二行。\n") == ["一行。", "二行。"]
+
+
+def test_split_sentences_keeps_closing_quotes_and_decimals():
+    assert split_sentences("他说：“增长了3.5%。”随后离开。Rates rose. Then fell") == [
+        "他说：“增长了3.5%。”", "随后离开。", "Rates rose.", "Then fell",
+    ]
+
+
+def test_short_text_is_one_chunk():
+    assert split_chunks("第一段。\n\n第二段。", 100) == ["第一段。\n\n第二段。"]
+
+
+def test_paragraphs_are_packed_up_to_the_limit():
+    paragraphs = ["甲" * 40 + "。", "乙" * 40 + "。", "丙" * 40 + "。"]
+    chunks = split_chunks("\n\n".join(paragraphs), 90)
+    assert chunks == ["\n\n".join(paragraphs[:2]), paragraphs[2]]
+
+
+def test_long_paragraph_is_split_between_sentences():
+    sentences = [f"第{i}句" + "字" * 20 + "。" for i in range(10)]
+    chunks = split_chunks("".join(sentences), 60)
+    assert all(len(chunk) <= 60 for chunk in chunks)
+    assert "".join(chunks) == "".join(sentences)
+    # 每块都在句末结束，不会把一句话切成两半
+    assert all(chunk.endswith("。") for chunk in chunks)
+
+
+def test_english_sentences_keep_a_space():
+    text = " ".join(f"Sentence number {i} is here." for i in range(8))
+    chunks = split_chunks(text, 70)
+    assert all(len(chunk) <= 70 for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_overlong_sentence_is_cut_at_clauses_then_hard():
+    sentence = "，".join("子句" * 5 for _ in range(6)) + "无标点" * 30 + "。"
+    chunks = split_chunks(sentence, 25)
+    assert all(len(chunk) <= 25 for chunk in chunks)
+    assert _compact("".join(chunks)) == _compact(sentence)
+
+
+def test_max_chars_must_be_positive():
+    with pytest.raises(ValueError):
+        split_chunks("文本", 0)
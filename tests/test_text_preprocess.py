@@ -0,0 +1,35 @@
+import pytest
+
+from text_preprocess import estimate_tokens, preprocess, summarize_to_budget
+
+ARTICLE = "这是一篇新闻的导语句，内容比较长一些。\n\n第二段继续说明。\n\n第三段补充背景信息。"
+
+
+def test_text_within_budget_is_kept():
+    text, report = preprocess(ARTICLE, 1000)
+    assert text == ARTICLE
+    assert not report.summarized
+
+
+@pytest.mark.parametrize("budget", [1, 3, 10])
+def test_lead_sentence_is_cut_to_fit_a_small_budget(budget):
+    text, report = preprocess(ARTICLE, budget)
+    assert text and ARTICLE.startswith(text)
+    assert estimate_tokens(text) <= budget
+    assert report.summarized
+
+
+def test_lead_sentence_is_kept_before_higher_scoring_filler():
+    paragraphs = [["导语。"], ["说明说明说明。", "说明说明补充。"], ["说明说明说明说明。"]]
+    kept = summarize_to_budget(paragraphs, 12)
+    assert kept[0] == ["导语。"]
+    assert sum(estimate_tokens(s) for p in kept for s in p) <= 12
+
+
+def test_boilerplate_only_input_is_not_emptied():
+    text, _ = preprocess("责任编辑：张三\n来源：某报", 1000)
+    assert text
+
+
+def test_empty_input_stays_empty():
+    assert preprocess("", 10)[0] == ""
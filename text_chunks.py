@@ -0,0 +1,83 @@
+import re
+from typing import List
+
+# 长文切分：先按段落，段落过长再按句子，句子仍过长才硬切。
+# 句末标点包括中文的。！？；…，以及英文的 . ! ? ;（后跟空白时）；
+# 紧跟其后的右引号/右括号归入同一句。
+
+_SENTENCE_END = re.compile(
+    r"(?:[。！？；!?]+|…+|\.{3,}|(?<=[^\d\s])[.;](?=\s))[”’」』）)\]\"']*\s*"
+)
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n|\n(?=\s{2,}|　)")
+
+
+def split_paragraphs(text: str) -> List[str]:
+    paragraphs = [p.strip() for p in _PARAGRAPH_BREAK.split(text or "")]
+    if len(paragraphs) <= 1:
+        # 没有空行分段的稿件退而按单个换行分段
+        paragraphs = [p.strip() for p in (text or "").splitlines()]
+    return [p for p in paragraphs if p]
+
+
+def split_sentences(paragraph: str) -> List[str]:
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(paragraph):
+        end = match.end()
+        sentence = paragraph[start:end].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = end
+    tail = paragraph[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def _split_long_sentence(sentence: str, max_chars: int) -> List[str]:
+    # 超长句先在逗号/顿号/冒号处断开，单个分句仍超长才按字数硬切
+    clauses = [c for c in re.split(r"(?<=[，、：,:])\s*", sentence) if c]
+    pieces: List[str] = []
+    for clause in clauses:
+        if len(clause) > max_chars:
+            pieces.extend(clause[i:i + max_chars] for i in range(0, len(clause), max_chars))
+        else:
+            pieces.append(clause)
+    return _pack(pieces, max_chars, "")
+
+
+def _pack(pieces: List[str], max_chars: int, joiner: str) -> List[str]:
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for piece in pieces:
+        extra = len(piece) + (len(joiner) if current else 0)
+        if current and size + extra > max_chars:
+            chunks.append(joiner.join(current))
+            current, size = [], 0
+            extra = len(piece)
+        current.append(piece)
+        size += extra
+    if current:
+        chunks.append(joiner.join(current))
+    return chunks
+
+
+def split_chunks(text: str, max_chars: int) -> List[str]:
+    """Split ``text`` into chunks of at most ``max_chars`` characters, keeping
+    paragraphs together where possible and never cutting inside a sentence
+    unless the sentence alone exceeds the limit."""
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+    pieces: List[str] = []
+    for paragraph in split_paragraphs(text):
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        sentences: List[str] = []
+        for sentence in split_sentences(paragraph):
+            sentences.extend(_split_long_sentence(sentence, max_chars) if len(sentence) > max_chars else [sentence])
+        # 同一段落内的句子直接相连，中文无需空格，英文句子之间补一个
+        sentences = [s + " " if s[-1].isascii() else s for s in sentences]
+        pieces.extend(chunk.strip() for chunk in _pack(sentences, max_chars, ""))
+    return _pack(pieces, max_chars, "\n\n")
@@ -0,0 +1,237 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from config_registry import REGISTRY, read_yaml
+from text_chunks import split_paragraphs, split_sentences
+
+HERE = Path(__file__).parent
+PREPROCESS_PATH = HERE / "templates" / "preprocess.yaml"
+
+# 在 choose_and_structure 之前压缩输入：空白规整 → 去模板化文字 → 近似重复句去重
+# → 超出 token 预算时做抽取式摘要。全部在本地完成，不调用模型。
+
+_CJK = re.compile(r"[\u3400-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af]")
+_ZERO_WIDTH = re.compile(r"[\u200b-\u200f\u2060\ufeff]")
+_NOT_WORD = re.compile(r"[\W_]+")
+_LATIN_WORD = re.compile(r"[a-z0-9]+")
+
+
+@dataclass(frozen=True)
+class PreprocessConfig:
+    token_budget: int
+    near_duplicate: float
+    drop_line_max_chars: int
+    drop_lines: Tuple[re.Pattern, ...]
+    strip_inline: Tuple[re.Pattern, ...]
+
+
+def _compile_config() -> PreprocessConfig:
+    cfg = read_yaml(PREPROCESS_PATH) or {}
+    return PreprocessConfig(
+        token_budget=int(cfg.get("token_budget") or 0),
+        near_duplicate=float(cfg.get("near_duplicate") or 1.0),
+        drop_line_max_chars=int(cfg.get("drop_line_max_chars") or 80),
+        drop_lines=tuple(re.compile(p) for p in cfg.get("drop_lines") or ()),
+        strip_inline=tuple(re.compile(p) for p in cfg.get("strip_inline") or ()),
+    )
+
+
+def load_preprocess_config() -> PreprocessConfig:
+    return REGISTRY.get("preprocess", (PREPROCESS_PATH,), _compile_config)
+
+
+def estimate_tokens(text: str) -> int:
+    # 粗略估算：CJK 字符约 1 token/字，其余约 4 字符/token
+    cjk = len(_CJK.findall(text))
+    other = len(re.sub(r"\s+", " ", text)) - cjk
+    return cjk + math.ceil(max(0, other) / 4)
+
+
+@dataclass
+class PreprocessReport:
+    tokens_before: int
+    tokens_after: int
+    boilerplate_lines: int = 0
+    duplicate_sentences: int = 0
+    summarized: bool = False
+
+    @property
+    def saved_ratio(self) -> float:
+        if not self.tokens_before:
+            return 0.0
+        return 1 - self.tokens_after / self.tokens_before
+
+    def describe(self) -> str:
+        parts = [f"{self.tokens_before} → {self.tokens_after} tokens ({self.saved_ratio:.0%} 节省)"]
+        if self.boilerplate_lines:
+            parts.append(f"模板行 {self.boilerplate_lines}")
+        if self.duplicate_sentences:
+            parts.append(f"重复句 {self.duplicate_sentences}")
+        if self.summarized:
+            parts.append("已摘要")
+        return "，".join(parts)
+
+
+def normalize_whitespace(text: str) -> str:
+    text = _ZERO_WIDTH.sub("", text or "")
+    text = text.replace("\r\n", "\n").replace("\r", "\n").replace("\xa0", " ").replace("\u3000", " ")
+    lines = [re.sub(r"[ \t\f\v]+", " ", line).strip() for line in text.split("\n")]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def strip_boilerplate(text: str, cfg: PreprocessConfig) -> Tuple[str, int]:
+    kept = []
+    dropped = 0
+    for line in text.split("\n"):
+        for pattern in cfg.strip_inline:
+            line = pattern.sub("", line)
+        if line and len(line) <= cfg.drop_line_max_chars and any(p.search(line) for p in cfg.drop_lines):
+            dropped += 1
+            continue
+        kept.append(line.strip())
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip(), dropped
+
+
+def _shingles(sentence: str) -> Set[str]:
+    key = _NOT_WORD.sub("", sentence.lower())
+    if len(key) < 3:
+        return {key} if key else set()
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+
+class _NearDuplicateIndex:
+    # 字符 3-gram 倒排索引：只和至少共享一个 3-gram 的已保留句子比较 Jaccard
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._exact: Set[frozenset] = set()
+
+    def seen(self, shingles: Set[str]) -> bool:
+        marker = frozenset(shingles)
+        if marker in self._exact:
+            return True
+        if self.threshold < 1.0 and shingles:
+            overlap = Counter(i for g in shingles for i in self._postings.get(g, ()))
+            size = len(shingles)
+            for i, common in overlap.items():
+                if common / (size + self._sizes[i] - common) >= self.threshold:
+                    return True
+        return False
+
+    def add(self, shingles: Set[str]) -> None:
+        self._exact.add(frozenset(shingles))
+        index = len(self._sizes)
+        self._sizes.append(len(shingles))
+        for g in shingles:
+            self._postings.setdefault(g, []).append(index)
+
+
+def dedupe_sentences(paragraphs: List[List[str]], threshold: float) -> Tuple[List[List[str]], int]:
+    index = _NearDuplicateIndex(threshold)
+    removed = 0
+    result = []
+    for sentences in paragraphs:
+        kept = []
+        for sentence in sentences:
+            shingles = _shingles(sentence)
+            if index.seen(shingles):
+                removed += 1
+                continue
+            index.add(shingles)
+            kept.append(sentence)
+        if kept:
+            result.append(kept)
+    return result, removed
+
+
+def _terms(sentence: str) -> List[str]:
+    lowered = sentence.lower()
+    # CJK 用字符二元组，拉丁文字用单词
+    cjk = "".join(_CJK.findall(lowered))
+    return [cjk[i:i + 2] for i in range(len(cjk) - 1)] + _LATIN_WORD.findall(lowered)
+
+
+def _cut_to_budget(sentence: str, budget: int) -> str:
+    # 最长的、估算 token 数不超过预算的前缀（至少一个字）
+    low, high = 1, len(sentence)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(sentence[:middle]) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return sentence[:low].rstrip()
+
+
+def summarize_to_budget(paragraphs: List[List[str]], budget: int) -> List[List[str]]:
+    """Keep the lead sentence plus the highest-scoring sentences that fit
+    ``budget`` tokens, in their original order. Scores are the mean document
+    frequency of the sentence's terms, with a bonus for the lead paragraph.
+    A lead sentence longer than the budget is cut to fit."""
+    flat = [(p, s, sentence) for p, sentences in enumerate(paragraphs) for s, sentence in enumerate(sentences)]
+    if not flat:
+        return []
+    # 导语句总是保留：预算太小也不能返回空文本，或只剩后文的零碎句子
+    lead = flat[0][2]
+    if estimate_tokens(lead) > budget:
+        return [[_cut_to_budget(lead, budget)]]
+    terms = [_terms(sentence) for _, _, sentence in flat]
+    frequency = Counter(term for sentence_terms in terms for term in set(sentence_terms))
+    scored = []
+    for index, ((p, s, sentence), sentence_terms) in enumerate(zip(flat, terms)):
+        score = sum(frequency[t] for t in sentence_terms) / (len(sentence_terms) or 1)
+        if p == 0:
+            score *= 1.5   # 新闻导语通常信息量最大
+        if s == 0:
+            score *= 1.2
+        scored.append((score, index))
+
+    chosen = {0}
+    used = estimate_tokens(lead)
+    for score, index in sorted(scored, key=lambda item: (-item[0], item[1])):
+        if index in chosen:
+            continue
+        cost = estimate_tokens(flat[index][2])
+        if used + cost > budget:
+            continue
+        chosen.add(index)
+        used += cost
+
+    result: Dict[int, List[str]] = {}
+    for index in sorted(chosen):
+        p, _, sentence = flat[index]
+        result.setdefault(p, []).append(sentence)
+    return [result[p] for p in sorted(result)]
+
+
+def preprocess(text: str, token_budget: Optional[int] = None,
+               cfg: Optional[PreprocessConfig] = None) -> Tuple[str, PreprocessReport]:
+    cfg = cfg or load_preprocess_config()
+    budget = cfg.token_budget if token_budget is None else token_budget
+    report = PreprocessReport(tokens_before=estimate_tokens(text or ""), tokens_after=0)
+
+    cleaned, report.boilerplate_lines = strip_boilerplate(normalize_whitespace(text), cfg)
+    paragraphs = [split_sentences(p) for p in split_paragraphs(cleaned)]
+    paragraphs, report.duplicate_sentences = dedupe_sentences(paragraphs, cfg.near_duplicate)
+
+    def join(parts: List[List[str]]) -> str:
+        # 中文句子直接相连，英文句子之间补空格
+        return "\n\n".join(
+            "".join(s + " " if s[-1].isascii() else s for s in sentences).strip() for sentences in parts
+        )
+
+    result = join(paragraphs)
+    if not result and (text or "").strip():
+        # 规则把整篇都当成了模板文字：退回只做空白规整的原文，不把空文本交给模型
+        paragraphs = [split_sentences(p) for p in split_paragraphs(normalize_whitespace(text))]
+        result = join(paragraphs)
+    if budget and estimate_tokens(result) > budget:
+        result = join(summarize_to_budget(paragraphs, budget))
+        report.summarized = True
+    report.tokens_after = estimate_tokens(result)
+    return result, report